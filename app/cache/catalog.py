@@ -0,0 +1,147 @@
+import inspect
+import threading
+from functools import wraps
+from app.config import get_settings
+from app.cache.tiered import LocalLRU, LocalSharedTier, TieredCache
+from app.cache.swr import StaleWhileRevalidateCache, normalize_key
+from app.db import events
+from app.db.database import get_read_session, reads_own_writes, replica_seq
+
+_cache = None
+_list_cache = None
+_cache_lock = threading.Lock()
+
+
+def _build_shared_tier(settings):
+    if settings.backend == "local":
+        return LocalSharedTier(ttl_seconds=settings.ttl_seconds)
+    raise ValueError(f"Unsupported shared cache backend '{settings.backend}'")
+
+
+def get_catalog_cache() -> TieredCache:
+    """
+    Returns the process-wide cache for problem and category reads, creating it on first use.
+
+    Returns:
+        TieredCache: The two-tier catalog cache.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                settings = get_settings().cache
+                _cache = TieredCache(
+                    local=LocalLRU(max_entries=settings.local.max_entries, ttl_seconds=settings.local.ttl_seconds),
+                    shared=_build_shared_tier(settings.shared),
+                )
+    return _cache
+
+
+def get_list_cache() -> StaleWhileRevalidateCache:
+    """
+    Returns the process-wide stale-while-revalidate cache for list queries.
+
+    Returns:
+        StaleWhileRevalidateCache: The list cache.
+    """
+    global _list_cache
+    if _list_cache is None:
+        with _cache_lock:
+            if _list_cache is None:
+                settings = get_settings().cache.lists
+                _list_cache = StaleWhileRevalidateCache(
+                    session_factory=get_read_session,
+                    is_current=lambda db: events.reflects_seen_changes(replica_seq(db)),
+                    ttl_seconds=settings.ttl_seconds,
+                    stale_seconds=settings.stale_seconds,
+                    max_entries=settings.max_entries,
+                    refresh_workers=settings.refresh_workers,
+                )
+    return _list_cache
+
+
+def get_list_page(name: str, loader, db, **params):
+    """
+    Reads a list query through the stale-while-revalidate cache.
+
+    Parameters:
+        name (str): The query name, part of the cache key.
+        loader (Callable[[Session], Any]): Runs the query against a session.
+        db (Session): The request's database session.
+        **params: The query parameters; together with name they form the normalized key.
+
+    Returns:
+        tuple: (value, state) where state is "hit", "stale", "miss" or "bypass" when caching is
+            disabled or the client must read its own writes.
+    """
+    if not get_settings().cache.enabled or reads_own_writes(db):
+        return loader(db), "bypass"
+    return get_list_cache().get_or_load(normalize_key(name, **params), loader, db)
+
+
+def cached(prefix: str):
+    """
+    Decorator that caches a CRUD read function in the catalog cache.
+
+    The key is the prefix followed by the function's arguments, excluding the database
+    session (its first parameter). Exceptions are not cached.
+
+    Sessions of clients inside their read-your-writes window bypass the cache. Values read
+    from a replica are returned but only stored if the replica had replayed every change
+    this process has seen, so a lagging replica cannot refill an invalidated entry.
+
+    Parameters:
+        prefix (str): The key namespace, e.g. "problem" for keys like "problem:two-sum".
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        session_param = next(iter(signature.parameters))
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            db = bound.arguments[session_param]
+            if not get_settings().cache.enabled or reads_own_writes(db):
+                return func(*args, **kwargs)
+            bound.apply_defaults()
+            key = ":".join([prefix] + [str(value) for name, value in bound.arguments.items() if name != session_param])
+            cache = get_catalog_cache()
+            value = cache.get(key)
+            if value is not None:
+                return value
+            generation = cache.generation
+            value = func(*args, **kwargs)
+            if events.reflects_seen_changes(replica_seq(db)):
+                cache.set(key, value, generation=generation)
+            return value
+        return wrapper
+    return decorator
+
+
+@events.subscribe
+def invalidate_catalog(change: dict):
+    """ Drops the cache entries affected by a committed change. """
+    if _list_cache is not None:
+        # Any change can move rows between pages; stale pages keep being served until refreshed
+        _list_cache.expire_all()
+    if _cache is None:
+        return
+    entity = change["entity"]
+    if entity in ("problem", "solution"):
+        _cache.invalidate(f"problem:{change['key']}")
+        if change.get("previous_key"):
+            _cache.invalidate(f"problem:{change['previous_key']}")
+        if entity == "problem":
+            # Creating, recategorizing or deleting a problem changes category co-occurrence
+            _cache.invalidate_prefix("cooccurrence:")
+    elif entity == "category":
+        _cache.invalidate("categories")
+        if change["op"] != "create":
+            # Problem payloads embed category names, so renames and deletes touch every problem
+            _cache.invalidate_prefix("problem:")
+            _cache.invalidate_prefix("cooccurrence:")
+    else:
+        _cache.clear()
@@ -0,0 +1,145 @@
+import inspect
+import threading
+from functools import wraps
+from app.db.database import reads_own_writes, replica_seq
+from app.db.deadlines import is_cancellation
+
+
+class _Call:
+    """ A single in-flight execution that followers can wait on. """
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share the same key.
+
+    The first caller for a key (the leader) runs the function; every caller that arrives
+    while the leader is still running waits for it and receives the same result, or the
+    same exception. Once the leader finishes, the key is forgotten, so later calls run
+    again - this is request coalescing, not caching.
+
+    The exception is a cancellation of the leader's own request (its client disconnected
+    or its route's statement_timeout fired, see app.db.deadlines): that is not an answer
+    for the followers, so they run the call again, coalescing among themselves, under
+    their own deadlines.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.retried = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) once per key among concurrent callers.
+
+        Parameters:
+            key (Hashable): The identity of the call; callers with equal keys are coalesced.
+            fn (Callable): The function to execute when this caller is the leader.
+
+        Returns:
+            The result of fn, shared between the leader and all followers.
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                if is_cancellation(call.error):
+                    with self._lock:
+                        self.retried += 1
+                    return self.do(key, fn, *args, **kwargs)
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """ Number of keys currently being fetched by a leader. """
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        """ Snapshot of the call counters for this group. """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "retried": self.retried,
+                "in_flight": len(self._calls),
+            }
+
+
+_groups = {}
+
+
+def coalesce(func):
+    """
+    Decorator that coalesces concurrent identical calls to a CRUD read function.
+
+    The wrapped function must take the database session as its first parameter. The
+    session is excluded from the key: followers reuse the leader's result and never
+    touch their own session, so they do not check out a pooled connection either.
+    Results are shared between requests and must be treated as read-only.
+
+    Replica and primary sessions never share a call, so a primary read cannot receive a
+    lagging replica's result, and clients inside their read-your-writes window do not
+    coalesce at all.
+    """
+    signature = inspect.signature(func)
+    session_param = next(iter(signature.parameters))
+    group = SingleFlight(func.__qualname__)
+    _groups[f"{func.__module__}.{func.__qualname__}"] = group
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        db = bound.arguments[session_param]
+        if reads_own_writes(db):
+            return func(*args, **kwargs)
+        bound.apply_defaults()
+        key = (replica_seq(db) is not None,) + tuple(
+            (name, value) for name, value in bound.arguments.items() if name != session_param)
+        return group.do(key, func, *args, **kwargs)
+
+    wrapper.singleflight = group
+    return wrapper
+
+
+def coalesce_stats() -> dict:
+    """
+    Returns the coalescing counters of every decorated function.
+
+    Returns:
+        dict: Mapping of "module.function" to its calls/executions/coalesced/retried/in_flight counters.
+    """
+    return {name: group.stats() for name, group in _groups.items()}
@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+FRESH = "hit"
+STALE = "stale"
+MISS = "miss"
+
+
+def normalize_key(name: str, **params) -> tuple:
+    """
+    Builds a cache key from a query name and its parameters.
+
+    Parameters that are None are dropped and the rest are sorted by name, so equivalent
+    queries map to the same entry regardless of argument order.
+
+    Parameters:
+        name (str): The query name, e.g. "problems".
+        **params: The query parameters (pagination and filters).
+
+    Returns:
+        tuple: A hashable, normalized key.
+    """
+    return (name,) + tuple(sorted((key, value) for key, value in params.items() if value is not None))
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "refreshing")
+
+    def __init__(self, value, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.refreshing = False
+
+
+class StaleWhileRevalidateCache:
+    """
+    Response cache that keeps serving expired entries while one background refresh runs.
+
+    An entry is fresh for ttl_seconds, then stale for a further stale_seconds. A stale read
+    returns the old value immediately and schedules a single refresh for that key; only a
+    miss, or an entry older than the stale window, is computed on the request path.
+
+    Background refreshes cannot use the request's database session, so they open their own
+    from session_factory. A value is only stored if is_current(session) holds once it has
+    been computed; otherwise it is returned (inline) or dropped (refresh) and the entry is
+    left as it was, so a lagging replica cannot replace a page with an older one.
+    """
+
+    def __init__(self, session_factory, ttl_seconds: float, stale_seconds: float, max_entries: int, refresh_workers: int = 2,
+                 is_current=None):
+        self.session_factory = session_factory
+        self.is_current = is_current or (lambda db: True)
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="swr-refresh")
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.generation = 0
+        self.counts = {FRESH: 0, STALE: 0, MISS: 0, "refreshes": 0, "refresh_errors": 0, "not_current": 0}
+
+    def get_or_load(self, key, loader, db):
+        """
+        Returns the cached value for key, loading it with loader(db) on a miss.
+
+        Parameters:
+            key (Hashable): The normalized query key (see normalize_key).
+            loader (Callable[[Session], Any]): Computes the value from a database session.
+            db (Session): The request's session, used only when the value is computed inline.
+
+        Returns:
+            tuple: (value, state) where state is "hit", "stale" or "miss".
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.stale_until:
+                self._entries.move_to_end(key)
+                if now < entry.fresh_until:
+                    self.counts[FRESH] += 1
+                    return entry.value, FRESH
+                self.counts[STALE] += 1
+                if not entry.refreshing:
+                    entry.refreshing = True
+                    self._executor.submit(self._refresh, key, loader)
+                return entry.value, STALE
+            self.counts[MISS] += 1
+            generation = self.generation
+
+        value = loader(db)
+        if self.is_current(db):
+            self._store(key, value, generation)
+        else:
+            with self._lock:
+                self.counts["not_current"] += 1
+        return value, MISS
+
+    def _refresh(self, key, loader):
+        with self._lock:
+            generation = self.generation
+        try:
+            db = self.session_factory()
+            try:
+                value = loader(db)
+                current = self.is_current(db)
+            finally:
+                db.close()
+        except Exception:
+            logger.exception("Background refresh failed for %r", key)
+            with self._lock:
+                self.counts["refresh_errors"] += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+            return
+        with self._lock:
+            if not current:
+                # Leave the stale entry in place; its next read schedules another refresh
+                self.counts["not_current"] += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+                return
+            self.counts["refreshes"] += 1
+        self._store(key, value, generation)
+
+    def _store(self, key, value, generation: int):
+        now = time.monotonic()
+        with self._lock:
+            # A change landed while computing: keep the value but let the next read refresh it
+            fresh_until = now + self.ttl_seconds if generation == self.generation else now
+            self._entries[key] = _Entry(value, fresh_until, now + self.ttl_seconds + self.stale_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def expire_all(self):
+        """ Marks every entry stale so the next read of each triggers a refresh. """
+        with self._lock:
+            self.generation += 1
+            now = time.monotonic()
+            for entry in self._entries.values():
+                entry.fresh_until = now
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counts, "entries": len(self._entries)}
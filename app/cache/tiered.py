@@ -0,0 +1,177 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LocalLRU:
+    """
+    Thread-safe in-process LRU with a per-entry time-to-live.
+
+    Values are stored as-is, so callers share the cached objects and must not mutate them.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LocalSharedTier:
+    """
+    In-process stand-in for the shared cache tier.
+
+    It mirrors the interface a networked store (e.g. Redis) would expose: values are opaque
+    bytes with a time-to-live. Each worker gets its own copy, which is enough to exercise the
+    two-tier path locally and in tests.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return data
+
+    def set(self, key: str, data: bytes):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, data)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache:
+    """
+    Two-tier cache: a local LRU in front of a shared tier.
+
+    Reads check the local LRU, then the shared tier (promoting hits into the LRU). Every
+    invalidation bumps a generation counter; a value computed before an invalidation is
+    not stored, so a read racing with a write cannot put the old row back into the cache.
+    """
+
+    def __init__(self, local: LocalLRU, shared):
+        self.local = local
+        self.shared = shared
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = {"local": 0, "shared": 0}
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str, default=None):
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.hits["local"] += 1
+            return value
+        data = self.shared.get(key)
+        if data is not None:
+            value = pickle.loads(data)
+            self.local.set(key, value)
+            self.hits["shared"] += 1
+            return value
+        self.misses += 1
+        return default
+
+    def set(self, key: str, value, generation: int | None = None):
+        """
+        Stores a value in both tiers.
+
+        Parameters:
+            key (str): The cache key.
+            value: The value to cache; it must be picklable for the shared tier.
+            generation (int, optional): The generation read before computing the value.
+                If an invalidation happened since, the value is discarded.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.local.set(key, value)
+            self.shared.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self.local.delete(key)
+            self.shared.delete(key)
+
+    def invalidate_prefix(self, prefix: str):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self.local.delete_prefix(prefix)
+            self.shared.delete_prefix(prefix)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self.local.clear()
+            self.shared.clear()
+
+    def stats(self) -> dict:
+        return {
+            "local_hits": self.hits["local"],
+            "shared_hits": self.hits["shared"],
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "local_entries": len(self.local),
+        }
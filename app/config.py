@@ -0,0 +1,20 @@
+from functools import lru_cache
+from omegaconf import OmegaConf
+from dotenv import load_dotenv
+load_dotenv()
+
+APP_CONFIG_PATH = "config/app.yaml"
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """
+    Loads the application settings from config/app.yaml.
+
+    The file is read once per process on first use, so importing modules that depend on
+    the settings does not touch the filesystem.
+
+    Returns:
+        DictConfig: The resolved application settings.
+    """
+    return OmegaConf.load(APP_CONFIG_PATH)
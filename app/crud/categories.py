@@ -1,7 +1,54 @@
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 import app.db.models.category as models
+from app.db.models.problem import Problem, problem_category
 import app.schemas.categories as schemas
+from app.cache.singleflight import coalesce
+from app.cache.catalog import cached
+from app.db.events import emit_change
+from app.crud.stats import adjust_stats, drop_bucket, rename_bucket
+from app.observability.tracing import traced
 
+class ParentNotFoundError(LookupError):
+    """ Raised when a category is created or moved under a parent category that does not exist. """
+
+
+# Links a new category under every ancestor of its parent, and to itself
+_LINK_NEW_CATEGORY = text("""
+    INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, :category_id, depth + 1 FROM category_closure WHERE descendant_id = :parent_id
+    UNION ALL SELECT :category_id, :category_id, 0
+""")
+# Detaches a subtree: drops the paths from outside it to inside it, keeping its internal paths
+_DETACH_SUBTREE = text("""
+    DELETE FROM category_closure
+    WHERE descendant_id IN (SELECT descendant_id FROM category_closure WHERE ancestor_id = :category_id)
+      AND ancestor_id NOT IN (SELECT descendant_id FROM category_closure WHERE ancestor_id = :category_id)
+""")
+# Attaches a detached subtree under a new parent: every ancestor of the parent x every node of the subtree
+_ATTACH_SUBTREE = text("""
+    INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+    SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+    FROM category_closure AS above CROSS JOIN category_closure AS below
+    WHERE above.descendant_id = :parent_id AND below.ancestor_id = :category_id
+""")
+# Shortens the paths that ran through a category being deleted and moves its children up
+# to its parent. The category's own closure rows go with it through ON DELETE CASCADE.
+_BYPASS_CATEGORY = text("""
+    WITH target AS (SELECT id, parent_id FROM categories WHERE name = :name),
+    shortened AS (
+        UPDATE category_closure SET depth = depth - 1
+        WHERE ancestor_id IN (SELECT ancestor_id FROM category_closure WHERE descendant_id = (SELECT id FROM target) AND depth > 0)
+          AND descendant_id IN (SELECT descendant_id FROM category_closure WHERE ancestor_id = (SELECT id FROM target) AND depth > 0)
+    )
+    UPDATE categories SET parent_id = (SELECT parent_id FROM target) WHERE parent_id = (SELECT id FROM target)
+""")
+
+@traced()
+@cached("categories")
+@coalesce
 def get_categories(db: Session):
     """
     Retrieves a list of categories from the database.
@@ -19,42 +66,112 @@ def get_categories(db: Session):
     categories_names = [category.name for category in categories]
     return sorted(categories_names)
 
+@traced("category", "min_count", "limit")
+@cached("cooccurrence")
+@coalesce
+def get_category_cooccurrence(db: Session, category: str | None = None, min_count: int = 1, limit: int = 100):
+    """
+    Counts how often categories are assigned to the same problem.
+
+    The problem x category incidence matrix M is built as a SciPy sparse matrix from
+    problem_category in one query, and M.T @ M gives every pair's co-occurrence count on its
+    off-diagonal and every category's problem count on its diagonal. Lift and Jaccard
+    scores follow from those counts as vector operations.
+
+    Parameters:
+        db (Session): The SQLAlchemy session used for querying the database.
+        category (str, optional): Only return pairs that include this category.
+        min_count (int): Leave out pairs sharing fewer problems. Must be positive.
+        limit (int): Maximum number of pairs to return. Must be positive.
+
+    Returns:
+        schemas.CategoryCooccurrence: The number of problems and the pairs, by count then lift, descending.
+
+    Raises:
+        ValueError: If min_count or limit is not positive.
+    """
+    if min_count <= 0 or limit <= 0:
+        raise ValueError("min_count and limit must be positive")
+    problem_count = db.query(func.count(Problem.id)).scalar() or 0
+    links = (
+        db.query(problem_category.c.problem_id, models.Category.name)
+        .join(models.Category, models.Category.id == problem_category.c.category_id)
+        .all()
+    )
+    if not links:
+        return schemas.CategoryCooccurrence(problems=problem_count, pairs=[])
+
+    problem_ids, rows = np.unique(np.array([problem_id for problem_id, _ in links]), return_inverse=True)
+    names, columns = np.unique(np.array([name for _, name in links], dtype=object), return_inverse=True)
+    incidence = sparse.csr_matrix((np.ones(len(links), dtype=np.int64), (rows, columns)),
+                                  shape=(len(problem_ids), len(names)))
+    # A duplicated link row must not count twice
+    incidence.data[:] = 1
+    sizes = np.asarray(incidence.sum(axis=0)).ravel()
+    pairs = sparse.triu(incidence.T @ incidence, k=1).tocoo()
+
+    first, second, counts = pairs.row, pairs.col, pairs.data
+    keep = counts >= min_count
+    if category is not None:
+        keep &= (names[first] == category) | (names[second] == category)
+    first, second, counts = first[keep], second[keep], counts[keep]
+    lift = counts * problem_count / (sizes[first] * sizes[second])
+    jaccard = counts / (sizes[first] + sizes[second] - counts)
+    order = np.lexsort((-lift, -counts))[:limit]
+    return schemas.CategoryCooccurrence(problems=problem_count, pairs=[
+        schemas.CategoryPair(first=names[first[i]], second=names[second[i]], count=int(counts[i]),
+                             lift=round(float(lift[i]), 4), jaccard=round(float(jaccard[i]), 4))
+        for i in order
+    ])
+
+@traced()
 def create_category(db: Session, category: schemas.Category):
     """
     Create a new category in the database, handling the case where the category already exists.
 
     This function takes in a database session and a category creation schema, checks if a category
-    with the same name exists, and if not, creates a new Category model instance, adds it to the session,
-    commits the transaction, and refreshes the instance with the latest data from the database.
+    with the same name exists, and if not, creates a new Category model instance under the given
+    parent, links it into the category_closure table, commits the transaction, and refreshes the
+    instance with the latest data from the database.
 
     Args:
         db (Session): The SQLAlchemy session object used for database transactions.
         category (schemas.Category): The data schema containing the necessary fields
-            for creating a new category (e.g., name).
+            for creating a new category (e.g., name, and optionally the parent name).
 
     Returns:
         models.Category: The newly created Category instance with updated fields (e.g., ID).
 
     Raises:
         Exception: If a category with the specified name already exists.
+        ParentNotFoundError: If the parent category does not exist.
     """
     db_category = db.query(models.Category).filter(models.Category.name == category.name).first()
     if db_category:
         raise Exception("Category already exists")
+    parent = _get_parent(db, category.parent)
     # Create a new category
-    db_category = models.Category(name=category.name)
+    db_category = models.Category(name=category.name, parent_id=parent.id if parent is not None else None)
     db.add(db_category)
+    # The closure rows need the new id
+    db.flush()
+    db.execute(_LINK_NEW_CATEGORY, {"category_id": db_category.id, "parent_id": db_category.parent_id})
+    # An empty category still shows up in /stats
+    adjust_stats(db, {("category", category.name): 0})
+    emit_change(db, "category", "create", category.name)
     db.commit()
     db.refresh(db_category)
     return db_category
 
+@traced()
 def update_category(db: Session, old_category: schemas.Category, new_category: schemas.Category):
     """
     Update an existing category in the database.
 
     This function takes in a database session, the old name of the category to be updated,
     and a new category name. It retrieves the existing category from the database,
-    updates its fields with the new values, and commits the changes.
+    updates its fields with the new values, and commits the changes. If new_category sets
+    parent (None for top level), the category and its whole subtree move under it.
 
     Args:
         db (Session): The SQLAlchemy session object used for database transactions.
@@ -66,22 +183,34 @@ def update_category(db: Session, old_category: schemas.Category, new_category: s
 
     Raises:
         Exception: If the specified category does not exist.
+        ParentNotFoundError: If the new parent does not exist.
+        ValueError: If the new parent is inside the category's own subtree.
     """
     db_category = db.query(models.Category).filter(models.Category.name == old_category.name).first()
     if db_category is None:
         raise Exception(f"Category with name {old_category.name} not found.")
     
     db_category.name = new_category.name
+    rename_bucket(db, "category", old_category.name, new_category.name)
+    change = {"previous_key": old_category.name}
+    # Only an explicit "parent" moves the category; a plain rename leaves it where it is
+    if "parent" in new_category.model_fields_set:
+        parent = _get_parent(db, new_category.parent)
+        _move_subtree(db, db_category, parent)
+        change["parent"] = new_category.parent
+    emit_change(db, "category", "update", new_category.name, **change)
     db.commit()
     db.refresh(db_category)
     return db_category
 
+@traced()
 def delete_category(db: Session, category: schemas.Category):
     """
     Delete a category from the database.
 
     This function takes in a database session and the ID of the category to be deleted.
-    It retrieves the existing category from the database and deletes it.
+    It retrieves the existing category from the database and deletes it. Its child
+    categories move up to its parent.
 
     Args:
         db (Session): The SQLAlchemy session object used for database transactions.
@@ -97,6 +226,39 @@ def delete_category(db: Session, category: schemas.Category):
     if db_category is None:
         raise Exception(f"Category with name {category.name} not found.")
     
+    # Children move up to the deleted category's parent
+    db.execute(_BYPASS_CATEGORY, {"name": category.name})
+    # The statement bypassed the ORM: reload children and closure rows this session already holds
+    db.expire_all()
     db.delete(db_category)
+    drop_bucket(db, "category", category.name)
+    emit_change(db, "category", "delete", category.name)
     db.commit()
-    return True
\ No newline at end of file
+    return True
+
+def _get_parent(db: Session, name):
+    if name is None:
+        return None
+    parent = db.query(models.Category).filter(models.Category.name == name).first()
+    if parent is None:
+        raise ParentNotFoundError(f"Parent category {name} not found.")
+    return parent
+
+def _move_subtree(db: Session, db_category, parent):
+    """
+    Moves a category and all its descendants under parent (None for top level).
+
+    Two statements regardless of the subtree's size: the paths from the old ancestors into
+    the subtree are deleted, then the new parent's ancestors are joined with the subtree.
+    """
+    parent_id = parent.id if parent is not None else None
+    if parent_id is not None:
+        inside = db.query(models.CategoryClosure).filter(
+            models.CategoryClosure.ancestor_id == db_category.id, models.CategoryClosure.descendant_id == parent_id
+        ).first()
+        if inside is not None:
+            raise ValueError(f"Category {parent.name} is inside the subtree of {db_category.name}.")
+    db.execute(_DETACH_SUBTREE, {"category_id": db_category.id})
+    if parent_id is not None:
+        db.execute(_ATTACH_SUBTREE, {"category_id": db_category.id, "parent_id": parent_id})
+    db_category.parent_id = parent_id
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import Session
+from app.db.models.change_log import ChangeLog
+import app.schemas.changes as schemas
+from app.observability.tracing import traced
+
+@traced("since", "limit")
+def get_changes(db: Session, since: int = 0, limit: int = 500):
+    """
+    Retrieves the changes recorded after a cursor.
+
+    Parameters:
+        db (Session): The database session.
+        since (int): The seq of the last change the client has seen; 0 for the whole feed.
+        limit (int): Maximum number of changes to return.
+
+    Returns:
+        ChangePage: The changes in seq order, the cursor for the next call and whether more remain.
+    """
+    if since < 0 or limit <= 0:
+        raise ValueError("since must be non-negative and limit must be positive")
+    rows = db.query(ChangeLog).filter(ChangeLog.id > since).order_by(ChangeLog.id).limit(limit + 1).all()
+    changes = [schemas.Change(
+        seq=row.id, entity=row.entity, op=row.op, key=row.key, data=row.data or {}, changed_at=row.changed_at,
+    ) for row in rows[:limit]]
+    return schemas.ChangePage(
+        changes=changes,
+        cursor=changes[-1].seq if changes else since,
+        has_more=len(rows) > limit,
+    )
@@ -1,11 +1,19 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session, selectinload
 import json
-from app.db.models.problem import Problem
+from app.db.models.problem import Problem, problem_category
 from app.db.models.solution import Solution
-from app.db.models.category import Category
+from app.db.models.category import Category, CategoryClosure
 import app.schemas.problems as schemas
 from app.extras import compare_approaches
+from app.cache.singleflight import coalesce
+from app.cache.catalog import cached
+from app.db.events import emit_change
+from app.crud.stats import adjust_stats, bucket_deltas, problem_buckets
+from app.observability.tracing import traced
 
+@traced("skip", "limit")
+@coalesce
 def get_problems(db: Session, skip: int = 0, limit: int = 10):
     """
     Retrieves a list of problems from the database using pagination.
@@ -21,8 +29,22 @@ def get_problems(db: Session, skip: int = 0, limit: int = 10):
     if skip < 0 or limit <= 0:
         raise ValueError("Invalid pagination parameters")
     
-    problems = db.query(Problem).offset(skip).limit(limit).all()
-    return [schemas.ProblemOut(
+    # Load the relationships for the whole page in one query each instead of three per problem
+    problems = (
+        db.query(Problem)
+        .options(
+            selectinload(Problem.categories),
+            selectinload(Problem.solutions),
+            selectinload(Problem.real_world_examples),
+        )
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [_problem_out(problem) for problem in problems]
+
+def _problem_out(problem: Problem):
+    return schemas.ProblemOut(
         slug_id=problem.slug_id,
         title=problem.title,
         difficulty=problem.difficulty,
@@ -34,8 +56,128 @@ def get_problems(db: Session, skip: int = 0, limit: int = 10):
         best_space_complexity=problem.best_space_complexity,
         solutions=[schemas.Solution(**solution.__dict__) for solution in problem.solutions] if problem.solutions else [],
         real_world_applications=[schemas.RealWorldExample(**example.__dict__) for example in problem.real_world_examples] if problem.real_world_examples else []
-    ) for problem in problems]
+    )
+
+@traced()
+def get_problems_by_slugs(db: Session, slugs: list):
+    """
+    Loads the given problems, in the given order, e.g. one page of an index query.
+
+    Parameters:
+        db (Session): The database session.
+        slugs (List[str]): The slug_ids to load. Problems deleted meanwhile are left out.
+
+    Returns:
+        List[schemas.ProblemOut]: The problems, in the order of slugs.
+    """
+    if not slugs:
+        return []
+    problems = (
+        db.query(Problem)
+        .options(
+            selectinload(Problem.categories),
+            selectinload(Problem.solutions),
+            selectinload(Problem.real_world_examples),
+        )
+        .filter(Problem.slug_id.in_(slugs))
+        .all()
+    )
+    by_slug = {problem.slug_id: problem for problem in problems}
+    return [_problem_out(by_slug[slug]) for slug in slugs if slug in by_slug]
+
+@traced("category", "include_descendants", "skip", "limit")
+def get_problems_in_category(db: Session, category: str, include_descendants: bool = True, skip: int = 0, limit: int = 50):
+    """
+    Retrieves the problems of a category, optionally including all its subcategories.
+
+    Descendants come from the category_closure table, so the whole subtree is one indexed
+    join however deep it is.
+
+    Parameters:
+        db (Session): The database session.
+        category (str): The category name.
+        include_descendants (bool): Also return problems of every subcategory, at any depth.
+        skip (int): The number of problems to skip. Must be non-negative.
+        limit (int): The maximum number of problems to return. Must be positive.
+
+    Returns:
+        List[schemas.ProblemOut]: The problems, by id, each listed once.
+
+    Raises:
+        ValueError: If the category does not exist or the pagination parameters are invalid.
+    """
+    if skip < 0 or limit <= 0:
+        raise ValueError("Invalid pagination parameters")
+    db_category = db.query(Category).filter(Category.name == category).first()
+    if not db_category:
+        raise ValueError(f"Category with name '{category}' not found.")
+    members = db.query(problem_category.c.problem_id)
+    if include_descendants:
+        members = members.join(CategoryClosure, CategoryClosure.descendant_id == problem_category.c.category_id).filter(
+            CategoryClosure.ancestor_id == db_category.id)
+    else:
+        members = members.filter(problem_category.c.category_id == db_category.id)
+    problems = (
+        db.query(Problem)
+        .options(
+            selectinload(Problem.categories),
+            selectinload(Problem.solutions),
+            selectinload(Problem.real_world_examples),
+        )
+        # A semi-join, so a problem in several categories of the subtree appears once
+        .filter(Problem.id.in_(members.scalar_subquery()))
+        .order_by(Problem.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [_problem_out(problem) for problem in problems]
+
+SEARCH_MODES = ("fuzzy", "contains")
+
+@traced("mode", "limit")
+def search_problems(db: Session, q: str, mode: str = "fuzzy", limit: int = 20, threshold: float = 0.4):
+    """
+    Searches problems by title and slug_id using the trigram GIN indexes.
+
+    In "fuzzy" mode a problem matches when some run of words in its title or slug is
+    similar enough to q (pg_trgm word_similarity above threshold), so typos such as
+    "two sume" still find "Two Sum"; results are ranked by that similarity. In "contains"
+    mode the title or slug must contain q, case-insensitively, shortest title first.
 
+    Parameters:
+        db (Session): The database session.
+        q (str): The search text. Must not be blank.
+        mode (str): "fuzzy" or "contains".
+        limit (int): The maximum number of problems to return. Must be positive.
+        threshold (float): Minimum word similarity for fuzzy matches, between 0 and 1.
+
+    Returns:
+        List[schemas.ProblemOut]: The matching problems, best match first.
+
+    Raises:
+        ValueError: If q is blank, or mode, limit or threshold is invalid.
+    """
+    q = q.strip()
+    if not q or mode not in SEARCH_MODES or limit <= 0 or not 0 <= threshold <= 1:
+        raise ValueError(f"Invalid search parameters: q must not be blank, mode one of {', '.join(SEARCH_MODES)}, limit positive and threshold between 0 and 1")
+    query = db.query(Problem).options(
+        selectinload(Problem.categories),
+        selectinload(Problem.solutions),
+        selectinload(Problem.real_world_examples),
+    )
+    if mode == "fuzzy":
+        # Transaction-local, like the statement timeout; %> compares against this threshold
+        db.execute(text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"), {"threshold": str(threshold)})
+        rank = func.greatest(func.word_similarity(q, Problem.title), func.word_similarity(q, Problem.slug_id))
+        query = query.filter(Problem.title.op("%>", is_comparison=True)(q) | Problem.slug_id.op("%>", is_comparison=True)(q)).order_by(rank.desc(), Problem.id)
+    else:
+        query = query.filter(Problem.title.icontains(q, autoescape=True) | Problem.slug_id.icontains(q, autoescape=True)).order_by(func.length(Problem.title), Problem.id)
+    return [_problem_out(problem) for problem in query.limit(limit).all()]
+
+@traced("slug_id")
+@cached("problem")
+@coalesce
 def get_problem(db: Session, slug_id: str):
     # check if problem with the given slug_id exists
     problem = db.query(Problem).filter(Problem.slug_id == slug_id).first() 
@@ -57,6 +199,7 @@ def get_problem(db: Session, slug_id: str):
     }
     return schemas.ProblemOut(**problem_out)
 
+@traced()
 def create_problem(db: Session, problem: schemas.ProblemIn):
     
     # Check for existing problem with the same slug_id
@@ -83,6 +226,8 @@ def create_problem(db: Session, problem: schemas.ProblemIn):
     )
     
     db.add(db_problem)
+    adjust_stats(db, bucket_deltas(added=problem_buckets(problem.difficulty, problem.categories, "NA", "NA")))
+    emit_change(db, "problem", "create", problem.slug_id)
     db.commit()
     db.refresh(db_problem)
 
@@ -102,6 +247,7 @@ def create_problem(db: Session, problem: schemas.ProblemIn):
     }
     return schemas.ProblemOut(**problem_out)
 
+@traced("problem_id")
 def add_solution_to_problem(db: Session, problem_id: int, solution: schemas.Solution):
     problem = db.query(Problem).filter(Problem.slug_id == problem_id).first() 
     if not problem:
@@ -118,11 +264,17 @@ def add_solution_to_problem(db: Session, problem_id: int, solution: schemas.Solu
                         space_complexity=solution.space_complexity,
                         problem_id=problem.id)
     db.add(solution)
-    db.commit()
-    db.refresh(solution)
+    # Flushed, not committed: the solution, the stats and the change commit together
+    db.flush()
 
     # Update the problem's best time and space complexity if the new solution is better
+    previous_best = [("best_time_complexity", problem.best_time_complexity or "NA"), ("best_space_complexity", problem.best_space_complexity or "NA")]
     problem.best_time_complexity, problem.best_space_complexity = compare_approaches(solution.time_complexity, solution.space_complexity, problem.best_time_complexity, problem.best_space_complexity)
+    adjust_stats(db, bucket_deltas(
+        removed=previous_best,
+        added=[("best_time_complexity", problem.best_time_complexity or "NA"), ("best_space_complexity", problem.best_space_complexity or "NA")],
+    ))
+    emit_change(db, "solution", "create", problem.slug_id, solution=solution.name)
     db.commit()
     solution_op = {
         "name": solution.name,
@@ -133,6 +285,7 @@ def add_solution_to_problem(db: Session, problem_id: int, solution: schemas.Solu
     }
     return schemas.Solution(**solution_op)
 
+@traced("problem_id")
 def update_problem(db: Session, problem_id: int, problem_update: schemas.ProblemIn):
     db_problem = db.query(Problem).filter(Problem.slug_id == problem_id).first()
     # Check if the problem exists
@@ -143,6 +296,8 @@ def update_problem(db: Session, problem_id: int, problem_update: schemas.Problem
         categories = db.query(Category).filter(Category.name.in_(problem_update.categories)).all()
         if len(categories) != len(problem_update.categories):
             raise ValueError("One or more categories do not exist.")
+    previous_buckets = problem_buckets(db_problem.difficulty, [cat.name for cat in db_problem.categories],
+                                       db_problem.best_time_complexity, db_problem.best_space_complexity)
     
     # Update scalar attributes
     for key, value in problem_update.__dict__.items():
@@ -160,7 +315,13 @@ def update_problem(db: Session, problem_id: int, problem_update: schemas.Problem
     db_problem.examples = problem_update.examples
     db_problem.clarifying_questions = problem_update.clarifying_questions
     db_problem.categories = categories
+    adjust_stats(db, bucket_deltas(
+        removed=previous_buckets,
+        added=problem_buckets(db_problem.difficulty, [cat.name for cat in categories],
+                              db_problem.best_time_complexity, db_problem.best_space_complexity),
+    ))
     
+    emit_change(db, "problem", "update", problem_update.slug_id, previous_key=problem_id)
     db.commit()
     db.refresh(db_problem)
 
@@ -180,14 +341,20 @@ def update_problem(db: Session, problem_id: int, problem_update: schemas.Problem
     }
     return problem_op
 
+@traced("problem_id")
 def delete_problem(db: Session, problem_id: int):
     db_problem = db.query(Problem).filter(Problem.slug_id == problem_id).first()
     if not db_problem:
         raise ValueError(f"Problem with slug_id '{problem_id}' not found.")
+    adjust_stats(db, bucket_deltas(removed=problem_buckets(
+        db_problem.difficulty, [cat.name for cat in db_problem.categories],
+        db_problem.best_time_complexity, db_problem.best_space_complexity)))
     db.delete(db_problem)
+    emit_change(db, "problem", "delete", problem_id)
     db.commit()
     return db_problem
 
+@traced("problem_id", "solution_name")
 def update_solution(db: Session, solution_name: str, problem_id: int, solution_update: schemas.Solution):
     # Check if the problem exists
     db_problem = db.query(Problem).filter(Problem.slug_id == problem_id).first()
@@ -202,10 +369,12 @@ def update_solution(db: Session, solution_name: str, problem_id: int, solution_u
         setattr(db_solution, key, value)
     
     # Update the solution in the database
+    emit_change(db, "solution", "update", problem_id, solution=solution_name)
     db.commit()
     db.refresh(db_solution)
     return db_solution
 
+@traced("problem_id", "solution_name")
 def delete_solution(db: Session, solution_name: str, problem_id: int):
     # Check if the problem exists
     db_problem = db.query(Problem).filter(Problem.slug_id == problem_id).first()
@@ -217,5 +386,6 @@ def delete_solution(db: Session, solution_name: str, problem_id: int):
         raise ValueError(f"Solution with name '{solution_name}' not found in problem '{problem_id}'.")
     # Delete the solution
     db.delete(db_solution)
+    emit_change(db, "solution", "delete", problem_id, solution=solution_name)
     db.commit()
     return db_solution
\ No newline at end of file
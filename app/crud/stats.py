@@ -0,0 +1,130 @@
+from collections import Counter
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.db.events import CHANGE_LOG_LOCK
+from app.db.models.catalog_stats import CatalogStats
+from app.db.models.category import Category
+from app.db.models.problem import Problem, problem_category
+import app.schemas.stats as schemas
+from app.observability.tracing import traced
+
+TOTAL = ("total", "all")
+DIMENSIONS = ("difficulty", "category", "best_time_complexity", "best_space_complexity")
+
+def problem_buckets(difficulty, categories, best_time_complexity, best_space_complexity):
+    """
+    Lists the statistics buckets a problem counts towards.
+
+    Parameters:
+        difficulty (str): The problem's difficulty.
+        categories (List[str]): The names of its categories.
+        best_time_complexity (str): Its best time complexity; None counts as "NA".
+        best_space_complexity (str): Its best space complexity; None counts as "NA".
+
+    Returns:
+        List[Tuple[str, str]]: (dimension, bucket) pairs, including the overall total.
+    """
+    return [
+        TOTAL,
+        ("difficulty", difficulty),
+        *(("category", name) for name in categories),
+        ("best_time_complexity", best_time_complexity or "NA"),
+        ("best_space_complexity", best_space_complexity or "NA"),
+    ]
+
+def bucket_deltas(removed=(), added=()):
+    """ Turns the buckets a problem left and joined into per-bucket count changes, dropping zeros. """
+    deltas = Counter(added)
+    deltas.subtract(Counter(removed))
+    return {key: delta for key, delta in deltas.items() if delta}
+
+def adjust_stats(db: Session, deltas: dict):
+    """
+    Applies count changes to catalog_stats in the current transaction.
+
+    Buckets are created on first use. Keys are applied in sorted order so concurrent
+    writers lock rows in the same order. Call this before db.commit().
+
+    Parameters:
+        db (Session): The session performing the write.
+        deltas (dict): Mapping of (dimension, bucket) to the change in count; a 0 change
+            just makes sure the bucket exists.
+    """
+    if not deltas:
+        return
+    rows = [{"dimension": dimension, "bucket": str(bucket), "count": delta} for (dimension, bucket), delta in sorted(deltas.items(), key=lambda item: (item[0][0], str(item[0][1])))]
+    statement = insert(CatalogStats).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[CatalogStats.dimension, CatalogStats.bucket],
+        set_={"count": CatalogStats.count + statement.excluded.count},
+    ))
+
+def rename_bucket(db: Session, dimension: str, old: str, new: str):
+    """ Renames a bucket in the current transaction, e.g. when a category is renamed. """
+    db.query(CatalogStats).filter(CatalogStats.dimension == dimension, CatalogStats.bucket == old).update(
+        {CatalogStats.bucket: new}, synchronize_session=False)
+
+def drop_bucket(db: Session, dimension: str, bucket: str):
+    """ Removes a bucket in the current transaction, e.g. when a category is deleted. """
+    db.query(CatalogStats).filter(CatalogStats.dimension == dimension, CatalogStats.bucket == bucket).delete(
+        synchronize_session=False)
+
+@traced()
+def get_stats(db: Session):
+    """
+    Reads the precomputed catalog statistics.
+
+    Parameters:
+        db (Session): The database session.
+
+    Returns:
+        CatalogStatsOut: Problem counts overall, per difficulty, per category and per best complexity.
+    """
+    stats = {dimension: {} for dimension in DIMENSIONS}
+    total = 0
+    for row in db.query(CatalogStats).all():
+        if (row.dimension, row.bucket) == TOTAL:
+            total = row.count
+        elif row.dimension in stats:
+            stats[row.dimension][row.bucket] = row.count
+    return schemas.CatalogStatsOut(
+        total=total,
+        by_difficulty=stats["difficulty"],
+        by_category=stats["category"],
+        by_best_time_complexity=stats["best_time_complexity"],
+        by_best_space_complexity=stats["best_space_complexity"],
+    )
+
+def rebuild_stats(db: Session):
+    """
+    Recomputes catalog_stats from the problems and categories tables and commits.
+
+    Takes the change-log lock first, so no write can commit an increment between the
+    recount and the commit.
+
+    Parameters:
+        db (Session): The database session.
+
+    Returns:
+        int: The number of buckets written.
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOG_LOCK})
+    deltas = {TOTAL: db.query(func.count(Problem.id)).scalar()}
+    for column, dimension in ((Problem.difficulty, "difficulty"),
+                              (func.coalesce(Problem.best_time_complexity, "NA"), "best_time_complexity"),
+                              (func.coalesce(Problem.best_space_complexity, "NA"), "best_space_complexity")):
+        for bucket, count in db.query(column, func.count(Problem.id)).group_by(column).all():
+            deltas[(dimension, bucket)] = count
+    category_counts = (
+        db.query(Category.name, func.count(problem_category.c.problem_id))
+        .outerjoin(problem_category, problem_category.c.category_id == Category.id)
+        .group_by(Category.name)
+        .all()
+    )
+    for name, count in category_counts:
+        deltas[("category", name)] = count
+    db.query(CatalogStats).delete(synchronize_session=False)
+    adjust_stats(db, deltas)
+    db.commit()
+    return len(deltas)
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+from app.config import get_settings
+from app.db import events
+from app.observability import metrics
+
+logger = logging.getLogger(__name__)
+
+RESYNC = {"entity": "*", "op": "resync", "key": "*"}
+
+
+class Subscription:
+    """ One client's bounded queue of pending change events. """
+
+    def __init__(self, buffer_size: int):
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    async def next(self, timeout: float):
+        """
+        Waits for the next change.
+
+        Returns:
+            dict or None: The change, or None if nothing arrived within timeout seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broadcaster:
+    """
+    Fans committed catalog changes out to the event-stream clients of this worker.
+
+    It subscribes to app.db.events, so it receives this worker's own commits and, through
+    the one change listener per worker, everyone else's. Changes may arrive on any thread
+    and are handed to the event loop with call_soon_threadsafe.
+
+    Each client has a queue of at most buffer_size events. A client that falls that far
+    behind is not allowed to hold memory or slow anyone down: its queue is dropped and it
+    is told to resync. Reconnecting clients catch up from the change_log (see
+    app.routers.events), so nothing is kept here beyond the queues.
+    """
+
+    def __init__(self, buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self.subscriptions = set()
+        self._loop = None
+
+    def start(self, loop):
+        self._loop = loop
+
+    def stop(self):
+        self._loop = None
+        for subscription in list(self.subscriptions):
+            self._overflow(subscription)
+        self.subscriptions.clear()
+
+    def publish(self, change: dict):
+        """ Queues a change for delivery; callable from any thread. """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, change)
+        except RuntimeError:
+            # The loop closed between the check and the call
+            pass
+
+    def _deliver(self, change: dict):
+        for subscription in list(self.subscriptions):
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(change)
+            except asyncio.QueueFull:
+                metrics.sse_dropped.inc()
+                self._overflow(subscription)
+
+    @staticmethod
+    def _overflow(subscription: Subscription):
+        subscription.overflowed = True
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(RESYNC)
+
+    def subscribe(self) -> Subscription:
+        """ Registers a client; must be called on the event loop. """
+        subscription = Subscription(self.buffer_size)
+        self.subscriptions.add(subscription)
+        metrics.sse_subscribers.set(value=len(self.subscriptions))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+        metrics.sse_subscribers.set(value=len(self.subscriptions))
+
+
+def format_event(change: dict) -> str:
+    """
+    Formats a change as a Server-Sent Events message.
+
+    The event type is the entity ("problem", "solution", "category"), or "resync" when the
+    client must reload its state; the id is the change_log sequence number.
+    """
+    lines = []
+    if change.get("seq") is not None:
+        lines.append(f"id: {change['seq']}")
+    lines.append(f"event: {'resync' if change['entity'] == '*' else change['entity']}")
+    lines.append(f"data: {json.dumps({name: value for name, value in change.items() if name != 'origin'})}")
+    return "\n".join(lines) + "\n\n"
+
+
+_broadcaster = None
+
+
+def get_broadcaster() -> Broadcaster:
+    """ Returns the process-wide broadcaster, creating it (and its event subscription) on first use. """
+    global _broadcaster
+    if _broadcaster is None:
+        settings = get_settings().events.stream
+        _broadcaster = Broadcaster(buffer_size=settings.buffer_size)
+        events.subscribe(_broadcaster.publish)
+    return _broadcaster
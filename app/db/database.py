@@ -1,19 +1,124 @@
-from sqlalchemy import create_engine
+from functools import lru_cache
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from omegaconf import OmegaConf
 from dotenv import load_dotenv
 load_dotenv()
 
-config = OmegaConf.load("config/db.yaml")
+DB_CONFIG_PATH = "config/db.yaml"
 
+# Unbound on purpose: sessions are bound to the engine when they are created (see get_session)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
-SQLALCHEMY_DATABASE_URL = f'postgresql://{config.db.username}:{config.db.password}@{config.db.host}:{config.db.port}/{config.db.name}'
+Base = declarative_base()
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Session.info keys describing what a read session can see (see get_read_session and app.db.utils.get_read_db)
+REPLICA_SEQ = "replica_seq"
+READS_OWN_WRITES = "reads_own_writes"
 
-Base = declarative_base()
+
+@lru_cache(maxsize=None)
+def get_db_config():
+    """ Loads config/db.yaml on first use rather than at import time. """
+    return OmegaConf.load(DB_CONFIG_PATH)
+
+
+def get_database_url(section: str = "db") -> str:
+    """ Builds the URL of the primary ("db") or of the read replica ("replica"). """
+    config = get_db_config()[section]
+    return f'postgresql://{config.username}:{config.password}@{config.host}:{config.port}/{config.name}'
+
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """
+    Returns the process-wide engine, creating it on first use.
+
+    Creating the engine does not open a connection; the pool connects when a session
+    first needs one. Importing the application therefore never touches the database.
+
+    Returns:
+        Engine: The SQLAlchemy engine.
+    """
+    return create_engine(get_database_url())
+
+
+@lru_cache(maxsize=None)
+def get_read_engine():
+    """
+    Returns the engine for read-only work, creating it on first use.
+
+    With a replica configured this is a separate engine and pool pointed at it. Otherwise
+    it shares the primary's pool, and every transaction runs READ ONLY DEFERRABLE, so a
+    read route can never write and long reads do not hold back serializable writers.
+
+    Returns:
+        Engine: The read engine.
+    """
+    if get_db_config().replica.enabled:
+        return create_engine(get_database_url("replica"))
+    return get_engine().execution_options(postgresql_readonly=True, postgresql_deferrable=True)
+
+
+def get_session():
+    """
+    Creates a new session bound to the lazily created engine.
+
+    Returns:
+        Session: A new SQLAlchemy session; the caller is responsible for closing it.
+    """
+    return SessionLocal(bind=get_engine())
+
+
+def get_read_session():
+    """
+    Creates a new read-only session bound to the read engine (see get_read_engine).
+
+    A replica session first records the last change_log id the replica has replayed, before
+    it reads anything else, so caches can tell whether its results are current (see
+    reflects_seen_changes).
+
+    Returns:
+        Session: A new SQLAlchemy session; the caller is responsible for closing it.
+    """
+    session = SessionLocal(bind=get_read_engine())
+    if get_db_config().replica.enabled:
+        session.info[REPLICA_SEQ] = session.execute(text("SELECT coalesce(max(id), 0) FROM change_log")).scalar_one()
+    return session
+
+
+def _session_info(db) -> dict:
+    info = getattr(db, "info", None)
+    return info if isinstance(info, dict) else {}
+
+
+def reads_own_writes(db) -> bool:
+    """ Tells whether db serves a client inside its read-your-writes window (see app.db.utils.get_read_db). """
+    return bool(_session_info(db).get(READS_OWN_WRITES))
+
+
+def replica_seq(db):
+    """
+    Returns the change_log id a replica session had replayed when it was opened, or None
+    for a session on the primary.
+    """
+    return _session_info(db).get(REPLICA_SEQ)
 
 
+def dispose_engine(close: bool = True):
+    """
+    Discards the engines' connection pools, if engines were created, and forgets the engines.
 
+    Parameters:
+        close (bool): Close the pooled connections. Pass False in a freshly forked child so
+            it drops the parent's connections without closing sockets the parent still uses.
+    """
+    if get_read_engine.cache_info().currsize:
+        # Without a replica this shares the primary's pool, which is disposed below
+        if get_db_config().replica.enabled:
+            get_read_engine().dispose(close=close)
+        get_read_engine.cache_clear()
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=close)
+        get_engine.cache_clear()
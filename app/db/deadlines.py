@@ -0,0 +1,127 @@
+import logging
+import threading
+from contextvars import ContextVar
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_default_ms = None
+_route_ms = {}
+
+# Set by DeadlineMiddleware for each HTTP request; copied into the threadpool with the context
+current_deadline = ContextVar("current_deadline", default=None)
+
+
+class RequestDeadline:
+    """
+    Statement timeout and in-flight driver connections of one HTTP request.
+
+    The route is looked up lazily: the router only records the matched route in the scope
+    once it has run, which is before the handler opens its first transaction.
+    """
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.cancelled = False
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def timeout_ms(self):
+        route = getattr(self.scope.get("route"), "path", None)
+        return _route_ms.get(f"{self.scope['method']} {route}", _default_ms)
+
+    def statement_started(self, driver_connection):
+        with self._lock:
+            self._running.add(driver_connection)
+            return self.cancelled
+
+    def statement_finished(self, driver_connection):
+        with self._lock:
+            self._running.discard(driver_connection)
+
+    def cancel(self):
+        """
+        Cancels the statements this request is running and makes later ones fail fast.
+
+        Blocks while the cancel requests are sent, so call it from a worker thread.
+        """
+        with self._lock:
+            self.cancelled = True
+            running = list(self._running)
+        for driver_connection in running:
+            try:
+                driver_connection.cancel()
+            except Exception:
+                logger.exception("Could not cancel the statement of a disconnected request")
+
+
+def configure_statement_timeouts(default_ms, routes=None):
+    """
+    Applies a statement_timeout to every ORM transaction.
+
+    The timeout is set with set_config(..., true), so it only lasts until the transaction
+    ends and never leaks to the next user of the pooled connection.
+
+    Parameters:
+        default_ms (int or None): Timeout for routes not listed in routes, and for sessions
+            opened outside a request (e.g. background cache refreshes). None leaves the
+            server default in place.
+        routes (dict, optional): Mapping of "METHOD /route/{template}" to a timeout in ms.
+    """
+    global _default_ms, _route_ms
+    _default_ms = default_ms
+    _route_ms = dict(routes or {})
+    if not event.contains(Session, "after_begin", _apply_statement_timeout):
+        event.listen(Session, "after_begin", _apply_statement_timeout)
+        event.listen(Engine, "before_cursor_execute", _track_statement)
+        event.listen(Engine, "after_cursor_execute", _untrack_statement)
+        event.listen(Engine, "handle_error", _untrack_failed_statement)
+
+
+def _apply_statement_timeout(session, transaction, connection):
+    deadline = current_deadline.get()
+    timeout = deadline.timeout_ms() if deadline is not None else _default_ms
+    if timeout:
+        connection.execute(text("SELECT set_config('statement_timeout', :timeout, true)"), {"timeout": f"{int(timeout)}ms"})
+
+
+class RequestCancelled(Exception):
+    """ Raised instead of running a statement for a request whose client has disconnected. """
+
+
+# SQLSTATE query_canceled: a statement cancelled by RequestDeadline.cancel or by statement_timeout
+QUERY_CANCELED = "57014"
+
+
+def is_cancellation(err: BaseException) -> bool:
+    """
+    Tells whether an error means a request's own deadline stopped its query, rather than
+    that the query itself failed.
+
+    Such an error is specific to the request that ran the query: another request asking for
+    the same data has its own deadline and should run the query itself.
+    """
+    orig = getattr(err, "orig", None)
+    return (isinstance(err, RequestCancelled) or isinstance(orig, RequestCancelled)
+            or getattr(orig, "pgcode", None) == QUERY_CANCELED)
+
+
+def _track_statement(conn, cursor, statement, parameters, context, executemany):
+    deadline = current_deadline.get()
+    if deadline is not None and deadline.statement_started(conn.connection.driver_connection):
+        deadline.statement_finished(conn.connection.driver_connection)
+        raise RequestCancelled("The client disconnected before the statement was sent")
+
+
+def _untrack_statement(conn, cursor, statement, parameters, context, executemany):
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.statement_finished(conn.connection.driver_connection)
+
+
+def _untrack_failed_statement(exception_context):
+    deadline = current_deadline.get()
+    if deadline is not None and exception_context.connection is not None:
+        deadline.statement_finished(exception_context.connection.connection.driver_connection)
@@ -0,0 +1,268 @@
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import weakref
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Changes recorded by a session that has not committed yet
+_pending = weakref.WeakKeyDictionary()
+_pending_lock = threading.Lock()
+_subscribers = []
+_data_version = 0
+# Highest change_log id among the changes this process has seen
+_seen_seq = 0
+# Advisory lock key serializing change_log writers, so sequence order matches commit order
+CHANGE_LOG_LOCK = 0x7a656e6974680001
+_APPEND_AND_NOTIFY = text("""
+    WITH entry AS (
+        INSERT INTO change_log (entity, op, key, data) VALUES (:entity, :op, :key, CAST(:data AS json))
+        RETURNING id
+    )
+    SELECT entry.id, pg_notify(:channel, CAST(CAST(:payload AS jsonb) || jsonb_build_object('seq', entry.id) AS text))
+    FROM entry
+""")
+
+
+def origin() -> str:
+    """ Identifies this worker process; evaluated per call so forked workers differ. """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def subscribe(callback):
+    """
+    Registers a callback for committed catalog changes.
+
+    The callback receives a change dict with at least "entity", "op" and "key". It is called
+    from the committing thread (for changes made by this process) or from the listener thread
+    (for changes made by other workers), so it must be quick and must not issue SQL.
+    A change with entity "*" means notifications may have been missed and all derived state
+    should be dropped.
+
+    Parameters:
+        callback (Callable[[dict], None]): The function to call with each change.
+
+    Returns:
+        Callable: The callback, so this can be used as a decorator.
+    """
+    _subscribers.append(callback)
+    return callback
+
+
+def unsubscribe(callback):
+    """ Removes a callback registered with subscribe(). """
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+def data_version() -> int:
+    """
+    Returns a counter that increases with every change this process has seen.
+
+    Anything derived from catalog data can be keyed by this value to become unreachable
+    as soon as a relevant change is committed, here or in another worker.
+    """
+    return _data_version
+
+
+def reflects_seen_changes(applied_seq=None) -> bool:
+    """
+    Tells whether data read after a replica had replayed change_log up to applied_seq
+    includes every change this process has seen, and so may be cached.
+
+    change_log ids are committed in order (see emit_change), so a replica holding a given id
+    has replayed every earlier change too. Reads from the primary (applied_seq None) are
+    always current.
+
+    Parameters:
+        applied_seq (int): The replica's last change_log id when the read began, as recorded
+            by app.db.database.get_read_session, or None for the primary.
+    """
+    return applied_seq is None or applied_seq >= _seen_seq
+
+
+def _advance_seen_seq(seq):
+    global _seen_seq
+    if seq is not None and seq > _seen_seq:
+        _seen_seq = seq
+
+
+def dispatch(change: dict):
+    """ Delivers a change to every subscriber, isolating subscriber failures. """
+    global _data_version
+    _data_version += 1
+    _advance_seen_seq(change.get("seq"))
+    for callback in list(_subscribers):
+        try:
+            callback(change)
+        except Exception:
+            logger.exception("Change subscriber %r failed", callback)
+
+
+def emit_change(db: Session, entity: str, op: str, key: str, **data):
+    """
+    Records a catalog change as part of the session's current transaction.
+
+    The change is appended to the change_log table and a NOTIFY is queued in the same
+    transaction, so both only take effect if the transaction commits. Subscribers in this
+    process are called right after the commit. Call this before db.commit().
+
+    Writers take a transaction-level advisory lock before appending, so a change_log id is
+    never committed after a larger one: a client that has read up to some id can never
+    miss a smaller one later. Catalog writes are rare enough for this to be cheap.
+
+    Parameters:
+        db (Session): The session performing the write.
+        entity (str): The kind of record that changed ("problem", "solution" or "category").
+        op (str): The operation ("create", "update" or "delete").
+        key (str): The natural key of the record (problem slug_id or category name).
+        **data: Extra JSON-serialisable details, e.g. the previous key of a rename.
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOG_LOCK})
+    change = {"entity": entity, "op": op, "key": key, **data}
+    # One round trip: append to change_log and notify with the assigned sequence number
+    seq = db.execute(_APPEND_AND_NOTIFY, {
+        "entity": entity, "op": op, "key": key, "data": json.dumps(data),
+        "channel": get_settings().events.channel, "payload": json.dumps({**change, "origin": origin()}),
+    }).scalar_one()
+    change["seq"] = seq
+    with _pending_lock:
+        _pending.setdefault(db, []).append(change)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed(session):
+    with _pending_lock:
+        changes = _pending.pop(session, [])
+    for change in changes:
+        dispatch(change)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    with _pending_lock:
+        _pending.pop(session, None)
+
+
+class ChangeListener(threading.Thread):
+    """
+    Background thread that LISTENs for catalog changes made by other workers.
+
+    It holds one dedicated connection outside the pool. Notifications sent by this process
+    are skipped because they were already dispatched on commit. If the connection drops,
+    the listener reconnects and dispatches a "*" change, since notifications sent while it
+    was disconnected are lost.
+    """
+
+    def __init__(self, engine, channel: str, reconnect_seconds: float = 2.0, poll_seconds: float = 1.0):
+        super().__init__(name="change-listener", daemon=True)
+        self.engine = engine
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self.poll_seconds = poll_seconds
+        self._stop_event = threading.Event()
+        self._connection = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        connected_before = False
+        while not self._stop_event.is_set():
+            try:
+                driver_connection = self._connect()
+                # Changes committed before this process started, or missed while disconnected, are
+                # not known individually, but a replica must have replayed them before feeding caches
+                _advance_seen_seq(self._latest_seq(driver_connection))
+                if connected_before:
+                    dispatch({"entity": "*", "op": "resync", "key": "*"})
+                connected_before = True
+                self._listen(driver_connection)
+            except Exception:
+                logger.exception("Change listener lost its connection, reconnecting")
+                self._stop_event.wait(self.reconnect_seconds)
+            finally:
+                self._close()
+
+    def _connect(self):
+        connection = self.engine.raw_connection()
+        connection.detach()
+        self._connection = connection
+        driver_connection = connection.driver_connection
+        driver_connection.autocommit = True
+        cursor = driver_connection.cursor()
+        cursor.execute(f'LISTEN "{self.channel}"')
+        cursor.close()
+        return driver_connection
+
+    def _latest_seq(self, driver_connection) -> int:
+        cursor = driver_connection.cursor()
+        try:
+            cursor.execute("SELECT coalesce(max(id), 0) FROM change_log")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def _close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                # The connection is being discarded anyway, usually because it already broke
+                logger.debug("Could not close the change listener's connection", exc_info=True)
+            self._connection = None
+
+    def _listen(self, driver_connection):
+        while not self._stop_event.is_set():
+            for payload in self._receive(driver_connection):
+                self._handle(payload)
+
+    def _receive(self, driver_connection):
+        if hasattr(driver_connection, "poll"):
+            # psycopg2: wait on the socket, then drain the notifies list
+            if select.select([driver_connection], [], [], self.poll_seconds)[0]:
+                driver_connection.poll()
+                while driver_connection.notifies:
+                    yield driver_connection.notifies.pop(0).payload
+        else:
+            # psycopg 3: the generator returns once the timeout expires
+            for notify in driver_connection.notifies(timeout=self.poll_seconds):
+                yield notify.payload
+
+    def _handle(self, payload: str):
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed change notification: %s", payload)
+            return
+        if change.pop("origin", None) == origin():
+            return
+        dispatch(change)
+
+
+_listener = None
+
+
+def start_change_listener(engine):
+    """ Starts this process's change listener if it is not already running. """
+    global _listener
+    if _listener is None or not _listener.is_alive():
+        settings = get_settings().events
+        _listener = ChangeListener(engine, channel=settings.channel, reconnect_seconds=settings.reconnect_seconds)
+        _listener.start()
+    return _listener
+
+
+def stop_change_listener():
+    """ Stops the change listener started by start_change_listener(). """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.join(timeout=5)
+        _listener = None
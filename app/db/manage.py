@@ -0,0 +1,49 @@
+"""
+Schema management commands, run once per deployment instead of in every worker.
+
+Usage:
+    python -m app.db.manage create-schema
+    python -m app.db.manage rebuild-stats
+"""
+import argparse
+import logging
+from app.config import get_settings
+from app.crud.stats import rebuild_stats
+from app.db.database import get_session
+from app.db.utils import init_db
+from app.observability.log import configure_logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def create_schema(args):
+    init_db()
+
+
+def rebuild_catalog_stats(args):
+    """ Recounts catalog_stats from scratch, e.g. after a bulk import that bypassed the API. """
+    db = get_session()
+    try:
+        buckets = rebuild_stats(db)
+    finally:
+        db.close()
+    logger.info("Rebuilt catalog statistics", extra={"buckets": buckets})
+
+
+COMMANDS = {
+    "create-schema": create_schema,
+    "rebuild-stats": rebuild_catalog_stats,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.db.manage", description="ZenithSolve database management")
+    parser.add_argument("command", choices=sorted(COMMANDS), help="The management command to run")
+    args = parser.parse_args(argv)
+    configure_logging(get_settings().logging.level, get_settings().logging.json)
+    COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from app.db.database import Base
+
+class CatalogStats(Base):
+    __tablename__ = 'catalog_stats'
+
+    # e.g. ("difficulty", "Easy"), ("category", "Graphs"), ("best_time_complexity", "O(n)"), ("total", "all")
+    dimension = Column(String, primary_key=True)
+    bucket = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)  # Number of problems in the bucket
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from app.db.models.problem import problem_category
@@ -8,4 +8,21 @@ class Category(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
+    parent_id = Column(Integer, ForeignKey('categories.id'), nullable=True)  # None for a top-level category
     problems = relationship('Problem', secondary=problem_category, back_populates='categories')
+    parent_category = relationship('Category', remote_side=[id])
+
+    @property
+    def parent(self):
+        """ Name of the parent category, as in schemas.categories.Category. """
+        return self.parent_category.name if self.parent_category is not None else None
+
+class CategoryClosure(Base):
+    __tablename__ = 'category_closure'
+
+    # One row per (ancestor, descendant) pair, including each category with itself at depth 0
+    ancestor_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True)
+    depth = Column(Integer, nullable=False)  # Number of parent links between them
+
+    __table_args__ = (Index('ix_category_closure_descendant', 'descendant_id', 'depth'),)
@@ -0,0 +1,13 @@
+from sqlalchemy import BigInteger, Column, DateTime, JSON, String, func
+from app.db.database import Base
+
+class ChangeLog(Base):
+    __tablename__ = 'change_log'
+
+    # The sync cursor: strictly increasing in commit order (see app.db.events.emit_change)
+    id = Column(BigInteger, primary_key=True)
+    entity = Column(String, nullable=False)  # "problem", "solution" or "category"
+    op = Column(String, nullable=False)  # "create", "update" or "delete"; deletes are tombstones
+    key = Column(String, nullable=False)  # Natural key: problem slug_id or category name
+    data = Column(JSON, default=dict)  # Extra details, e.g. previous_key of a rename
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
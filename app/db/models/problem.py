@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Table, ARRAY
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Table, ARRAY, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -26,3 +26,14 @@ class Problem(Base):
     best_space_complexity = Column(String, default="NA")
     real_world_examples = relationship('RealWorldExample', back_populates='problem')
     solutions = relationship('Solution', back_populates='problem')
+
+# Finds the problems of a category; the table has no primary key to serve that lookup
+PROBLEM_CATEGORY_INDEX = Index('ix_problem_category_category', problem_category.c.category_id, problem_category.c.problem_id)
+
+# Trigram GIN indexes for typo-tolerant title and slug search. They need the pg_trgm
+# extension, so they are kept out of the table metadata (a plain create_all must work on
+# any database) and created by init_db after CREATE EXTENSION pg_trgm.
+TRIGRAM_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_problems_title_trgm ON problems USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_problems_slug_id_trgm ON problems USING gin (slug_id gin_trgm_ops)",
+]
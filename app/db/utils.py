@@ -1,16 +1,71 @@
-from app.db.database import SessionLocal, Base, engine
-from app.db.models.category import Category
-from app.db.models.problem import Problem
+import logging
+from fastapi import Request, Response
+from sqlalchemy import text
+from app.db.database import READS_OWN_WRITES, REPLICA_SEQ, get_db_config, get_read_session, get_session, Base, get_engine
+from app.db.models.catalog_stats import CatalogStats
+from app.db.models.category import Category, CategoryClosure
+from app.db.models.change_log import ChangeLog
+from app.db.models.problem import Problem, PROBLEM_CATEGORY_INDEX, TRIGRAM_INDEXES
 from app.db.models.real_world_example import RealWorldExample
 from app.db.models.solution import Solution
-def get_db():
-    db = SessionLocal()
+
+logger = logging.getLogger(__name__)
+
+# Marks a client that wrote recently; it expires after db.yaml's read_your_writes_seconds
+RECENT_WRITE_COOKIE = "zs_recent_write"
+
+def get_db(response: Response = None):
+    """
+    Session on the primary, for routes that write.
+
+    Successful responses also set a short-lived cookie so that the client's next reads go
+    to the primary as well (see get_read_db).
+    """
+    window = get_db_config().read_your_writes_seconds
+    if response is not None and window:
+        response.set_cookie(RECENT_WRITE_COOKIE, "1", max_age=window, httponly=True)
+    db = get_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(request: Request = None):
+    """
+    Read-only session for GET routes: on the replica if one is configured, otherwise on the
+    primary in read-only mode. Clients that wrote within the read-your-writes window read
+    from the primary so they see their own changes despite replica lag.
+
+    The session's info, and for replica sessions the request state, tell the caches what it
+    can see: recent writers bypass the shared caches and coalescing, and replica reads only
+    fill them once the replica has caught up (see app.db.events.reflects_seen_changes).
+    """
+    if request is not None and request.cookies.get(RECENT_WRITE_COOKIE):
+        db = get_session()
+        db.info[READS_OWN_WRITES] = True
+    else:
+        db = get_read_session()
+        if request is not None and REPLICA_SEQ in db.info:
+            request.state.replica_seq = db.info[REPLICA_SEQ]
     try:
         yield db
     finally:
         db.close()
     
 def init_db():
-    print("Creating tables...")
-    Base.metadata.create_all(engine)
-    print("Tables created successfully.")
\ No newline at end of file
+    logger.info("Creating tables...")
+    with get_engine().begin() as connection:
+        # The trigram indexes on problems use pg_trgm's operator classes
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        Base.metadata.create_all(connection)
+        # create_all neither adds columns nor creates indexes on tables that already exist
+        connection.execute(text("ALTER TABLE categories ADD COLUMN IF NOT EXISTS parent_id INTEGER REFERENCES categories (id)"))
+        PROBLEM_CATEGORY_INDEX.create(connection, checkfirst=True)
+        for statement in TRIGRAM_INDEXES:
+            connection.execute(text(statement))
+        # Categories created before the hierarchy existed are top-level: they only need their self row
+        connection.execute(text(
+            "INSERT INTO category_closure (ancestor_id, descendant_id, depth) "
+            "SELECT id, id, 0 FROM categories ON CONFLICT DO NOTHING"
+        ))
+    logger.info("Tables created successfully.")
@@ -1,11 +1,97 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-import uvicorn
-from app.db.utils import init_db
-from app.routers import categories, problems
+from omegaconf import OmegaConf
+from fastapi.exceptions import RequestValidationError
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from app.config import get_settings
+from app.db.broadcast import get_broadcaster
+from app.db.database import dispose_engine, get_engine
+from app.db.deadlines import configure_statement_timeouts
+from app.db.events import start_change_listener, stop_change_listener
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.deadline import DeadlineMiddleware
+from app.middleware.metrics import MetricsMiddleware, count_http_exception, count_validation_error
+from app.middleware.sql_timing import SQLTimingMiddleware
+from app.observability.sql import set_slow_query_threshold
+from app.observability.log import configure_logging, stop_logging
+from app.observability.profiling import ProfilingMiddleware, install_profiling
+from app.observability.tracing import TracingMiddleware, build_exporter, enable_sql_tracing, install_tracing
+from app.search.facets import get_facet_index
+from app.search.similarity import get_similarity_index
+from app.routers import categories, changes, events, metrics, problems, stats
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker startup and shutdown.
+
+    Nothing here creates tables: the schema is managed with `python -m app.db.manage
+    create-schema`. Apart from the search indexes, built in background threads, the pool
+    connects on first use.
+    """
+    # Started per worker: the queue listener thread does not survive the fork from a preloading master
+    log_settings = get_settings().logging
+    configure_logging(log_settings.level, log_settings.json)
+    # Each worker listens for changes committed by the others to keep its caches fresh
+    if get_settings().events.listen:
+        start_change_listener(get_engine())
+    # Changes reach /events clients through this worker's event loop
+    get_broadcaster().start(asyncio.get_running_loop())
+    # Built in the background so a slow or unreachable database does not hold up startup
+    if get_settings().facets.enabled:
+        threading.Thread(target=get_facet_index().warm, name="facet-index-build", daemon=True).start()
+    if get_settings().similarity.enabled:
+        threading.Thread(target=get_similarity_index().warm, name="similarity-index-build", daemon=True).start()
+    yield
+    get_broadcaster().stop()
+    stop_change_listener()
+    dispose_engine()
+    stop_logging()
+
+
+app = FastAPI(lifespan=lifespan)
+
+sql_timing = get_settings().sql_timing
+app.add_middleware(
+    SQLTimingMiddleware,
+    header=sql_timing.server_timing_header,
+    log_statement_threshold=sql_timing.log_statement_threshold,
+    log_db_ms_threshold=sql_timing.log_db_ms_threshold,
+)
+set_slow_query_threshold(sql_timing.slow_query_ms)
+
+statement_timeouts = get_settings().statement_timeouts
+if statement_timeouts.enabled:
+    configure_statement_timeouts(statement_timeouts.default_ms, OmegaConf.to_container(statement_timeouts.routes))
+    app.add_middleware(DeadlineMiddleware)
+
+compression = get_settings().compression
+if compression.enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=compression.minimum_size,
+        gzip_level=compression.gzip_level,
+        brotli_quality=compression.brotli_quality,
+        cache_entries=compression.cache.max_entries,
+        cache_max_bytes=compression.cache.max_bytes,
+        cache_paths=list(compression.cache.paths),
+    )
+
+admission = get_settings().admission
+if admission.enabled:
+    # Inside CORS and metrics, so shed requests still get CORS headers and are counted as 503s
+    app.add_middleware(
+        AdmissionMiddleware,
+        classes=OmegaConf.to_container(admission.classes),
+        bulk_paths=list(admission.bulk_paths),
+        exempt_paths=list(admission.exempt_paths),
+        retry_after_seconds=admission.retry_after_seconds,
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,9 +101,18 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-init_db()
+# Outside compression and CORS, so latency and sizes cover them as well; only the optional
+# tracing and profiling middlewares added below wrap it
+app.add_middleware(MetricsMiddleware)
+app.add_exception_handler(StarletteHTTPException, count_http_exception)
+app.add_exception_handler(RequestValidationError, count_validation_error)
+
 app.include_router(categories.router)
 app.include_router(problems.router)
+app.include_router(changes.router)
+app.include_router(stats.router)
+app.include_router(events.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -25,9 +120,30 @@ def read_root():
     return {"Hello": "World"}
 
 
-if __name__ == "__main__":
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000
+tracing = get_settings().tracing
+if tracing.enabled:
+    install_tracing(app)
+    enable_sql_tracing()
+    app.add_middleware(
+        TracingMiddleware,
+        exporter=build_exporter(tracing.exporter, tracing.path),
+        sample_rate=tracing.sample_rate,
     )
+
+profiling = get_settings().profiling
+if profiling.enabled:
+    # After every route is registered, so all sync endpoints get wrapped
+    install_profiling(app)
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=profiling.directory,
+        token=profiling.token,
+        sample_rate=profiling.sample_rate,
+        mode=profiling.mode,
+        interval_ms=profiling.interval_ms,
+    )
+
+
+if __name__ == "__main__":
+    from app.serve import main
+    main()
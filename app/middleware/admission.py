@@ -0,0 +1,139 @@
+import asyncio
+import json
+import time
+from collections import deque
+from app.observability import metrics
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a bounded FIFO wait queue for one class of requests.
+
+    Up to limit requests run at once; up to queue_size more wait at most queue_timeout
+    seconds for a slot. Anything beyond that is rejected immediately, so under overload a
+    few requests fail fast instead of all of them queueing for a database connection.
+    A released slot is handed directly to the oldest waiter.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_use = 0
+        self._waiters = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        """
+        Waits for a slot.
+
+        Returns:
+            str or None: None once a slot is held, otherwise why the request was shed:
+            "queue_full" or "timeout".
+        """
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait expired; use it
+                return None
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            return "timeout"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+        return None
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes to the waiter; in_use is unchanged
+                waiter.set_result(None)
+                return
+        self.in_use -= 1
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that limits concurrent requests per class and sheds the excess with 503.
+
+    Requests are classified as "bulk" (reads of paths in bulk_paths), "reads" (GET/HEAD/OPTIONS)
+    or "writes" (everything else), each with its own AdmissionLimiter, so a burst of list
+    queries cannot starve writes. Shed requests get a 503 with a Retry-After header.
+    Paths in exempt_paths, such as /metrics, are never limited.
+    """
+
+    def __init__(self, app, classes: dict, bulk_paths=(), exempt_paths=(), retry_after_seconds: int = 1):
+        self.app = app
+        self.limiters = {
+            name: AdmissionLimiter(name, limit=settings["limit"], queue_size=settings["queue"],
+                                   queue_timeout=settings["queue_timeout_ms"] / 1000)
+            for name, settings in classes.items()
+        }
+        self.bulk_paths = frozenset(bulk_paths)
+        self.exempt_paths = frozenset(exempt_paths)
+        self.retry_after = str(retry_after_seconds).encode("latin-1")
+
+    def classify(self, scope) -> str:
+        if scope["method"] in READ_METHODS and scope["path"] in self.bulk_paths and "bulk" in self.limiters:
+            return "bulk"
+        return "reads" if scope["method"] in READ_METHODS else "writes"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        limiter = self.limiters.get(self.classify(scope))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        metrics.admission_queue_depth.inc(limiter.name)
+        try:
+            rejected = await limiter.acquire()
+        finally:
+            metrics.admission_queue_depth.dec(limiter.name)
+        metrics.admission_wait.observe(limiter.name, value=time.perf_counter() - start)
+        if rejected is not None:
+            metrics.admission_shed.inc(limiter.name, rejected)
+            await self.reject(limiter.name, send)
+            return
+
+        metrics.admission_in_flight.inc(limiter.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            metrics.admission_in_flight.dec(limiter.name)
+            limiter.release()
+
+    async def reject(self, name: str, send):
+        body = json.dumps({"detail": {
+            "message": "The server is overloaded, retry later",
+            "error": f"Too many concurrent {name} requests",
+        }}).encode("utf-8")
+        await send({"type": "http.response.start", "status": 503, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"retry-after", self.retry_after),
+        ]})
+        await send({"type": "http.response.body", "body": body})
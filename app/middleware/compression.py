@@ -0,0 +1,200 @@
+import gzip
+import threading
+import anyio
+from collections import OrderedDict
+from starlette.requests import cookie_parser
+from app.db.events import data_version, reflects_seen_changes
+from app.db.utils import RECENT_WRITE_COOKIE
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html")
+# Bodies above this size are compressed in a worker thread so the event loop keeps serving
+OFFLOAD_SIZE = 64 * 1024
+# Headers describing how one particular response was produced, not the body: never replayed from the cache
+VOLATILE_HEADERS = frozenset({b"x-cache", b"server-timing", b"date", b"traceparent", b"set-cookie"})
+
+
+def negotiate_encoding(accept_encoding: str):
+    """
+    Picks the response encoding from an Accept-Encoding header.
+
+    Brotli is preferred over gzip when the client accepts both and the brotli module is
+    installed. Encodings with q=0 are treated as refused.
+
+    Parameters:
+        accept_encoding (str): The raw Accept-Encoding header value.
+
+    Returns:
+        str or None: "br", "gzip", or None if the response should not be compressed.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+class CompressedBodyCache:
+    """ LRU of compressed response bodies bounded by entry count and total bytes. """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, status: int, headers: list, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[2])
+            self._entries[key] = (status, headers, body)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses JSON responses and caches the compressed bodies.
+
+    Responses are compressed with brotli or gzip depending on Accept-Encoding when they are
+    at least minimum_size bytes. Successful GET responses under one of cache_paths are kept
+    already compressed, keyed by path, query string, encoding and the catalog data version,
+    so a hot page is compressed once per change instead of once per request. Streaming
+    responses such as text/event-stream are passed through untouched.
+
+    Clients inside their read-your-writes window neither read nor fill the cache, and a
+    response read from a replica is only cached if the replica was current (see
+    app.db.utils.get_read_db).
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 cache_entries: int = 256, cache_max_bytes: int = 64 * 1024 * 1024, cache_paths=()):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_paths = tuple(cache_paths)
+        self.cache = CompressedBodyCache(max_entries=cache_entries, max_bytes=cache_max_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cache_key = None
+        recent_writer = RECENT_WRITE_COOKIE in cookie_parser(headers.get(b"cookie", b"").decode("latin-1"))
+        if scope["method"] == "GET" and scope["path"].startswith(self.cache_paths) and not recent_writer:
+            # Read the version before the handler runs: a change committed meanwhile makes this entry unreachable
+            cache_key = (scope["path"], scope["query_string"], encoding, data_version())
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                status, cached_headers, body = cached
+                await send({"type": "http.response.start", "status": status, "headers": cached_headers})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        responder = _CompressingResponder(self, scope, send, encoding, cache_key)
+        await self.app(scope, receive, responder.send)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+
+class _CompressingResponder:
+    """ Buffers one response, then sends it compressed (and caches it) if it qualifies. """
+
+    def __init__(self, middleware: CompressionMiddleware, scope, send, encoding: str, cache_key):
+        self.middleware = middleware
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.cache_key = cache_key
+        self.start_message = None
+        self.passthrough = False
+        self.chunks = []
+
+    async def send(self, message):
+        if self.passthrough:
+            await self._send(message)
+            return
+        if message["type"] == "http.response.start":
+            headers = dict(message.get("headers", []))
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            if b"content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                self.passthrough = True
+                await self._send(message)
+                return
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        self.chunks.append(message.get("body", b""))
+        if message.get("more_body", False):
+            return
+        await self._finish(b"".join(self.chunks))
+
+    async def _finish(self, body: bytes):
+        status = self.start_message["status"]
+        headers = [(name, value) for name, value in self.start_message.get("headers", []) if name != b"content-length"]
+        headers.append((b"vary", b"Accept-Encoding"))
+        compressed = len(body) >= self.middleware.minimum_size
+        if compressed:
+            if len(body) > OFFLOAD_SIZE:
+                body = await anyio.to_thread.run_sync(self.middleware.compress, body, self.encoding)
+            else:
+                body = self.middleware.compress(body, self.encoding)
+            headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        # Pages served stale are being refreshed; caching them would pin the old body to this data version
+        served_stale = (b"x-cache", b"stale") in headers
+        # get_read_db records the replica's position in the request state
+        current = reflects_seen_changes(self.scope.get("state", {}).get("replica_seq"))
+        if compressed and self.cache_key is not None and status == 200 and not served_stale and current:
+            replayable = [(name, value) for name, value in headers if name.lower() not in VOLATILE_HEADERS]
+            self.middleware.cache.set(self.cache_key, status, replayable, body)
+        await self._send({**self.start_message, "headers": headers})
+        await self._send({"type": "http.response.body", "body": body})
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import anyio
+from app.db.deadlines import RequestDeadline, current_deadline
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware that scopes statement timeouts to the request and cancels its queries
+    when the client disconnects.
+
+    A watcher task owns receive(): it forwards the request body to the application and then
+    keeps waiting, as Starlette's streaming responses do, for an http.disconnect. If that
+    arrives before the response is complete, the request's running statement is cancelled
+    through the driver and further statements are refused, so a sync handler fails fast,
+    rolls back and returns its connection to the pool instead of finishing work nobody
+    will read.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        deadline = RequestDeadline(scope)
+        token = current_deadline.set(deadline)
+        messages = asyncio.Queue()
+        completed = False
+
+        async def watch():
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    break
+            if not completed:
+                route = getattr(scope.get("route"), "path", scope["path"])
+                logger.info("Client disconnected from %s %s; cancelling its queries", scope["method"], route)
+                await anyio.to_thread.run_sync(deadline.cancel)
+
+        async def receive_wrapper():
+            message = await messages.get()
+            if message["type"] == "http.disconnect":
+                # Every later call must see the disconnect too
+                messages.put_nowait(message)
+            return message
+
+        async def send_wrapper(message):
+            nonlocal completed
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                completed = True
+            await send(message)
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            current_deadline.reset(token)
+            if not watcher.done():
+                watcher.cancel()
@@ -0,0 +1,79 @@
+import time
+from fastapi.exception_handlers import http_exception_handler, request_validation_exception_handler
+from app.observability import metrics
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope) -> str:
+    """
+    Returns the path template of the route that handled the request, e.g. "/problems/{problem_id}".
+
+    The router stores the matched route in the scope, so this is only meaningful once the
+    application has run. Using the template rather than the raw path keeps label
+    cardinality bounded.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request counts, latency, payload sizes and in-flight requests.
+
+    Work per request is a handful of dictionary updates; nothing is formatted until /metrics is scraped.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = {"code": 500}
+        response_size = {"bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        metrics.http_in_flight.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as err:
+            metrics.http_errors.inc(route_template(scope), method, type(err).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.http_in_flight.dec(method)
+            route = route_template(scope)
+            metrics.http_requests.inc(route, method, str(status["code"]))
+            metrics.http_latency.observe(route, method, value=elapsed)
+            metrics.http_response_size.observe(route, value=response_size["bytes"])
+            content_length = dict(scope["headers"]).get(b"content-length")
+            if content_length:
+                metrics.http_request_size.observe(route, value=int(content_length))
+
+
+async def count_http_exception(request, exc):
+    """
+    Exception handler that counts HTTP errors by the exception that caused them.
+
+    The routers translate IntegrityError, SQLAlchemyError, ValueError and other exceptions
+    into HTTPException with `raise ... from err`, so the original class is the cause.
+    """
+    cause = exc.__cause__
+    metrics.http_errors.inc(route_template(request.scope), request.method, type(cause).__name__ if cause else type(exc).__name__)
+    return await http_exception_handler(request, exc)
+
+
+async def count_validation_error(request, exc):
+    """ Exception handler that counts request validation failures before returning the usual 422. """
+    metrics.http_errors.inc(route_template(request.scope), request.method, type(exc).__name__)
+    return await request_validation_exception_handler(request, exc)
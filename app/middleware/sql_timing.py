@@ -0,0 +1,44 @@
+import logging
+import time
+from app.observability.sql import RequestStats, current_request, server_timing
+
+logger = logging.getLogger(__name__)
+
+
+class SQLTimingMiddleware:
+    """
+    ASGI middleware that attributes SQL statements and DB time to the request that caused them.
+
+    The totals are returned in a Server-Timing header, and requests exceeding the statement
+    or DB-time threshold are logged with their route.
+    """
+
+    def __init__(self, app, header: bool = True, log_statement_threshold: int = 20, log_db_ms_threshold: float = 200):
+        self.app = app
+        self.header = header
+        self.log_statement_threshold = log_statement_threshold
+        self.log_db_seconds_threshold = log_db_ms_threshold / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(method=scope["method"], scope=scope)
+        token = current_request.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.header:
+                value = server_timing(stats, time.perf_counter() - stats.started_at)
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"server-timing", value.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            if stats.statements > self.log_statement_threshold or stats.db_seconds > self.log_db_seconds_threshold:
+                logger.warning(
+                    "%s %s issued %d statements taking %.1f ms of DB time",
+                    stats.method, stats.route, stats.statements, stats.db_seconds * 1000,
+                    extra={"route": stats.route, "statements": stats.statements, "db_ms": round(stats.db_seconds * 1000, 1)},
+                )
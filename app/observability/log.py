@@ -0,0 +1,95 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+# Attributes every LogRecord has; anything else was passed through `extra` and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """ Formats records as one JSON object per line, including fields passed via `extra`. """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() formats the whole message on the calling thread; here only the
+    arguments are merged (so they cannot change before the record is written) and the
+    traceback is rendered, which must happen while the exception is still alive.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level: str = "INFO", json_format: bool = True, stream=None):
+    """
+    Routes all logging through a queue so request threads never block on log I/O.
+
+    Records are put on an unbounded in-memory queue by the calling thread and written to
+    stream (stdout by default) by a single QueueListener thread. Safe to call more than
+    once: later calls replace the previous configuration. Call it in each worker process
+    after forking, since the listener thread does not survive a fork.
+
+    Parameters:
+        level (str): Root log level, e.g. "INFO".
+        json_format (bool): Write JSON lines; otherwise a plain text format.
+        stream (IO, optional): Where records are written; defaults to sys.stdout.
+
+    Returns:
+        QueueListener: The started listener.
+    """
+    global _listener
+    stop_logging()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if json_format else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(_DeferredQueueHandler(records))
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """ Detaches the queue handler, then flushes queued records and stops the listener thread. """
+    global _listener
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _DeferredQueueHandler):
+            root.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
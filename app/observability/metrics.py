@@ -0,0 +1,224 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from 1ms to 10s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Payload size buckets in bytes, from 128B to 16MB
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608, 16777216)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """ Monotonically increasing value per label set. """
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in items]
+
+
+class Gauge(Counter):
+    """ Value per label set that can go up and down. """
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """ Cumulative-bucket histogram per label set, rendered in Prometheus format. """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, *labels, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(labels, (list(state[0]), state[1], state[2])) for labels, state in self._values.items()]
+        lines = self.header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Holds metrics and collector callbacks and renders them in Prometheus text format.
+
+    Collectors are called at scrape time and return (name, kind, documentation, samples)
+    tuples, where samples is a list of (labels dict, value). They expose counters kept
+    elsewhere (caches, single-flight groups) without touching their hot paths.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(registry: Registry, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Serves registry on http://host:port/metrics from a daemon thread.
+
+    Behind a pre-forking server the application port reaches an arbitrary worker, so each
+    worker also exposes its own metrics on a port of its own (see app.serve) and Prometheus
+    scrapes every worker and sums across them.
+
+    Parameters:
+        registry (Registry): The metrics to expose.
+        host (str): The interface to bind.
+        port (int): The port to bind.
+
+    Returns:
+        ThreadingHTTPServer: The running server; call shutdown() to stop it.
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+registry = Registry()
+
+http_requests = registry.counter("http_requests_total", "HTTP requests by route, method and status code.", ("route", "method", "status"))
+http_latency = registry.histogram("http_request_duration_seconds", "HTTP request latency by route and method.", ("route", "method"))
+http_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being handled, by method.", ("method",))
+http_errors = registry.counter("http_errors_total", "Failed HTTP requests by route, method and originating exception class.", ("route", "method", "exception"))
+http_request_size = registry.histogram("http_request_size_bytes", "HTTP request body sizes by route.", ("route",), SIZE_BUCKETS)
+http_response_size = registry.histogram("http_response_size_bytes", "HTTP response body sizes by route.", ("route",), SIZE_BUCKETS)
+admission_in_flight = registry.gauge("admission_in_flight", "Admitted requests currently running, by request class.", ("class",))
+admission_queue_depth = registry.gauge("admission_queue_depth", "Requests waiting for admission, by request class.", ("class",))
+admission_wait = registry.histogram("admission_wait_seconds", "Time spent waiting for admission, by request class.", ("class",))
+sse_subscribers = registry.gauge("sse_subscribers", "Clients connected to the /events stream.")
+sse_dropped = registry.counter("sse_dropped_total", "Event-stream clients told to resync because their buffer filled up.")
+admission_shed = registry.counter("admission_shed_total", "Requests rejected with 503 by request class and reason.", ("class", "reason"))
+
+
+@registry.register_collector
+def _cache_metrics():
+    from app.cache import catalog
+    from app.cache.singleflight import coalesce_stats
+
+    groups = coalesce_stats()
+    yield ("singleflight_calls_total", "counter", "Calls to coalesced CRUD reads.",
+           [({"function": name}, stats["calls"]) for name, stats in groups.items()])
+    yield ("singleflight_coalesced_total", "counter", "Calls that waited on another caller's in-flight fetch.",
+           [({"function": name}, stats["coalesced"]) for name, stats in groups.items()])
+    yield ("singleflight_retried_total", "counter", "Waiting calls that re-ran because the leader's request was cancelled.",
+           [({"function": name}, stats["retried"]) for name, stats in groups.items()])
+    if catalog._cache is not None:
+        stats = catalog._cache.stats()
+        yield ("catalog_cache_hits_total", "counter", "Catalog cache hits by tier.",
+               [({"tier": "local"}, stats["local_hits"]), ({"tier": "shared"}, stats["shared_hits"])])
+        yield ("catalog_cache_misses_total", "counter", "Catalog cache misses.", [({}, stats["misses"])])
+    if catalog._list_cache is not None:
+        stats = catalog._list_cache.stats()
+        yield ("list_cache_requests_total", "counter", "List cache lookups by result.",
+               [({"result": result}, stats[result]) for result in ("hit", "stale", "miss")])
+        yield ("list_cache_refreshes_total", "counter", "Background list refreshes by outcome.",
+               [({"outcome": "ok"}, stats["refreshes"]), ({"outcome": "error"}, stats["refresh_errors"])])
+        yield ("list_cache_not_current_total", "counter", "List pages read from a lagging replica and not cached.",
+               [({}, stats["not_current"])])
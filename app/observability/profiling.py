@@ -0,0 +1,227 @@
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import pstats
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import anyio
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+CPROFILE = "cprofile"
+SAMPLE = "sample"
+MODES = (CPROFILE, SAMPLE)
+
+# Set by ProfilingMiddleware for the one request being profiled; copied into the threadpool
+current_profile = ContextVar("current_profile", default=None)
+
+
+def collapse_stack(frame) -> str:
+    """ Formats a frame and its callers as one collapsed-stack line, outermost frame first. """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class RequestProfile:
+    """
+    Profile of one request, collected in every thread that works on it.
+
+    In "cprofile" mode each attached thread runs its own deterministic profiler and the
+    results are merged into one pstats file. In "sample" mode a sampler thread records
+    the stacks of the attached threads every interval_seconds as collapsed stacks, the
+    input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, mode: str, interval_seconds: float = 0.005):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}', expected one of {MODES}")
+        self.mode = mode
+        self.interval_seconds = interval_seconds
+        self.profilers = []
+        self.threads = set()
+        self.stacks = Counter()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        if self.mode == SAMPLE:
+            self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    @contextmanager
+    def attach(self):
+        """ Profiles the calling thread for the duration of the block. """
+        if self.mode == CPROFILE:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                with self._lock:
+                    self.profilers.append(profiler)
+            return
+        thread_id = threading.get_ident()
+        with self._lock:
+            self.threads.add(thread_id)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.threads.discard(thread_id)
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval_seconds):
+            with self._lock:
+                threads = set(self.threads)
+            frames = sys._current_frames()
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is not None and thread_id != own_id:
+                    self.stacks[collapse_stack(frame)] += 1
+
+    def write(self, path: str):
+        """ Writes a .prof file (cprofile mode) or a collapsed-stacks text file (sample mode). """
+        if self.mode == CPROFILE:
+            if not self.profilers:
+                return
+            stats = pstats.Stats(self.profilers[0])
+            for profiler in self.profilers[1:]:
+                stats.add(profiler)
+            stats.dump_stats(path)
+            return
+        with open(path, "w") as output:
+            for stack, count in self.stacks.most_common():
+                output.write(f"{stack} {count}\n")
+
+
+def profiled(call):
+    """ Wraps a sync endpoint so it runs attached to the current request profile, if any. """
+
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        with profile.attach():
+            return call(*args, **kwargs)
+    return wrapper
+
+
+def install_profiling(app):
+    """
+    Wraps the sync endpoints of app's routes with profiled().
+
+    Sync endpoints run in the threadpool, where a profiler started by the middleware on the
+    event loop thread cannot see them. Call this after every router has been included; it
+    is only called when profiling is enabled, so disabled deployments run the endpoints
+    unwrapped.
+    """
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not inspect.iscoroutinefunction(route.dependant.call):
+            route.dependant.call = profiled(route.dependant.call)
+
+
+def profile_filename(method: str, route: str, elapsed_seconds: float, mode: str) -> str:
+    """
+    Builds a profile file name carrying the time, route and duration of the request.
+
+    Returns:
+        str: e.g. "20261019T101500_GET_problems_problem_id_153ms_4f2a.prof"
+    """
+    route_name = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    extension = "prof" if mode == CPROFILE else "collapsed"
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return f"{stamp}_{method}_{route_name}_{elapsed_seconds * 1000:.0f}ms_{secrets.token_hex(2)}.{extension}"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles selected requests and writes the result to directory.
+
+    A request is profiled when it carries an X-Profile header equal to token, or at random
+    with probability sample_rate. X-Profile-Mode chooses "cprofile" or "sample" per
+    request; otherwise mode is used. At most one request per process is profiled at a
+    time; requests arriving meanwhile run normally. The event loop thread is attached as
+    well, so async work such as response serialization is included, along with any
+    event-loop work of concurrent requests.
+    """
+
+    def __init__(self, app, directory: str = "profiles", token: str = "", sample_rate: float = 0.0,
+                 mode: str = SAMPLE, interval_ms: float = 5):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}', expected one of {MODES}")
+        self.app = app
+        self.directory = directory
+        self.token = token.encode("latin-1")
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.interval_seconds = interval_ms / 1000
+        self._busy = threading.Lock()
+
+    def select(self, scope):
+        """ Returns the profiling mode for this request, or None if it should not be profiled. """
+        headers = dict(scope["headers"])
+        requested = headers.get(b"x-profile")
+        if requested is not None and self.token and secrets.compare_digest(requested, self.token):
+            mode = headers.get(b"x-profile-mode", b"").decode("latin-1")
+            return mode if mode in MODES else self.mode
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = self.select(scope)
+        if mode is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            profile = RequestProfile(mode, self.interval_seconds)
+            token = current_profile.set(profile)
+            profile.start()
+            started = time.perf_counter()
+            try:
+                with profile.attach():
+                    await self.app(scope, receive, send)
+            finally:
+                elapsed = time.perf_counter() - started
+                profile.stop()
+                current_profile.reset(token)
+                route = getattr(scope.get("route"), "path", scope["path"])
+                path = os.path.join(self.directory, profile_filename(scope["method"], route, elapsed, mode))
+                await anyio.to_thread.run_sync(self._write, profile, path)
+        finally:
+            self._busy.release()
+
+    def _write(self, profile: RequestProfile, path: str):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.write(path)
+        except OSError:
+            logger.exception("Could not write profile to %s", path)
+            return
+        logger.info("Wrote request profile %s", path)
@@ -0,0 +1,106 @@
+import logging
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Statements slower than this are logged to "app.slow_query"; None disables the log
+slow_query_seconds = None
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+class RequestStats:
+    """ Database work attributed to one HTTP request. """
+    __slots__ = ("scope", "method", "statements", "db_seconds", "started_at")
+
+    def __init__(self, method: str | None = None, scope: dict | None = None):
+        self.scope = scope or {}
+        self.method = method
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.started_at = time.perf_counter()
+
+    @property
+    def route(self):
+        """ The matched route template once routing has run, otherwise the raw path. """
+        return getattr(self.scope.get("route"), "path", self.scope.get("path"))
+
+
+def set_slow_query_threshold(milliseconds):
+    """ Sets the duration above which statements are logged, in milliseconds; None disables the log. """
+    global slow_query_seconds
+    slow_query_seconds = milliseconds / 1000 if milliseconds is not None else None
+
+
+def parameter_shape(parameters):
+    """
+    Describes statement parameters by name and type without their values.
+
+    Returns:
+        dict or list or str: e.g. {"slug_id_1": "str"}, or "3 x {...}" for executemany.
+    """
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+# Set by SQLTimingMiddleware; the threadpool that runs sync handlers copies the context,
+# so statements executed on behalf of the request update this same object
+current_request = ContextVar("current_request", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    if slow_query_seconds is not None and elapsed >= slow_query_seconds:
+        slow_query_logger.warning("slow query", extra={
+            "statement": statement,
+            "parameters": parameter_shape(parameters),
+            "executemany": executemany,
+            "duration_ms": round(elapsed * 1000, 3),
+            "route": stats.route if stats is not None else None,
+            "method": stats.method if stats is not None else None,
+        })
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def server_timing(stats: RequestStats, app_seconds: float) -> str:
+    """
+    Formats the Server-Timing header value for a request.
+
+    Returns:
+        str: e.g. 'db;dur=12.4;desc="5 statements", app;dur=20.1'
+    """
+    return f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} statements", app;dur={app_seconds * 1000:.1f}'
+
+
+def parse_statement_count(header: str) -> int:
+    """ Extracts the statement count from a Server-Timing header produced by server_timing(). """
+    for metric in header.split(","):
+        name, *params = metric.strip().split(";")
+        if name == "db":
+            for param in params:
+                if param.startswith("desc="):
+                    return int(param[len("desc="):].strip('"').split()[0])
+    raise ValueError(f"No db metric in Server-Timing header '{header}'")
@@ -0,0 +1,330 @@
+import hashlib
+import inspect
+import json
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import anyio
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# The innermost open span of the current request; None when the request is not traced
+current_span = ContextVar("current_span", default=None)
+
+
+class Span:
+    """ One timed operation within a trace. """
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start", "duration", "status", "_started")
+
+    def __init__(self, trace, name: str, parent_id: str | None = None, **attributes):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration = None
+        self.status = "ok"
+        self._started = time.perf_counter()
+
+    def end(self, error: BaseException | None = None):
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = type(error).__name__
+        self.trace.add(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """ Finished spans of one sampled request, exported together when the request ends. """
+
+    def __init__(self, trace_id: str | None = None, parent_span_id: str | None = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.parent_span_id = parent_span_id
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+
+def child_span(name: str, **attributes):
+    """
+    Opens a span under the current one.
+
+    Returns:
+        Span or None: None when the current request is not traced.
+    """
+    parent = current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, **attributes)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """ Context manager that records the block as a child of the current span, if any. """
+    opened = child_span(name, **attributes)
+    if opened is None:
+        yield None
+        return
+    token = current_span.set(opened)
+    try:
+        yield opened
+    except BaseException as err:
+        opened.end(err)
+        raise
+    else:
+        opened.end()
+    finally:
+        current_span.reset(token)
+
+
+def traced(*attribute_params):
+    """
+    Decorator that records each call of a function as a span named after its module.
+
+    Parameters:
+        *attribute_params (str): Parameters recorded as span attributes, e.g. "slug_id".
+
+    List results also record their length as the "rows" attribute. Untraced requests
+    only pay for one context variable lookup.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__.removeprefix('app.')}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return func(*args, **kwargs)
+            attributes = {}
+            if attribute_params:
+                arguments = signature.bind(*args, **kwargs).arguments
+                attributes = {param: arguments[param] for param in attribute_params if param in arguments}
+            with span(name, **attributes) as opened:
+                result = func(*args, **kwargs)
+                if isinstance(result, list):
+                    opened.attributes["rows"] = len(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def statement_hash(statement: str) -> str:
+    """ Short stable identifier of a SQL statement, so traces can be grouped by query shape. """
+    return hashlib.sha1(statement.encode("utf-8")).hexdigest()[:12]
+
+
+def _start_sql_span(conn, cursor, statement, parameters, context, executemany):
+    opened = child_span("sql", **{
+        "db.operation": statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "",
+        "db.statement_hash": statement_hash(statement),
+        "db.executemany": executemany,
+    })
+    conn.info.setdefault("trace_spans", []).append(opened)
+
+
+def _end_sql_span(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    opened = spans.pop() if spans else None
+    if opened is not None:
+        opened.attributes["db.rows"] = cursor.rowcount
+        opened.end()
+
+
+def _fail_sql_span(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("trace_spans"):
+        opened = connection.info["trace_spans"].pop()
+        if opened is not None:
+            opened.end(exception_context.original_exception)
+
+
+def enable_sql_tracing():
+    """ Records every SQL statement executed during a traced request as a span. """
+    if not event.contains(Engine, "before_cursor_execute", _start_sql_span):
+        event.listen(Engine, "before_cursor_execute", _start_sql_span)
+        event.listen(Engine, "after_cursor_execute", _end_sql_span)
+        event.listen(Engine, "handle_error", _fail_sql_span)
+
+
+def _traced_endpoint(call, name: str):
+    if inspect.iscoroutinefunction(call):
+        @wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            with span(name):
+                return await call(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(call)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return call(*args, **kwargs)
+    return wrapper
+
+
+def install_tracing(app):
+    """ Wraps every route handler of app in a span named "route.<function>". Call after including the routers. """
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            route.dependant.call = _traced_endpoint(route.dependant.call, f"route.{route.name}")
+
+
+class JsonlExporter:
+    """ Appends spans to a file, one JSON object per line. """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a") as output:
+            output.write(lines)
+
+
+class InMemoryCollector:
+    """ Keeps exported spans in memory; a stand-in for a collector in tests and local debugging. """
+
+    def __init__(self, max_spans: int = 10000):
+        self.max_spans = max_spans
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        with self._lock:
+            self.spans.extend(span.to_dict() for span in spans)
+            del self.spans[:-self.max_spans]
+
+    def traces(self) -> dict:
+        """ Returns the collected spans grouped by trace id, in start order. """
+        with self._lock:
+            grouped = {}
+            for item in sorted(self.spans, key=lambda item: item["start"]):
+                grouped.setdefault(item["trace_id"], []).append(item)
+            return grouped
+
+
+def build_exporter(kind: str, path: str = "traces.jsonl"):
+    """ Returns the exporter configured by tracing.exporter: "jsonl" or "memory". """
+    if kind == "jsonl":
+        return JsonlExporter(path)
+    if kind == "memory":
+        return InMemoryCollector()
+    raise ValueError(f"Unknown trace exporter '{kind}', expected 'jsonl' or 'memory'")
+
+
+def parse_traceparent(value: str):
+    """
+    Parses a W3C traceparent header.
+
+    Returns:
+        tuple or None: (trace_id, parent_span_id, sampled), or None if the header is malformed.
+    """
+    match = TRACEPARENT.match(value.strip().lower())
+    if match is None or match.group(1) == "0" * 32:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that opens the root span of sampled requests and exports their traces.
+
+    An incoming traceparent header continues the caller's trace and its sampled flag is
+    honoured; other requests are sampled with probability sample_rate. Sampled responses
+    carry a traceparent header naming the root span. Between the handler returning and the
+    response starting, a "serialize_response" span covers response model validation and
+    JSON encoding.
+    """
+
+    def __init__(self, app, exporter, sample_rate: float = 0.01):
+        self.app = app
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def sample(self, scope):
+        incoming = dict(scope["headers"]).get(b"traceparent")
+        parsed = parse_traceparent(incoming.decode("latin-1")) if incoming else None
+        if parsed is not None:
+            trace_id, parent_id, sampled = parsed
+            return Trace(trace_id, parent_id) if sampled else None
+        return Trace() if random.random() < self.sample_rate else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = self.sample(scope)
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+        root = Span(trace, f"{scope['method']} {scope['path']}", trace.parent_span_id, **{"http.method": scope["method"]})
+        token = current_span.set(root)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                self._add_serialization_span(trace, root)
+                traceparent = f"00-{trace.trace_id}-{root.span_id}-01".encode("latin-1")
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"traceparent", traceparent)]}
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as err:
+            error = err
+            raise
+        finally:
+            current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                root.name = f"{scope['method']} {route}"
+                root.attributes["http.route"] = route
+            root.end(error)
+            await anyio.to_thread.run_sync(self._export, trace)
+
+    @staticmethod
+    def _add_serialization_span(trace: Trace, root: Span):
+        handlers = [span for span in trace.spans if span.parent_id == root.span_id and span.name.startswith("route.")]
+        if not handlers:
+            return
+        handler = handlers[-1]
+        serialize = Span(trace, "serialize_response", root.span_id)
+        serialize.start = handler.start + handler.duration
+        serialize.duration = max(0.0, time.time() - serialize.start)
+        trace.add(serialize)
+
+    def _export(self, trace: Trace):
+        try:
+            self.exporter.export(trace.spans)
+        except Exception:
+            logger.exception("Could not export trace %s", trace.trace_id)
@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.schemas.categories import Category
-from app.db.utils import get_db
-from app.crud import categories
+from app.schemas.categories import Category, CategoryCooccurrence
+from app.schemas.problems import ProblemOut
+from app.db.utils import get_db, get_read_db
+from app.crud import categories, problems
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.extras import format_response
 
@@ -30,6 +31,7 @@ def create_category(category: Category, db: Session = Depends(get_db)):
     Raises:
         HTTPException: 
             - 400: If category already exists or other integrity constraints are violated
+            - 404: If the parent category does not exist
             - 422: If validation fails
             - 500: If a database or unexpected error occurs
     """
@@ -54,6 +56,14 @@ def create_category(category: Category, db: Session = Depends(get_db)):
                 "error": str(err)
             }
         ) from err
+    except categories.ParentNotFoundError as err:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "message": "Parent category not found",
+                "error": str(err)
+            }
+        ) from err
     except ValueError as err:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -73,7 +83,7 @@ def create_category(category: Category, db: Session = Depends(get_db)):
 
 @format_response(List[str])
 @router.get("/categories/", response_model=List[str])
-def read_categories(db: Session = Depends(get_db)):
+def read_categories(db: Session = Depends(get_read_db)):
     """
     Retrieves a list of categories from the database.
 
@@ -127,6 +137,106 @@ def read_categories(db: Session = Depends(get_db)):
             }
         ) from err
 
+@router.get("/categories/cooccurrence", response_model=CategoryCooccurrence)
+def read_category_cooccurrence(category: str | None = None, min_count: int = 1, limit: int = 100, db: Session = Depends(get_read_db)):
+    """
+    Retrieves the category pairs that are assigned to the same problems, for designing learning paths.
+
+    Each pair has the number of problems in both categories, its lift (above 1 when the
+    categories occur together more often than chance) and its Jaccard similarity. Results
+    are cached until a problem or category changes.
+
+    Parameters:
+        category (str, optional): Only return pairs including this category.
+        min_count (int): Minimum number of shared problems. Must be positive.
+        limit (int): Maximum number of pairs to return. Must be positive.
+        db (Session): The database session.
+
+    Returns:
+        CategoryCooccurrence: The number of problems and the pairs, most frequent first.
+
+    Raises:
+        HTTPException:
+            - 400: If min_count or limit is invalid
+            - 500: If a database or unexpected error occurs
+    """
+    try:
+        return categories.get_category_cooccurrence(db, category=category, min_count=min_count, limit=limit)
+    except ValueError as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Invalid parameters",
+                "error": str(err)
+            }
+        ) from err
+    except SQLAlchemyError as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "Database error occurred while computing category co-occurrence",
+                "error": str(err)
+            }
+        ) from err
+    except Exception as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "An unexpected error occurred while computing category co-occurrence",
+                "error": str(err)
+            }
+        ) from err
+
+@format_response(List[ProblemOut])
+@router.get("/categories/{name}/problems", response_model=List[ProblemOut])
+def read_category_problems(name: str, include_descendants: bool = True, skip: int = 0, limit: int = 50, db: Session = Depends(get_read_db)):
+    """
+    Retrieves the problems of a category, including those of its subcategories by default.
+
+    Parameters:
+        name (str): The category name.
+        include_descendants (bool): Also return problems of every subcategory, at any depth.
+        skip (int): Number of problems to skip. Must be non-negative.
+        limit (int): Maximum number of problems to return. Must be positive.
+        db (Session): The database session.
+
+    Returns:
+        List[ProblemOut]: The problems, each listed once.
+
+    Raises:
+        HTTPException:
+            - 404: If the category does not exist
+            - 400: If pagination parameters are invalid
+            - 500: If a database or unexpected error occurs
+    """
+    try:
+        return problems.get_problems_in_category(db, name, include_descendants=include_descendants, skip=skip, limit=limit)
+    except ValueError as err:
+        not_found = "not found" in str(err)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND if not_found else status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Category not found" if not_found else "Invalid pagination parameters",
+                "error": str(err)
+            }
+        ) from err
+    except SQLAlchemyError as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "Database error occurred while retrieving the category's problems",
+                "error": str(err)
+            }
+        ) from err
+    except Exception as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "An unexpected error occurred while retrieving the category's problems",
+                "error": str(err)
+            }
+        ) from err
+
 @format_response(Category)
 @router.put("/categories/", response_model=Category)
 def update_category(
@@ -148,7 +258,7 @@ def update_category(
 
     Raises:
         HTTPException: 
-            - 404: If the category does not exist
+            - 404: If the category or the new parent category does not exist
             - 422: If validation fails
             - 500: If a database or unexpected error occurs
     """
@@ -173,6 +283,14 @@ def update_category(
                 "error": str(err)
             }
         ) from err
+    except categories.ParentNotFoundError as err:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "message": "Parent category not found",
+                "error": str(err)
+            }
+        ) from err
     except ValueError as err:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.db.utils import get_read_db
+from app.schemas.changes import ChangePage
+from app.crud import changes
+from sqlalchemy.exc import SQLAlchemyError
+
+router = APIRouter()
+
+@router.get("/changes", response_model=ChangePage)
+def read_changes(since: int = 0, limit: int = Query(500, le=get_settings().changes.max_limit),
+                 db: Session = Depends(get_read_db)):
+    """
+    Returns the catalog changes committed after a cursor, for incremental client sync.
+
+    A client stores the returned cursor and passes it back as ?since= on the next call,
+    repeating while has_more is true. Each change names the problem or category that
+    changed; deletes are tombstones telling the client to drop its copy, and renames carry
+    the previous key in data.
+
+    Parameters:
+        since (int): The cursor from the previous call; 0 to read the feed from the start.
+        limit (int): Maximum number of changes to return, at most changes.max_limit.
+        db (Session): The read-only database session
+
+    Returns:
+        ChangePage: The changes, the next cursor and whether more are waiting.
+
+    Raises:
+        HTTPException:
+            - 400: If since or limit is invalid
+            - 422: If limit is above changes.max_limit
+            - 500: If a database or unexpected error occurs
+    """
+    try:
+        return changes.get_changes(db, since=since, limit=limit)
+    except ValueError as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Invalid cursor parameters",
+                "error": str(err)
+            }
+        ) from err
+    except SQLAlchemyError as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "Database error occurred while retrieving changes",
+                "error": str(err)
+            }
+        ) from err
+    except Exception as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "An unexpected error occurred while retrieving changes",
+                "error": str(err)
+            }
+        ) from err
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from app.config import get_settings
+from app.crud import changes
+from app.db.broadcast import RESYNC, format_event, get_broadcaster
+from app.db.database import get_read_session
+
+router = APIRouter()
+
+
+def _read_missed(since: int, limit: int):
+    db = get_read_session()
+    try:
+        return changes.get_changes(db, since=since, limit=limit)
+    finally:
+        db.close()
+
+
+async def event_stream(request: Request, last_event_id: Optional[int], heartbeat_seconds: float, max_replay: int):
+    """
+    Yields the SSE messages of one client until it disconnects or falls behind.
+
+    A client resuming with Last-Event-ID first gets the changes it missed from change_log.
+    The subscription is registered before that read, so changes committed meanwhile are
+    queued rather than lost, and the ones already replayed are skipped.
+    """
+    broadcaster = get_broadcaster()
+    subscription = broadcaster.subscribe()
+    try:
+        replayed = last_event_id
+        if last_event_id is not None:
+            page = await run_in_threadpool(_read_missed, last_event_id, max_replay)
+            if page.has_more:
+                yield format_event(RESYNC)
+                return
+            for change in page.changes:
+                yield format_event({"entity": change.entity, "op": change.op, "key": change.key, "seq": change.seq, **change.data})
+            replayed = page.cursor
+        while True:
+            change = await subscription.next(heartbeat_seconds)
+            if change is None:
+                if await request.is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+            if replayed is not None and change.get("seq") is not None and change["seq"] <= replayed:
+                continue
+            yield format_event(change)
+            if change is RESYNC:
+                return
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get("/events", include_in_schema=False)
+async def stream_events(request: Request, last_event_id: Optional[int] = Header(default=None)):
+    """
+    Streams committed problem, solution and category changes as Server-Sent Events.
+
+    Each event's type is the entity that changed and its data the change itself; its id is
+    the change_log sequence number, which browsers send back as Last-Event-ID when they
+    reconnect. A "resync" event means changes were missed (the client fell behind or a
+    worker lost its notification connection): reload, or catch up with GET /changes.
+
+    Parameters:
+        request (Request): The incoming request, used to detect disconnects
+        last_event_id (int, optional): The Last-Event-ID header of a reconnecting client
+
+    Returns:
+        StreamingResponse: The text/event-stream response.
+    """
+    settings = get_settings().events.stream
+    return StreamingResponse(
+        event_stream(request, last_event_id, settings.heartbeat_seconds, settings.max_replay),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
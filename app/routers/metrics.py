@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.observability.metrics import registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """
+    Exposes the process's metrics in Prometheus text format.
+
+    Every worker keeps its own metrics and this port reaches an arbitrary one, so under
+    app.serve scrape each worker's metrics port instead (see app.serve.post_fork).
+
+    Returns:
+        PlainTextResponse: The metrics in text exposition format 0.0.4.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
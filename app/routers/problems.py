@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.db.utils import get_db
-from app.schemas.problems import ProblemIn, ProblemOut
+from app.db.utils import get_db, get_read_db
+from app.schemas.problems import FacetedProblems, ProblemIn, ProblemOut, SimilarProblem, Suggestion
 from app.schemas.solutions import Solution
 from app.crud import problems
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.extras import format_response
+from app.cache.catalog import get_list_page
+from app.config import get_settings
+from app.search.autocomplete import get_autocomplete_index
+from app.search.facets import get_facet_index
+from app.search.similarity import get_similarity_index
 
 router = APIRouter()
 
@@ -67,9 +72,216 @@ def create_problem(problem: ProblemIn, db: Session = Depends(get_db)):
             }
         ) from err
 
+@format_response(FacetedProblems)
+@router.get("/problems/filter", response_model=FacetedProblems)
+def filter_problems(
+    category: List[str] = Query(default=[]),
+    category_match: str = "any",
+    exclude_category: List[str] = Query(default=[]),
+    difficulty: List[str] = Query(default=[]),
+    time_complexity: List[str] = Query(default=[]),
+    space_complexity: List[str] = Query(default=[]),
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Filters problems by category, difficulty and best complexity, with facet counts.
+
+    Repeated values of one parameter are alternatives (OR), except category with
+    category_match=all, where a problem must be in every category. Different parameters
+    are combined with AND, and exclude_category removes problems (NOT). Filtering and
+    counting run on the in-memory facet index; only the returned page is read from the
+    database.
+
+    Parameters:
+        category (List[str]): Categories to match.
+        category_match (str): "any" or "all" of the categories.
+        exclude_category (List[str]): Categories whose problems are left out.
+        difficulty (List[str]): Difficulties to match.
+        time_complexity (List[str]): Best time complexities to match, e.g. O(n) or NA.
+        space_complexity (List[str]): Best space complexities to match.
+        skip (int): Number of matching problems to skip. Must be non-negative.
+        limit (int): Maximum number of problems to return. Must be positive.
+        db (Session): The database session
+
+    Returns:
+        FacetedProblems: The number of matches, the counts of every facet within them and one page of problems
+
+    Raises:
+        HTTPException:
+            - 400: If the filter or pagination parameters are invalid
+            - 503: If the facet index is disabled
+            - 500: If a database or unexpected error occurs
+    """
+    if not get_settings().facets.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "message": "Facet filtering is not available",
+                "error": "The facet index is disabled"
+            }
+        )
+    try:
+        if category_match not in ("any", "all"):
+            raise ValueError("category_match must be 'any' or 'all'")
+        include = [[("difficulty", value) for value in difficulty],
+                   [("best_time_complexity", value) for value in time_complexity],
+                   [("best_space_complexity", value) for value in space_complexity]]
+        if category_match == "all":
+            include += [[("category", name)] for name in category]
+        else:
+            include.append([("category", name) for name in category])
+        index = get_facet_index()
+        index.ensure_current()
+        total, slugs, facets = index.search(
+            include=[group for group in include if group],
+            exclude=[("category", name) for name in exclude_category],
+            skip=skip,
+            limit=limit,
+        )
+        return FacetedProblems(total=total, facets=facets, problems=problems.get_problems_by_slugs(db, slugs))
+    except ValueError as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Invalid filter parameters",
+                "error": str(err)
+            }
+        ) from err
+    except SQLAlchemyError as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "Database error occurred while filtering problems",
+                "error": str(err)
+            }
+        ) from err
+    except Exception as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "An unexpected error occurred while filtering problems",
+                "error": str(err)
+            }
+        ) from err
+
+@format_response(List[ProblemOut])
+@router.get("/problems/search", response_model=List[ProblemOut])
+def search_problems(q: str, mode: str = "fuzzy", limit: int = 20, db: Session = Depends(get_read_db)):
+    """
+    Searches problems by title and slug.
+
+    The default "fuzzy" mode tolerates typos ("longest palindrom") and ranks by trigram
+    similarity; "contains" finds titles or slugs containing q. Both use the trigram GIN
+    indexes on problems instead of scanning the table.
+
+    Parameters:
+        q (str): The search text
+        mode (str): "fuzzy" or "contains"
+        limit (int): Maximum number of problems to return, at most search.max_results. Must be positive.
+        db (Session): The database session
+
+    Returns:
+        List[ProblemOut]: The matching problems, best match first
+
+    Raises:
+        HTTPException:
+            - 400: If q is blank or mode or limit is invalid
+            - 500: If a database or unexpected error occurs
+    """
+    settings = get_settings().search
+    try:
+        return problems.search_problems(db, q, mode=mode, limit=min(limit, settings.max_results),
+                                        threshold=settings.fuzzy_threshold)
+    except ValueError as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Invalid search parameters",
+                "error": str(err)
+            }
+        ) from err
+    except SQLAlchemyError as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "Database error occurred while searching problems",
+                "error": str(err)
+            }
+        ) from err
+    except Exception as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "An unexpected error occurred while searching problems",
+                "error": str(err)
+            }
+        ) from err
+
+@router.get("/problems/autocomplete", response_model=List[Suggestion])
+def autocomplete_problems(prefix: str, limit: int = 10):
+    """
+    Suggests problems and categories as the user types in the search box.
+
+    Titles are matched at any word start, slugs and category names at their start,
+    case-insensitively, from an in-memory prefix index.
+
+    Parameters:
+        prefix (str): The text typed so far
+        limit (int): Maximum number of suggestions, at most autocomplete.max_results. Must be positive.
+
+    Returns:
+        List[Suggestion]: The suggestions, matches at the start of a title first
+
+    Raises:
+        HTTPException:
+            - 400: If the prefix is blank or limit is invalid
+            - 503: If autocomplete is disabled
+            - 500: If a database or unexpected error occurs
+    """
+    settings = get_settings().autocomplete
+    if not settings.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "message": "Autocomplete is not available",
+                "error": "The autocomplete index is disabled"
+            }
+        )
+    try:
+        index = get_autocomplete_index()
+        index.ensure_current()
+        return [Suggestion(kind=kind, value=value, label=label)
+                for kind, value, label in index.suggest(prefix, limit=min(limit, settings.max_results))]
+    except ValueError as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Invalid parameters",
+                "error": str(err)
+            }
+        ) from err
+    except SQLAlchemyError as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "Database error occurred while suggesting problems",
+                "error": str(err)
+            }
+        ) from err
+    except Exception as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "An unexpected error occurred while suggesting problems",
+                "error": str(err)
+            }
+        ) from err
+
 @format_response(ProblemOut)
 @router.get("/problems/{problem_id}", response_model=ProblemOut)
-def read_problem(problem_id: str, db: Session = Depends(get_db)):
+def read_problem(problem_id: str, db: Session = Depends(get_read_db)):
     """
     Retrieves a specific problem by its ID.
 
@@ -124,11 +336,16 @@ def read_problem(problem_id: str, db: Session = Depends(get_db)):
 
 @format_response(List[ProblemOut])
 @router.get("/problems/", response_model=List[ProblemOut])
-def read_problems(skip: int = 0, limit: int = 200, db: Session = Depends(get_db)):
+def read_problems(response: Response, skip: int = 0, limit: int = 200, db: Session = Depends(get_read_db)):
     """
     Retrieves a list of problems using pagination.
 
+    Pages are served from a stale-while-revalidate cache; the X-Cache response header
+    reports whether the page was fresh ("hit"), served while refreshing ("stale") or
+    computed for this request ("miss").
+
     Parameters:
+        response (Response): The outgoing response, used to set the X-Cache header
         skip (int): Number of problems to skip. Must be non-negative.
         limit (int): Maximum number of problems to return. Must be positive.
         db (Session): The database session
@@ -151,7 +368,14 @@ def read_problems(skip: int = 0, limit: int = 200, db: Session = Depends(get_db)
             }
         )
     try:
-        problems_list = problems.get_problems(db, skip=skip, limit=limit)
+        problems_list, cache_state = get_list_page(
+            "problems",
+            lambda session: problems.get_problems(session, skip=skip, limit=limit),
+            db,
+            skip=skip,
+            limit=limit,
+        )
+        response.headers["X-Cache"] = cache_state
         return problems_list
     except SQLAlchemyError as err:
         raise HTTPException(
@@ -178,6 +402,75 @@ def read_problems(skip: int = 0, limit: int = 200, db: Session = Depends(get_db)
             }
         ) from err
 
+@router.get("/problems/{problem_id}/similar", response_model=List[SimilarProblem])
+def read_similar_problems(problem_id: str, limit: int = 10):
+    """
+    Retrieves the problems most similar to a problem, for the "related problems" panel.
+
+    Similarity blends the cosine similarity of the problems' titles, descriptions and
+    solution names with their shared categories. It is computed from an in-memory index,
+    so the database is only read when the index picks up changes.
+
+    Parameters:
+        problem_id (str): The ID of the problem
+        limit (int): Maximum number of problems to return. Must be positive.
+
+    Returns:
+        List[SimilarProblem]: The similar problems, most similar first
+
+    Raises:
+        HTTPException:
+            - 400: If limit is invalid
+            - 404: If the problem is not found
+            - 503: If the similarity index is disabled
+            - 500: If a database or unexpected error occurs
+    """
+    if not get_settings().similarity.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "message": "Similar problems are not available",
+                "error": "The similarity index is disabled"
+            }
+        )
+    try:
+        index = get_similarity_index()
+        index.ensure_current()
+        return [SimilarProblem(slug_id=slug, title=title, score=score)
+                for slug, title, score in index.similar(problem_id, limit=limit)]
+    except KeyError as err:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "message": "Problem not found",
+                "error": f"No problem found with id {problem_id}"
+            }
+        ) from err
+    except ValueError as err:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Invalid parameters",
+                "error": str(err)
+            }
+        ) from err
+    except SQLAlchemyError as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "Database error occurred while finding similar problems",
+                "error": str(err)
+            }
+        ) from err
+    except Exception as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "An unexpected error occurred while finding similar problems",
+                "error": str(err)
+            }
+        ) from err
+
 @format_response(Solution)
 @router.post("/problems/{problem_id}/solutions", response_model=Solution, status_code=status.HTTP_201_CREATED)
 def add_solution(problem_id: str, solution: Solution, db: Session = Depends(get_db)):
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.db.utils import get_read_db
+from app.schemas.stats import CatalogStatsOut
+from app.crud import stats
+from sqlalchemy.exc import SQLAlchemyError
+
+router = APIRouter()
+
+@router.get("/stats", response_model=CatalogStatsOut)
+def read_stats(db: Session = Depends(get_read_db)):
+    """
+    Returns problem counts for the whole catalog, per difficulty, per category and per
+    best known complexity.
+
+    The counts are kept up to date by every catalog write, so this reads a handful of rows
+    instead of scanning the problems table.
+
+    Parameters:
+        db (Session): The read-only database session
+
+    Returns:
+        CatalogStatsOut: The catalog statistics.
+
+    Raises:
+        HTTPException:
+            - 500: If a database or unexpected error occurs
+    """
+    try:
+        return stats.get_stats(db)
+    except SQLAlchemyError as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "Database error occurred while retrieving statistics",
+                "error": str(err)
+            }
+        ) from err
+    except Exception as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "An unexpected error occurred while retrieving statistics",
+                "error": str(err)
+            }
+        ) from err
@@ -1,5 +1,20 @@
 from pydantic import BaseModel, Field
+from typing import List, Optional
 
 
 class Category(BaseModel):
-    name: str = Field(..., max_length=100)
\ No newline at end of file
+    name: str = Field(..., max_length=100)
+    parent: Optional[str] = Field(default=None, max_length=100, description="Name of the parent category; None for a top-level category")
+
+
+class CategoryPair(BaseModel):
+    first: str = Field(..., description="The alphabetically first category of the pair")
+    second: str = Field(..., description="The other category")
+    count: int = Field(..., description="Number of problems in both categories")
+    lift: float = Field(..., description="How much more often the pair occurs than if the categories were independent")
+    jaccard: float = Field(..., description="Problems in both categories divided by problems in either")
+
+
+class CategoryCooccurrence(BaseModel):
+    problems: int = Field(..., description="Number of problems in the catalog")
+    pairs: List[CategoryPair] = Field(default=[], description="Category pairs, most frequent first")
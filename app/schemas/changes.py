@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+class Change(BaseModel):
+    seq: int = Field(..., description="Position of the change in the feed; pass the last one seen as ?since=")
+    entity: str = Field(..., description="Kind of record that changed [problem, solution, category]")
+    op: str = Field(..., description="Operation [create, update, delete]; deletes are tombstones")
+    key: str = Field(..., description="Problem slug_id or category name")
+    data: dict = Field(default={}, description="Extra details, e.g. previous_key of a rename or the solution name")
+    changed_at: Optional[datetime] = Field(default=None, description="Commit time of the change")
+
+    class Config:
+        from_attributes = True
+
+class ChangePage(BaseModel):
+    changes: List[Change] = Field(default=[], description="Changes after the requested cursor, oldest first")
+    cursor: int = Field(..., description="Cursor to pass as ?since= on the next call")
+    has_more: bool = Field(..., description="True if more changes are available right away")
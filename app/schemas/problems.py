@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Union
+from typing import Dict, List, Union
 from app.schemas.real_world_examples import RealWorldExample
 from app.schemas.solutions import Solution
 from pydantic import Field
@@ -46,3 +46,21 @@ class ProblemOut(ProblemIn):
     @property
     def pythonSolutions(self):
         return [s for s in self.solutions if s.language == "Python"]
+
+
+class FacetedProblems(BaseModel):
+    total: int = Field(..., description="Number of problems matching the filters")
+    facets: Dict[str, Dict[str, int]] = Field(default={}, description="Matching problems per bucket of each facet (difficulty, category, best_time_complexity, best_space_complexity)")
+    problems: List[ProblemOut] = Field(default=[], description="The requested page of matching problems")
+
+
+class SimilarProblem(BaseModel):
+    slug_id: str = Field(..., description="Unique identifier of the similar problem")
+    title: str = Field(..., description="Title of the similar problem")
+    score: float = Field(..., description="Similarity between 0 and 1, from text and shared categories")
+
+
+class Suggestion(BaseModel):
+    kind: str = Field(..., description="What is suggested: problem or category")
+    value: str = Field(..., description="The problem slug_id or category name")
+    label: str = Field(..., description="Text to display: the problem title or category name")
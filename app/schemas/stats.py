@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import Dict
+
+class CatalogStatsOut(BaseModel):
+    total: int = Field(..., description="Number of problems in the catalog")
+    by_difficulty: Dict[str, int] = Field(default={}, description="Problems per difficulty")
+    by_category: Dict[str, int] = Field(default={}, description="Problems per category, including empty categories")
+    by_best_time_complexity: Dict[str, int] = Field(default={}, description="Problems per best known time complexity (NA if unsolved)")
+    by_best_space_complexity: Dict[str, int] = Field(default={}, description="Problems per best known space complexity (NA if unsolved)")
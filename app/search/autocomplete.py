@@ -0,0 +1,141 @@
+import bisect
+import re
+import threading
+from sqlalchemy import select
+from app.db import events
+from app.db.database import get_session
+from app.db.models.category import Category
+from app.db.models.problem import Problem
+from app.search.index import ProblemIndex
+
+_WORD_START = re.compile(r"\b\w")
+
+
+class AutocompleteIndex(ProblemIndex):
+    """
+    In-process prefix index over problem titles, slugs and category names.
+
+    Entries are (key, rank, kind, value, label) tuples with keys in lower case, kept in one
+    sorted list per rank: 0 for matches at the start of a title, slug or category name,
+    1 for matches at a later word start, so "sum" finds "Two Sum" too. The entries starting
+    with a prefix are a contiguous run of each list, found with bisect. Suggestions are
+    taken from the rank 0 run before the rank 1 run, each in key order, so a better match
+    is never crowded out by many weaker ones that happen to sort earlier.
+
+    Built on first use and kept current as described in ProblemIndex. Category names are
+    only read in full builds, so any category change rebuilds the index.
+    """
+
+    name = "autocomplete index"
+
+    def __init__(self, session_factory=get_session):
+        super().__init__(session_factory)
+        self._clear()
+
+    def mark(self, change: dict):
+        if change["entity"] == "category":
+            with self._lock:
+                self._stale = True
+            return
+        super().mark(change)
+
+    def _clear(self):
+        self.entries = ([], [])  # by rank
+        self.problem_entries = {}  # slug_id -> its entries, to remove them on change
+        # A full build appends and sorts once in _finish instead of inserting one by one
+        self._sorted = False
+
+    def _finish(self):
+        if not self._sorted:
+            for entries in self.entries:
+                entries.sort()
+            self._sorted = True
+
+    def _insert(self, entry):
+        entries = self.entries[entry[1]]
+        if self._sorted:
+            bisect.insort(entries, entry)
+        else:
+            entries.append(entry)
+
+    def _load(self, session, slugs=None):
+        query = select(Problem.slug_id, Problem.title).order_by(Problem.id)
+        if slugs is not None:
+            query = query.where(Problem.slug_id.in_(sorted(slugs)))
+        records = {slug: title for slug, title in session.execute(query)}
+        if slugs is None:
+            # Categories are keyed by tuple so they can never collide with a slug
+            records.update({("category", name): name for (name,) in session.execute(select(Category.name))})
+        return records
+
+    def _upsert(self, key, label):
+        if isinstance(key, tuple):
+            self._insert((label.lower(), 0, "category", label, label))
+            return
+        self._remove(key)
+        title = label or key
+        entries = {(key.lower(), 0, "problem", key, title)}
+        for match in _WORD_START.finditer(title):
+            entries.add((title[match.start():].lower(), 0 if match.start() == 0 else 1, "problem", key, title))
+        for entry in entries:
+            self._insert(entry)
+        self.problem_entries[key] = entries
+
+    def _remove(self, slug: str):
+        for entry in self.problem_entries.pop(slug, ()):
+            entries = self.entries[entry[1]]
+            position = bisect.bisect_left(entries, entry)
+            if position < len(entries) and entries[position] == entry:
+                del entries[position]
+
+    def suggest(self, prefix: str, limit: int = 10):
+        """
+        Suggests problems and categories whose title, slug or name starts with a prefix.
+
+        Parameters:
+            prefix (str): What the user has typed; matched case-insensitively.
+            limit (int): Maximum number of suggestions. Must be positive.
+
+        Returns:
+            List[Tuple[str, str, str]]: (kind, value, label) with kind "problem" (value is
+            the slug_id, label the title) or "category", matches at the start first, then
+            in alphabetical order of the matched text.
+
+        Raises:
+            ValueError: If the prefix is blank or limit is not positive.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix or limit <= 0:
+            raise ValueError("prefix must not be blank and limit must be positive")
+        suggestions, seen = [], set()
+        with self._lock:
+            for entries in self.entries:
+                # Stops after limit distinct hits; a problem has only a few entries per rank
+                for position in range(bisect.bisect_left(entries, (prefix,)), len(entries)):
+                    key, _, kind, value, label = entries[position]
+                    if len(suggestions) == limit or not key.startswith(prefix):
+                        break
+                    if (kind, value) not in seen:
+                        seen.add((kind, value))
+                        suggestions.append((kind, value, label))
+        return suggestions
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """
+    Returns the process-wide autocomplete index, creating it (and its event subscription) on first use.
+
+    Returns:
+        AutocompleteIndex: The index; call ensure_current() before querying it.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = AutocompleteIndex()
+                events.subscribe(_index.mark)
+    return _index
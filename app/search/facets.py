@@ -0,0 +1,180 @@
+import threading
+import numpy as np
+from sqlalchemy import select
+from app.config import get_settings
+from app.crud.stats import problem_buckets
+from app.db import events
+from app.db.database import get_session
+from app.db.models.category import Category
+from app.db.models.problem import Problem, problem_category
+from app.search.index import ProblemIndex
+
+DIMENSIONS = ("difficulty", "category", "best_time_complexity", "best_space_complexity")
+
+
+def _empty(capacity: int):
+    return np.zeros(capacity // 8, dtype=np.uint8)
+
+
+class FacetIndex(ProblemIndex):
+    """
+    In-process bitmap index of problems by difficulty, category and best complexity.
+
+    Every problem gets a bit position and every (dimension, bucket) pair a packed bitset
+    (a uint8 NumPy array, eight problems per byte) with the bits of its problems set.
+    Filters are combined with bitwise AND, OR and NOT and each facet count is one popcount,
+    so a query never reaches the database; the caller only loads the page it returns.
+
+    The index is built from problems and problem_category in two queries and kept current
+    as described in ProblemIndex. Positions of deleted problems are not reused until the
+    next full rebuild.
+    """
+
+    name = "facet index"
+
+    def __init__(self, session_factory=get_session, initial_capacity: int = 1024):
+        self.initial_capacity = max(8, initial_capacity + (-initial_capacity) % 8)
+        super().__init__(session_factory)
+        self._clear()
+
+    def _clear(self):
+        self.capacity = self.initial_capacity
+        self.slugs = []  # position -> slug_id, None once deleted
+        self.positions = {}  # slug_id -> position
+        self.live = _empty(self.capacity)
+        self.bitmaps = {}  # (dimension, bucket) -> packed bitset
+
+    @staticmethod
+    def _load(session, slugs=None):
+        """
+        Reads the facet buckets of the given problems, or of all of them.
+
+        Returns:
+            dict: slug_id -> list of (dimension, bucket), in problem id order.
+        """
+        query = select(Problem.id, Problem.slug_id, Problem.difficulty,
+                       Problem.best_time_complexity, Problem.best_space_complexity).order_by(Problem.id)
+        links = (select(problem_category.c.problem_id, Category.name)
+                 .join(Category, Category.id == problem_category.c.category_id))
+        if slugs is not None:
+            query = query.where(Problem.slug_id.in_(sorted(slugs)))
+            links = links.join(Problem, Problem.id == problem_category.c.problem_id).where(Problem.slug_id.in_(sorted(slugs)))
+        categories = {}
+        for problem_id, name in session.execute(links):
+            categories.setdefault(problem_id, []).append(name)
+        return {
+            slug: problem_buckets(difficulty, categories.get(problem_id, []), best_time, best_space)[1:]
+            for problem_id, slug, difficulty, best_time, best_space in session.execute(query)
+        }
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        while capacity <= needed:
+            capacity *= 2
+        for key, bitmap in [("live", self.live), *self.bitmaps.items()]:
+            grown = _empty(capacity)
+            grown[:bitmap.size] = bitmap
+            if key == "live":
+                self.live = grown
+            else:
+                self.bitmaps[key] = grown
+        self.capacity = capacity
+
+    def _upsert(self, slug: str, buckets):
+        position = self.positions.get(slug)
+        if position is None:
+            position = len(self.slugs)
+            if position >= self.capacity:
+                self._grow(position)
+            self.slugs.append(slug)
+            self.positions[slug] = position
+        else:
+            self._unset(position)
+        byte, bit = position >> 3, np.uint8(0x80 >> (position & 7))
+        self.live[byte] |= bit
+        for key in buckets:
+            bitmap = self.bitmaps.get(key)
+            if bitmap is None:
+                bitmap = self.bitmaps[key] = _empty(self.capacity)
+            bitmap[byte] |= bit
+
+    def _remove(self, slug: str):
+        position = self.positions.pop(slug, None)
+        if position is not None:
+            self._unset(position)
+            self.slugs[position] = None
+
+    def _unset(self, position: int):
+        byte, keep = position >> 3, np.uint8(~(0x80 >> (position & 7)) & 0xFF)
+        self.live[byte] &= keep
+        for bitmap in self.bitmaps.values():
+            bitmap[byte] &= keep
+
+    # Queries
+
+    def search(self, include=(), exclude=(), skip: int = 0, limit: int = 20):
+        """
+        Filters problems and counts every facet bucket within the result.
+
+        Parameters:
+            include (Iterable[Iterable[Tuple[str, str]]]): Groups of (dimension, bucket) keys.
+                A problem must be in at least one bucket of every group, so a group is an OR
+                and the groups are ANDed. Unknown buckets match nothing.
+            exclude (Iterable[Tuple[str, str]]): Keys whose problems are left out (NOT).
+            skip (int): Number of matching problems to skip. Must be non-negative.
+            limit (int): Maximum number of slugs to return. Must be positive.
+
+        Returns:
+            tuple: (total, slugs, facets) with the number of matches, the slug_ids of the
+            requested page in problem id order, and {dimension: {bucket: count}} for every
+            bucket in the index.
+
+        Raises:
+            ValueError: If skip or limit is invalid, or a key names an unknown dimension.
+        """
+        if skip < 0 or limit <= 0:
+            raise ValueError("Invalid pagination parameters")
+        include = [list(group) for group in include]
+        exclude = list(exclude)
+        for dimension, _ in [key for group in include for key in group] + exclude:
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Unknown facet '{dimension}'")
+        with self._lock:
+            mask = self.live.copy()
+            for group in include:
+                matches = _empty(self.capacity)
+                for key in group:
+                    bitmap = self.bitmaps.get(key)
+                    if bitmap is not None:
+                        matches |= bitmap
+                mask &= matches
+            for key in exclude:
+                bitmap = self.bitmaps.get(key)
+                if bitmap is not None:
+                    mask &= ~bitmap
+            facets = {dimension: {} for dimension in DIMENSIONS}
+            for (dimension, bucket), bitmap in self.bitmaps.items():
+                facets[dimension][bucket] = int(np.bitwise_count(bitmap & mask).sum())
+            positions = np.flatnonzero(np.unpackbits(mask))
+            slugs = [self.slugs[position] for position in positions[skip:skip + limit]]
+        return int(positions.size), slugs, facets
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_facet_index() -> FacetIndex:
+    """
+    Returns the process-wide facet index, creating it (and its event subscription) on first use.
+
+    Returns:
+        FacetIndex: The index; call ensure_current() before querying it.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = FacetIndex(initial_capacity=get_settings().facets.initial_capacity)
+                events.subscribe(_index.mark)
+    return _index
@@ -0,0 +1,104 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from app.db.database import get_session
+
+logger = logging.getLogger(__name__)
+
+
+class ProblemIndex(ABC):
+    """
+    Base class for in-process indexes derived from the problem catalog.
+
+    An index is built from the database in one pass and then kept current from committed
+    changes (app.db.events): changes to a problem or its solutions mark that problem dirty,
+    and category renames, deletes and missed notifications mark the whole index stale. The
+    next query reloads the dirty problems, or rebuilds, from the primary, so a worker never
+    serves an index older than the changes it has been told about.
+
+    Subclasses implement _load, _clear, _upsert and _remove, and may override _finish;
+    all but _load run under self._lock, which queries also hold while they read the index.
+    """
+
+    name = "index"
+
+    def __init__(self, session_factory=get_session):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stale = True
+        self._dirty = set()
+
+    def mark(self, change: dict):
+        """ Records a committed change; called by app.db.events, so it must not issue SQL. """
+        entity = change["entity"]
+        with self._lock:
+            if entity in ("problem", "solution"):
+                self._dirty.add(change["key"])
+                if change.get("previous_key"):
+                    self._dirty.add(change["previous_key"])
+            elif entity != "category" or change["op"] != "create":
+                # A new category has no problems yet; renames and deletes touch many problems
+                self._stale = True
+
+    def ensure_current(self):
+        """ Rebuilds the index or reloads dirty problems if any changes were committed since the last call. """
+        with self._refresh_lock:
+            with self._lock:
+                stale, dirty = self._stale, self._dirty
+                self._stale, self._dirty = False, set()
+            if not stale and not dirty:
+                return
+            try:
+                session = self.session_factory()
+                try:
+                    records = self._load(session, None if stale else dirty)
+                finally:
+                    session.close()
+            except Exception:
+                with self._lock:
+                    self._stale = self._stale or stale
+                    self._dirty |= dirty
+                raise
+            with self._lock:
+                if stale:
+                    self._clear()
+                else:
+                    for slug in dirty - records.keys():
+                        self._remove(slug)
+                for slug, record in records.items():
+                    self._upsert(slug, record)
+                self._finish()
+            if stale:
+                logger.info("Built the %s", self.name, extra={"problems": len(records)})
+
+    def warm(self):
+        """ Builds the index ahead of the first query; failures are logged and retried by that query. """
+        try:
+            self.ensure_current()
+        except Exception:
+            logger.exception("Could not build the %s at startup", self.name)
+
+    @abstractmethod
+    def _load(self, session, slugs=None) -> dict:
+        """
+        Reads what the index needs about the given problems, or about all of them.
+
+        Returns:
+            dict: slug_id -> record, in problem id order.
+        """
+
+    @abstractmethod
+    def _clear(self):
+        """ Empties the index before a rebuild. """
+
+    @abstractmethod
+    def _upsert(self, slug: str, record):
+        """ Adds a problem or replaces its entry. """
+
+    @abstractmethod
+    def _remove(self, slug: str):
+        """ Drops a problem that no longer exists. """
+
+    def _finish(self):
+        """ Called after a batch of _upsert and _remove calls. """
@@ -0,0 +1,269 @@
+import re
+import threading
+import zlib
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from app.config import get_settings
+from app.db import events
+from app.db.database import get_session
+from app.db.models.category import Category
+from app.db.models.problem import Problem, problem_category
+from app.db.models.solution import Solution
+from app.search.index import ProblemIndex
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def text_features(title: str, description: str, solution_names, dimensions: int) -> Counter:
+    """
+    Hashes a problem's text into term counts over a fixed number of feature dimensions.
+
+    Terms are the words and adjacent word pairs of the title (counted twice, since titles
+    are short and specific), the description and the solution names. CRC32 is used rather
+    than hash() so every worker maps a term to the same feature.
+
+    Returns:
+        Counter: feature index -> term count.
+    """
+    counts = Counter()
+    fields = [title, title, description, *solution_names]
+    for field in fields:
+        words = _TOKEN.findall((field or "").lower())
+        for term in words + [f"{first} {second}" for first, second in zip(words, words[1:])]:
+            counts[zlib.crc32(term.encode("utf-8")) % dimensions] += 1
+    return counts
+
+
+def _grown(array, size: int):
+    if size <= array.size:
+        return array
+    grown = np.zeros(max(size, 2 * array.size), dtype=array.dtype)
+    grown[:array.size] = array
+    return grown
+
+
+class _SparseRows:
+    """
+    Append-only float32 CSR rows; a replaced row is appended again and its old one left
+    unused until the owner compacts the rows with take().
+    """
+
+    def __init__(self):
+        self.indptr = np.zeros(1024, dtype=np.int32)
+        self.indices = np.zeros(4096, dtype=np.int32)
+        self.data = np.zeros(4096, dtype=np.float32)
+        self.rows = 0
+        self._matrix = None
+
+    def append(self, indices, data):
+        start = int(self.indptr[self.rows])
+        end = start + len(indices)
+        self.indptr = _grown(self.indptr, self.rows + 2)
+        self.indices = _grown(self.indices, end)
+        self.data = _grown(self.data, end)
+        self.indices[start:end] = indices
+        self.data[start:end] = data
+        self.rows += 1
+        self.indptr[self.rows] = end
+        self._matrix = None
+
+    def take(self, positions):
+        """ Returns new rows holding only the given rows, in that order. """
+        starts = self.indptr[positions]
+        lengths = self.indptr[positions + 1] - starts
+        nnz = int(lengths.sum())
+        taken = _SparseRows()
+        taken.indptr = _grown(taken.indptr, len(positions) + 1)
+        taken.indptr[1:len(positions) + 1] = np.cumsum(lengths)
+        # Each kept value's offset within the old arrays
+        source = np.arange(nnz) + np.repeat(starts - taken.indptr[:len(positions)], lengths)
+        taken.indices = _grown(taken.indices, nnz)
+        taken.data = _grown(taken.data, nnz)
+        taken.indices[:nnz] = self.indices[source]
+        taken.data[:nnz] = self.data[source]
+        taken.rows = len(positions)
+        return taken
+
+    def row(self, position: int):
+        start, end = self.indptr[position], self.indptr[position + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def columns(self, width: int):
+        """
+        The rows as a CSC matrix, so a product with a sparse vector only touches the columns
+        the vector uses. Converted once after each batch of appends.
+        """
+        if self._matrix is None or self._matrix.shape[1] != width:
+            nnz = int(self.indptr[self.rows])
+            self._matrix = sparse.csr_matrix(
+                (self.data[:nnz], self.indices[:nnz], self.indptr[:self.rows + 1]), shape=(self.rows, width)).tocsc()
+        return self._matrix
+
+
+class SimilarityIndex(ProblemIndex):
+    """
+    In-process text and category similarity index for the "similar problems" panel.
+
+    Each problem's text is hashed into TF-IDF weighted, L2-normalised float32 sparse rows,
+    and its categories into binary rows, both kept column-major. The similar problems of
+    one problem are found with one sparse product per matrix over just the columns the
+    problem uses: cosine similarity of the text, and the number of shared categories, from
+    which the Jaccard overlap follows. The score is the two blended by category_weight.
+
+    Inverse document frequencies are updated as problems are added and removed, but rows
+    keep the weights they were stored with until the next full rebuild; for a catalog that
+    grows slowly this drift is negligible. Changed problems are appended as new rows and
+    their old rows are excluded, so an update never rewrites the matrix; once excluded rows
+    outnumber live ones, the batch that got there compacts the rows, keeping memory
+    proportional to the catalog at an amortised constant cost per update.
+    """
+
+    name = "similarity index"
+
+    def __init__(self, session_factory=get_session, dimensions: int = 2 ** 18, category_weight: float = 0.25):
+        self.dimensions = dimensions
+        self.category_weight = category_weight
+        super().__init__(session_factory)
+        self._clear()
+
+    def _clear(self):
+        self.slugs = []  # position -> slug_id
+        self.titles = []  # position -> title
+        self.positions = {}  # slug_id -> current position
+        self.live = np.zeros(1024, dtype=bool)
+        self.category_sizes = np.zeros(1024, dtype=np.float32)
+        self.category_ids = {}  # category name -> column
+        self.document_frequency = np.zeros(self.dimensions, dtype=np.int32)
+        self.text = _SparseRows()
+        self.categories = _SparseRows()
+
+    def _load(self, session, slugs=None):
+        problems = select(Problem.id, Problem.slug_id, Problem.title, Problem.description).order_by(Problem.id)
+        links = (select(problem_category.c.problem_id, Category.name)
+                 .join(Category, Category.id == problem_category.c.category_id))
+        solutions = select(Solution.problem_id, Solution.name)
+        if slugs is not None:
+            problems = problems.where(Problem.slug_id.in_(sorted(slugs)))
+            links = links.join(Problem, Problem.id == problem_category.c.problem_id).where(Problem.slug_id.in_(sorted(slugs)))
+            solutions = solutions.join(Problem, Problem.id == Solution.problem_id).where(Problem.slug_id.in_(sorted(slugs)))
+        categories, solution_names = {}, {}
+        for problem_id, name in session.execute(links):
+            categories.setdefault(problem_id, []).append(name)
+        for problem_id, name in session.execute(solutions):
+            solution_names.setdefault(problem_id, []).append(name)
+        return {
+            slug: (title, text_features(title, description, solution_names.get(problem_id, []), self.dimensions),
+                   categories.get(problem_id, []))
+            for problem_id, slug, title, description in session.execute(problems)
+        }
+
+    def _upsert(self, slug: str, record):
+        title, features, category_names = record
+        self._remove(slug)
+        position = len(self.slugs)
+        self.slugs.append(slug)
+        self.titles.append(title)
+        self.positions[slug] = position
+        self.live = _grown(self.live, position + 1)
+        self.category_sizes = _grown(self.category_sizes, position + 1)
+        self.live[position] = True
+
+        indices = np.fromiter(features.keys(), dtype=np.int32, count=len(features))
+        counts = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+        self.document_frequency[indices] += 1
+        documents = len(self.positions)
+        idf = np.log((1 + documents) / (1 + self.document_frequency[indices])) + 1
+        weights = ((1 + np.log(counts)) * idf).astype(np.float32)
+        norm = float(np.linalg.norm(weights))
+        order = np.argsort(indices)
+        self.text.append(indices[order], weights[order] / norm if norm else weights[order])
+
+        columns = sorted({self.category_ids.setdefault(name, len(self.category_ids)) for name in category_names})
+        self.categories.append(np.array(columns, dtype=np.int32), np.ones(len(columns), dtype=np.float32))
+        self.category_sizes[position] = len(columns)
+
+    def _remove(self, slug: str):
+        position = self.positions.pop(slug, None)
+        if position is not None:
+            self.live[position] = False
+            indices, _ = self.text.row(position)
+            self.document_frequency[indices] -= 1
+
+    def _finish(self):
+        if len(self.slugs) - len(self.positions) > len(self.positions):
+            self._compact()
+
+    def _compact(self):
+        keep = np.flatnonzero(self.live[:len(self.slugs)])
+        self.slugs = [self.slugs[position] for position in keep]
+        self.titles = [self.titles[position] for position in keep]
+        self.positions = {slug: position for position, slug in enumerate(self.slugs)}
+        self.live = np.zeros(self.live.size, dtype=bool)
+        self.live[:len(keep)] = True
+        category_sizes = np.zeros(self.category_sizes.size, dtype=np.float32)
+        category_sizes[:len(keep)] = self.category_sizes[keep]
+        self.category_sizes = category_sizes
+        self.text = self.text.take(keep)
+        self.categories = self.categories.take(keep)
+
+    def similar(self, slug: str, limit: int = 10):
+        """
+        Finds the problems most similar to one problem.
+
+        Parameters:
+            slug (str): The slug_id of the problem.
+            limit (int): Maximum number of problems to return. Must be positive.
+
+        Returns:
+            List[Tuple[str, str, float]]: (slug_id, title, score) of the most similar problems,
+            best first, with scores between 0 and 1.
+
+        Raises:
+            ValueError: If limit is not positive.
+            KeyError: If the problem is not in the index.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        with self._lock:
+            position = self.positions[slug]
+            rows = self.text.rows
+            # Only the columns of the problem's own terms and categories contribute
+            indices, weights = self.text.row(position)
+            scores = self.text.columns(self.dimensions)[:, indices] @ weights
+            indices, _ = self.categories.row(position)
+            shared = self.categories.columns(max(len(self.category_ids), 1))[:, indices].sum(axis=1).A1
+            union = self.category_sizes[:rows] + len(indices) - shared
+            overlap = np.divide(shared, union, out=np.zeros(rows, dtype=np.float32), where=union > 0)
+
+            scores = (1 - self.category_weight) * scores + self.category_weight * overlap
+            scores[~self.live[:rows]] = -1
+            scores[position] = -1
+            candidates = min(limit, int(np.count_nonzero(scores > 0)))
+            if candidates == 0:
+                return []
+            top = np.argpartition(-scores, candidates - 1)[:candidates]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self.slugs[i], self.titles[i], round(float(scores[i]), 4)) for i in top]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """
+    Returns the process-wide similarity index, creating it (and its event subscription) on first use.
+
+    Returns:
+        SimilarityIndex: The index; call ensure_current() before querying it.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                settings = get_settings().similarity
+                _index = SimilarityIndex(dimensions=settings.features, category_weight=settings.category_weight)
+                events.subscribe(_index.mark)
+    return _index
@@ -0,0 +1,107 @@
+"""
+Production entry point: a pre-forking server configured from config/app.yaml.
+
+Usage:
+    python -m app.serve
+"""
+import gc
+import multiprocessing
+from app.config import get_settings
+
+APP_PATH = "app.main:app"
+
+
+def worker_count(configured: int) -> int:
+    """ Returns the configured worker count, or one worker per CPU core when it is 0. """
+    return configured if configured > 0 else multiprocessing.cpu_count()
+
+
+def pre_fork(server, worker):
+    """
+    Gunicorn hook run in the master before it forks a worker.
+
+    Gives the worker the lowest metrics slot no live worker holds, so a recycled worker
+    takes over its predecessor's metrics port and the set of ports stays fixed.
+    """
+    taken = {getattr(live, "metrics_slot", None) for live in server.WORKERS.values()}
+    worker.metrics_slot = next(slot for slot in range(len(taken) + 1) if slot not in taken)
+
+
+def post_fork(server, worker):
+    """
+    Gunicorn hook run in each worker right after the fork.
+
+    With a preloaded app, anything the master created is inherited by every worker. Pooled
+    connections must not be shared between processes, so the child drops the inherited pool
+    without closing the parent's sockets and builds its own engine on first use.
+
+    Each worker then serves its own metrics on metrics_port plus its slot (see pre_fork).
+    Requests to the application port reach an arbitrary worker, so /metrics there only
+    reflects that one process.
+    """
+    from app.db.database import dispose_engine
+    dispose_engine(close=False)
+    settings = get_settings().server
+    slot = getattr(worker, "metrics_slot", None)
+    if settings.metrics_port and slot is not None:
+        from app.observability.metrics import registry, start_metrics_server
+        start_metrics_server(registry, settings.host, settings.metrics_port + slot)
+
+
+def load_app():
+    from app.main import app
+    # Move everything allocated so far out of the collector's reach, so the first GC pass in
+    # each worker does not touch (and copy) the pages it shares with the master
+    gc.freeze()
+    return app
+
+
+def gunicorn_options(settings) -> dict:
+    return {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": worker_count(settings.workers),
+        "worker_class": settings.worker_class,
+        "keepalive": settings.keepalive,
+        "backlog": settings.backlog,
+        "max_requests": settings.max_requests,
+        "max_requests_jitter": settings.max_requests_jitter,
+        "timeout": settings.timeout,
+        "graceful_timeout": settings.graceful_timeout,
+        "preload_app": settings.preload,
+        "pre_fork": pre_fork,
+        "post_fork": post_fork,
+    }
+
+
+def main():
+    settings = get_settings().server
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # gunicorn is not available on every platform (e.g. Windows); fall back to
+        # uvicorn's own process manager, which cannot preload the app
+        import uvicorn
+        uvicorn.run(
+            APP_PATH,
+            host=settings.host,
+            port=settings.port,
+            workers=worker_count(settings.workers),
+            backlog=settings.backlog,
+            timeout_keep_alive=settings.keepalive,
+            limit_max_requests=settings.max_requests or None,
+        )
+        return
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(settings).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+    Server().run()
+
+
+if __name__ == "__main__":
+    main()
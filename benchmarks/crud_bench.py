@@ -0,0 +1,264 @@
+"""
+Benchmarks for the CRUD and complexity hot paths against a seeded PostgreSQL database.
+
+Usage:
+    python -m benchmarks.crud_bench --problems 2000 --categories 40 --solutions 3 \
+        --output bench.json [--baseline previous.json] [--database-url postgresql://...]
+
+Without --database-url a throwaway cluster is started (see benchmarks/postgres.py). Caches
+are disabled unless --with-cache is given, so the numbers reflect real query cost.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies_ms, statements=None) -> dict:
+    """
+    Reduces raw samples to the figures stored in the results file.
+
+    Parameters:
+        latencies_ms (List[float]): One latency sample per operation, in milliseconds.
+        statements (List[int], optional): SQL statements issued per operation.
+
+    Returns:
+        dict: count, mean, p50, p90, p99 and max latency, plus statement counts when given.
+    """
+    summary = {
+        "count": len(latencies_ms),
+        "mean_ms": statistics.fmean(latencies_ms),
+        "p50_ms": percentile(latencies_ms, 0.50),
+        "p90_ms": percentile(latencies_ms, 0.90),
+        "p99_ms": percentile(latencies_ms, 0.99),
+        "max_ms": max(latencies_ms),
+    }
+    if statements is not None:
+        summary["statements_mean"] = statistics.fmean(statements)
+        summary["statements_max"] = max(statements)
+    return summary
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compares p50 latencies with a baseline run.
+
+    Parameters:
+        results (dict): The "results" section of the current run.
+        baseline (dict): The "results" section of the baseline run.
+        threshold (float): Relative slowdown (0.2 = 20%) above which a benchmark regresses.
+
+    Returns:
+        List[str]: Human-readable regressions; empty if none.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        change = (current["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"] if previous["p50_ms"] else 0.0
+        print(f"{name:32s} p50 {previous['p50_ms']:9.3f} -> {current['p50_ms']:9.3f} ms ({change:+.1%})")
+        if change > threshold:
+            regressions.append(f"{name}: p50 {change:+.1%}")
+        if current.get("statements_max", 0) > previous.get("statements_max", 0):
+            regressions.append(f"{name}: statements {previous['statements_max']} -> {current['statements_max']}")
+    return regressions
+
+
+class StatementCounter:
+    """ Counts statements sent through an engine. """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def time_crud(name, session_factory, counter, operation, inputs, warmup: int) -> dict:
+    """ Runs operation(session, value) for each input in a fresh session, like one request each. """
+    latencies, statements = [], []
+    for index, value in enumerate(inputs):
+        db = session_factory()
+        try:
+            before = counter.count
+            start = time.perf_counter()
+            operation(db, value)
+            elapsed = (time.perf_counter() - start) * 1000
+            issued = counter.count - before
+        finally:
+            db.close()
+        if index >= warmup:
+            latencies.append(elapsed)
+            statements.append(issued)
+    print(f"{name:32s} p50 {percentile(latencies, 0.5):9.3f} ms, {statistics.fmean(statements):.1f} statements")
+    return summarize(latencies, statements)
+
+
+def time_function(name, function, inputs, samples: int, batch: int) -> dict:
+    """ Times a pure function in batches and reports the per-call latency of each batch. """
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(batch):
+            for args in inputs:
+                function(*args)
+        latencies.append((time.perf_counter() - start) * 1000 / (batch * len(inputs)))
+    print(f"{name:32s} p50 {percentile(latencies, 0.5) * 1000:9.3f} us per call")
+    return summarize(latencies)
+
+
+def run(args, database_url: str) -> dict:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.database import Base
+    import app.db.utils  # noqa: F401 - registers every model on Base.metadata
+    from app.crud import categories, problems
+    from app.extras import compare_approaches, get_better_complexity, parse_complexity
+    from app.schemas.problems import ProblemIn
+    from app.schemas.solutions import Solution
+    from benchmarks.seed import COMPLEXITIES, seed_catalog
+
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        catalog = seed_catalog(connection, args.problems, args.categories, args.solutions, seed=args.seed)
+    seed_seconds = time.perf_counter() - start
+    print(f"Seeded {args.problems} problems x {args.categories} categories x {args.solutions} solutions in {seed_seconds:.1f}s")
+
+    counter = StatementCounter(engine)
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    rng = random.Random(args.seed)
+    total = args.iterations + args.warmup
+    slugs = catalog["slugs"]
+
+    def pick_slugs():
+        return [rng.choice(slugs) for _ in range(total)]
+
+    results = {}
+    results["get_problems"] = time_crud(
+        "get_problems", session_factory, counter,
+        lambda db, skip: problems.get_problems(db, skip=skip, limit=args.page_size),
+        [rng.randrange(0, max(1, args.problems - args.page_size)) for _ in range(total)], args.warmup)
+    results["get_problem"] = time_crud(
+        "get_problem", session_factory, counter,
+        lambda db, slug: problems.get_problem(db, slug_id=slug), pick_slugs(), args.warmup)
+    results["get_categories"] = time_crud(
+        "get_categories", session_factory, counter,
+        lambda db, _: categories.get_categories(db), range(total), args.warmup)
+
+    def create(db, index):
+        problems.create_problem(db, ProblemIn(
+            slug_id=f"bench-new-{index}", title=f"New Problem {index}", difficulty="Medium",
+            categories=rng.sample(catalog["categories"], k=min(2, len(catalog["categories"]))),
+            description="benchmark", examples=["example"], clarifying_questions=["question"],
+        ))
+    results["create_problem"] = time_crud("create_problem", session_factory, counter, create, range(total), args.warmup)
+
+    def add_solution(db, index):
+        problems.add_solution_to_problem(db, problem_id=rng.choice(slugs), solution=Solution(
+            name=f"Bench Approach {index}", description="benchmark", code="pass",
+            time_complexity=rng.choice(COMPLEXITIES), space_complexity=rng.choice(COMPLEXITIES),
+        ))
+    results["add_solution_to_problem"] = time_crud("add_solution_to_problem", session_factory, counter, add_solution, range(total), args.warmup)
+
+    def update(db, slug):
+        current = problems.get_problem(db, slug_id=slug)
+        problems.update_problem(db, problem_id=slug, problem_update=ProblemIn(
+            slug_id=slug, title=current.title, difficulty=current.difficulty, categories=current.categories,
+            description=current.description + " ", constraints=current.constraints,
+            examples=current.examples, clarifying_questions=current.clarifying_questions,
+        ))
+    results["update_problem"] = time_crud("update_problem", session_factory, counter, update, pick_slugs(), args.warmup)
+
+    pairs = [(a, b) for a in COMPLEXITIES for b in COMPLEXITIES]
+    results["parse_complexity"] = time_function("parse_complexity", parse_complexity, [(c,) for c in COMPLEXITIES], args.samples, args.batch)
+    results["get_better_complexity"] = time_function("get_better_complexity", get_better_complexity, pairs, args.samples, args.batch)
+    results["compare_approaches"] = time_function(
+        "compare_approaches", compare_approaches, [(a, b, b, a) for a, b in pairs], args.samples, args.batch)
+
+    engine.dispose()
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "problems": args.problems,
+            "categories": args.categories,
+            "solutions": args.solutions,
+            "page_size": args.page_size,
+            "iterations": args.iterations,
+            "cache": args.with_cache,
+            "seed_seconds": seed_seconds,
+        },
+        "results": results,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.crud_bench", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--problems", type=int, default=2000)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--solutions", type=int, default=3, help="solutions per problem")
+    parser.add_argument("--page-size", type=int, default=50, help="limit used for get_problems")
+    parser.add_argument("--iterations", type=int, default=200, help="timed operations per CRUD benchmark")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=50, help="timed batches per pure-function benchmark")
+    parser.add_argument("--batch", type=int, default=200, help="calls per input in each batch")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--with-cache", action="store_true", help="keep the application caches enabled")
+    parser.add_argument("--database-url", help="use this (disposable!) database instead of a throwaway cluster")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="results file of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative p50 slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    # Must be set before the settings are first loaded
+    os.environ["CACHE_ENABLED"] = "true" if args.with_cache else "false"
+    os.environ.setdefault("EVENTS_LISTEN", "false")
+
+    if args.database_url:
+        report = run(args, args.database_url)
+    else:
+        from benchmarks.postgres import ThrowawayPostgres
+        with ThrowawayPostgres() as postgres:
+            report = run(args, postgres.url)
+
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(report["results"], baseline["results"], args.threshold)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+HTTP load generator and scenario runner for the API.
+
+Usage:
+    python -m benchmarks.loadgen --base-url http://localhost:8000 --concurrency 32 --duration 30
+    python -m benchmarks.loadgen --steps 8,16,32,64,128 --duration 20 --output load.json
+
+A pool of virtual users runs a weighted mix of operations (see --mix):
+    list      GET /problems/?skip=..&limit=..   random page
+    detail    GET /problems/{slug}              slug drawn from a Zipfian popularity curve
+    solution  POST /problems/{slug}/solutions   new solution on a Zipf-chosen problem
+    category  PUT /categories/                  renames a category owned by the run
+
+Write operations modify the target database; only point this at a disposable instance.
+With --steps, each concurrency level runs for --duration and the report shows where
+throughput stops growing, i.e. the saturation point.
+"""
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+DEFAULT_MIX = "list=30,detail=65,solution=4,category=1"
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    unknown = set(weights) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operations in mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+class Zipf:
+    """ Draws ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** exponent. """
+
+    def __init__(self, n: int, exponent: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1.0 / (rank + 1) ** exponent for rank in range(n)))
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1])
+
+
+class Recorder:
+    """ Collects latency samples and outcomes per operation. """
+
+    def __init__(self):
+        self.latencies = {}
+        self.outcomes = {}
+
+    def record(self, operation: str, latency_ms: float, outcome: str):
+        self.latencies.setdefault(operation, []).append(latency_ms)
+        self.outcomes.setdefault(operation, Counter())[outcome] += 1
+
+    def report(self, elapsed_seconds: float) -> dict:
+        operations = {}
+        for operation, samples in self.latencies.items():
+            ordered = sorted(samples)
+            outcomes = self.outcomes[operation]
+            errors = sum(count for outcome, count in outcomes.items() if not outcome.startswith("2"))
+            histogram = Counter(HISTOGRAM_BOUNDS_MS[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, sample)] for sample in samples)
+            operations[operation] = {
+                "requests": len(samples),
+                "throughput_rps": len(samples) / elapsed_seconds,
+                "error_rate": errors / len(samples),
+                "outcomes": dict(outcomes),
+                "mean_ms": statistics.fmean(samples),
+                "p50_ms": ordered[int(0.50 * (len(ordered) - 1))],
+                "p90_ms": ordered[int(0.90 * (len(ordered) - 1))],
+                "p99_ms": ordered[int(0.99 * (len(ordered) - 1))],
+                "max_ms": ordered[-1],
+                "histogram_ms": {("+Inf" if bound == float("inf") else str(bound)): histogram.get(bound, 0) for bound in HISTOGRAM_BOUNDS_MS},
+            }
+        total = sum(len(samples) for samples in self.latencies.values())
+        errors = sum(op["error_rate"] * op["requests"] for op in operations.values())
+        everything = sorted(itertools.chain.from_iterable(self.latencies.values())) or [0.0]
+        return {
+            "requests": total,
+            "throughput_rps": total / elapsed_seconds,
+            "error_rate": errors / total if total else 0.0,
+            "p50_ms": everything[int(0.50 * (len(everything) - 1))],
+            "p99_ms": everything[int(0.99 * (len(everything) - 1))],
+            "operations": operations,
+        }
+
+
+class Scenario:
+    """ Shared state for one run: the target catalog and the operation picker. """
+
+    def __init__(self, client: httpx.AsyncClient, slugs, categories, weights: dict, page_size: int, zipf_exponent: float, seed: int):
+        self.client = client
+        self.rng = random.Random(seed)
+        self.slugs = slugs
+        self.categories = categories
+        self.page_size = page_size
+        self.popularity = Zipf(len(slugs), zipf_exponent, self.rng)
+        self.operations = list(weights)
+        self.cumulative = list(itertools.accumulate(weights.values()))
+        self.sequence = itertools.count()
+
+    def pick_operation(self) -> str:
+        return self.operations[bisect.bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1])]
+
+    def popular_slug(self) -> str:
+        return self.slugs[self.popularity.sample()]
+
+
+async def op_list(scenario: Scenario):
+    skip = scenario.rng.randrange(0, max(1, len(scenario.slugs) - scenario.page_size + 1))
+    return await scenario.client.get("/problems/", params={"skip": skip, "limit": scenario.page_size})
+
+
+async def op_detail(scenario: Scenario):
+    return await scenario.client.get(f"/problems/{scenario.popular_slug()}")
+
+
+async def op_solution(scenario: Scenario):
+    return await scenario.client.post(f"/problems/{scenario.popular_slug()}/solutions", json={
+        "name": f"loadgen-{uuid.uuid4().hex[:12]}",
+        "description": "Generated by the load generator",
+        "code": "pass",
+        "time_complexity": scenario.rng.choice(["O(1)", "O(n)", "O(nlog(n))", "O(n^2)"]),
+        "space_complexity": scenario.rng.choice(["O(1)", "O(n)"]),
+    })
+
+
+async def op_category(scenario: Scenario):
+    if not scenario.categories:
+        return None
+    index = scenario.rng.randrange(len(scenario.categories))
+    old_name = scenario.categories[index]
+    new_name = f"{old_name.split('#')[0]}#{next(scenario.sequence)}"
+    response = await scenario.client.put("/categories/", json={"old_category": {"name": old_name}, "new_category": {"name": new_name}})
+    if response.status_code == 200:
+        scenario.categories[index] = new_name
+    return response
+
+
+OPERATIONS = {"list": op_list, "detail": op_detail, "solution": op_solution, "category": op_category}
+
+
+async def virtual_user(scenario: Scenario, recorder: Recorder, deadline: float):
+    while time.perf_counter() < deadline:
+        operation = scenario.pick_operation()
+        start = time.perf_counter()
+        try:
+            response = await OPERATIONS[operation](scenario)
+            if response is None:
+                continue
+            outcome = str(response.status_code)
+        except httpx.TimeoutException:
+            outcome = "timeout"
+        except httpx.HTTPError as err:
+            outcome = type(err).__name__
+        recorder.record(operation, (time.perf_counter() - start) * 1000, outcome)
+
+
+async def discover_slugs(client: httpx.AsyncClient, page_size: int = 200) -> list:
+    """ Pages through GET /problems/ once to learn which slugs exist. """
+    slugs, skip = [], 0
+    while True:
+        response = await client.get("/problems/", params={"skip": skip, "limit": page_size})
+        response.raise_for_status()
+        page = response.json()
+        slugs.extend(problem["slug_id"] for problem in page)
+        if len(page) < page_size:
+            return slugs
+        skip += page_size
+
+
+async def create_run_categories(client: httpx.AsyncClient, count: int) -> list:
+    """ Creates the categories the "category" operation is allowed to rename. """
+    run_id = uuid.uuid4().hex[:8]
+    names = []
+    for index in range(count):
+        name = f"loadgen-{run_id}-{index}"
+        response = await client.post("/categories/", json={"name": name})
+        response.raise_for_status()
+        names.append(name)
+    return names
+
+
+async def run_level(args, weights: dict, slugs: list, categories: list, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        scenario = Scenario(client, slugs, categories, weights, args.page_size, args.zipf, args.seed + concurrency)
+        recorder = Recorder()
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(virtual_user(scenario, recorder, deadline) for _ in range(concurrency)))
+        report = recorder.report(time.perf_counter() - start)
+    report["concurrency"] = concurrency
+    print(f"concurrency {concurrency:5d}: {report['throughput_rps']:9.1f} req/s, "
+          f"p50 {report['p50_ms']:8.2f} ms, p99 {report['p99_ms']:8.2f} ms, errors {report['error_rate']:.2%}")
+    return report
+
+
+def find_saturation(levels: list, min_gain: float) -> int:
+    """ Returns the last concurrency level whose throughput grew by at least min_gain over the previous one. """
+    saturation = levels[0]["concurrency"]
+    for previous, current in zip(levels, levels[1:]):
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain) or current["error_rate"] > previous["error_rate"]:
+            break
+        saturation = current["concurrency"]
+    return saturation
+
+
+async def main_async(args) -> dict:
+    """ Runs every concurrency level and returns the report; writing it is left to main(). """
+    weights = parse_mix(args.mix)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        slugs = await discover_slugs(client)
+        if not slugs:
+            raise SystemExit("The target has no problems; seed it first (see benchmarks/seed.py)")
+        categories = await create_run_categories(client, args.categories) if weights.get("category") else []
+    print(f"Target {args.base_url}: {len(slugs)} problems, mix {weights}")
+
+    levels = [int(level) for level in args.steps.split(",")] if args.steps else [args.concurrency]
+    reports = [await run_level(args, weights, slugs, categories, level) for level in levels]
+    result = {"base_url": args.base_url, "mix": weights, "duration_seconds": args.duration, "levels": reports}
+    if len(reports) > 1:
+        result["saturation_concurrency"] = find_saturation(reports, args.min_gain)
+        print(f"Throughput stops scaling after concurrency {result['saturation_concurrency']}")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=32, help="virtual users for a single-level run")
+    parser.add_argument("--steps", help="comma-separated concurrency levels to step through, e.g. 8,16,32,64")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--page-size", type=int, default=50, help="limit for list requests")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of problem popularity")
+    parser.add_argument("--categories", type=int, default=5, help="categories created for the category operation")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument("--min-gain", type=float, default=0.05, help="throughput growth below which a step counts as saturated")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the full report to this JSON file")
+    args = parser.parse_args(argv)
+    result = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
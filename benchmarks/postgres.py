@@ -0,0 +1,82 @@
+"""
+Throwaway PostgreSQL cluster for benchmarks.
+
+A fresh cluster is initialised in a temporary directory, listens only on a unix socket in
+that directory and is removed on exit, so benchmarks never touch a developer's database.
+"""
+import glob
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+
+
+def find_pg_bin() -> str:
+    """
+    Locates the directory holding initdb and pg_ctl.
+
+    PG_BIN takes precedence, then PATH, then the usual Debian/Ubuntu layout.
+
+    Returns:
+        str: The directory containing the PostgreSQL server binaries.
+
+    Raises:
+        RuntimeError: If no PostgreSQL installation can be found.
+    """
+    if os.environ.get("PG_BIN"):
+        return os.environ["PG_BIN"]
+    initdb = shutil.which("initdb")
+    if initdb:
+        return os.path.dirname(initdb)
+    candidates = sorted(glob.glob("/usr/lib/postgresql/*/bin/initdb"))
+    if candidates:
+        return os.path.dirname(candidates[-1])
+    raise RuntimeError("PostgreSQL server binaries not found; install PostgreSQL or set PG_BIN")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ThrowawayPostgres:
+    """
+    Context manager that runs a temporary PostgreSQL cluster.
+
+    Usage:
+        with ThrowawayPostgres() as pg:
+            engine = create_engine(pg.url)
+
+    Note that initdb refuses to run as root.
+    """
+
+    def __init__(self, database: str = "zenith_bench", user: str = "bench"):
+        self.database = database
+        self.user = user
+        self.bin_dir = find_pg_bin()
+        self.port = free_port()
+        self.directory = None
+
+    @property
+    def url(self) -> str:
+        return f"postgresql://{self.user}@/{self.database}?host={self.directory}&port={self.port}"
+
+    def _run(self, binary: str, *args):
+        subprocess.run([os.path.join(self.bin_dir, binary), *args], check=True, capture_output=True)
+
+    def __enter__(self):
+        self.directory = tempfile.mkdtemp(prefix="zenith-bench-pg-")
+        data = os.path.join(self.directory, "data")
+        self._run("initdb", "-D", data, "-U", self.user, "--auth=trust", "-E", "UTF8")
+        options = f"-p {self.port} -k {self.directory} -c listen_addresses=''"
+        self._run("pg_ctl", "-D", data, "-o", options, "-l", os.path.join(self.directory, "server.log"), "-w", "start")
+        self._run("createdb", "-h", self.directory, "-p", str(self.port), "-U", self.user, self.database)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self._run("pg_ctl", "-D", os.path.join(self.directory, "data"), "-m", "immediate", "stop")
+        finally:
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,77 @@
+"""
+Synthetic catalog generator for benchmarks.
+"""
+import random
+from sqlalchemy import insert, select
+from app.db.models.category import Category
+from app.db.models.problem import Problem, problem_category
+from app.db.models.solution import Solution
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+COMPLEXITIES = ["O(1)", "O(log(n))", "O(n)", "O(nlog(n))", "O(n^2)", "O(n^3)", "O(2^n)", "O(n!)"]
+WORDS = [
+    "array", "string", "tree", "graph", "path", "sum", "subarray", "window", "matrix", "interval",
+    "palindrome", "substring", "sequence", "heap", "stack", "queue", "island", "cycle", "merge", "partition",
+]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def seed_catalog(connection, problems: int, categories: int, solutions: int, categories_per_problem: int = 3, seed: int = 42):
+    """
+    Inserts a synthetic catalog of problems, categories and solutions.
+
+    Parameters:
+        connection (Connection): An open SQLAlchemy connection; the caller commits.
+        problems (int): Number of problems to create.
+        categories (int): Number of categories to create.
+        solutions (int): Number of solutions per problem.
+        categories_per_problem (int): Maximum number of categories linked to each problem.
+        seed (int): Random seed, so runs with the same sizes produce the same catalog.
+
+    Returns:
+        dict: The slugs and category names that were created, for picking benchmark inputs.
+    """
+    rng = random.Random(seed)
+    category_names = [f"Category {index}" for index in range(categories)]
+    connection.execute(insert(Category), [{"name": name} for name in category_names])
+    category_ids = connection.execute(select(Category.id)).scalars().all()
+
+    slugs = [f"bench-problem-{index}" for index in range(problems)]
+    connection.execute(insert(Problem), [
+        {
+            "slug_id": slug,
+            "title": _sentence(rng, 4).title(),
+            "difficulty": rng.choice(DIFFICULTIES),
+            "description": _sentence(rng, 80),
+            "constraints": "1 <= n <= 10^5",
+            "examples": [_sentence(rng, 12) for _ in range(2)],
+            "clarifying_questions": [_sentence(rng, 8)],
+            "best_time_complexity": rng.choice(COMPLEXITIES),
+            "best_space_complexity": rng.choice(COMPLEXITIES),
+        }
+        for slug in slugs
+    ])
+    problem_ids = connection.execute(select(Problem.id)).scalars().all()
+
+    links = []
+    for problem_id in problem_ids:
+        for category_id in rng.sample(category_ids, k=rng.randint(1, min(categories_per_problem, len(category_ids)))):
+            links.append({"problem_id": problem_id, "category_id": category_id})
+    connection.execute(insert(problem_category), links)
+
+    connection.execute(insert(Solution), [
+        {
+            "name": f"Approach {index}",
+            "description": _sentence(rng, 30),
+            "code": "\n".join(_sentence(rng, 6) for _ in range(15)),
+            "time_complexity": rng.choice(COMPLEXITIES),
+            "space_complexity": rng.choice(COMPLEXITIES),
+            "problem_id": problem_id,
+        }
+        for problem_id in problem_ids
+        for index in range(solutions)
+    ])
+    return {"slugs": slugs, "categories": category_names}
@@ -3,7 +3,17 @@ from unittest.mock import MagicMock, create_autospec
 from fastapi.testclient import TestClient
 from app.main import app
 from sqlalchemy.orm import Session
-from app.db.utils import get_db
+from app.db.utils import get_db, get_read_db
+from app.cache.catalog import get_catalog_cache, get_list_cache
+
+@pytest.fixture(autouse=True)
+def clear_catalog_cache():
+    # Cached reads would otherwise leak between tests that reuse the same keys
+    get_catalog_cache().clear()
+    get_list_cache().clear()
+    yield
+    get_catalog_cache().clear()
+    get_list_cache().clear()
 
 # Create a mock session
 @pytest.fixture
@@ -15,6 +25,7 @@ def mock_db():
 def client(mock_db):
     # Override the dependency
     app.dependency_overrides[get_db] = lambda: mock_db
+    app.dependency_overrides[get_read_db] = lambda: mock_db
     test_client = TestClient(app)
     yield test_client
     # Clean up after tests
@@ -29,3 +40,41 @@ def mock_db_query(mock_db):
     mock_query = MagicMock()
     mock_db.query = mock_query
     return mock_query
+
+@pytest.fixture(scope="session")
+def live_db():
+    """
+    Fixture for tests that need a real PostgreSQL database (as in CI).
+    The tables are created with init_db(); the test is skipped if the database is unreachable.
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+    from omegaconf.errors import OmegaConfBaseException
+    from app.db.database import get_engine
+    from app.db.utils import init_db
+    try:
+        with get_engine().connect():
+            pass
+    except (SQLAlchemyError, OmegaConfBaseException) as err:
+        pytest.skip(f"PostgreSQL is not available: {err}")
+    init_db()
+    return get_engine()
+
+@pytest.fixture
+def live_client(live_db):
+    """ Test client running against the live database, without dependency overrides. """
+    app.dependency_overrides.clear()
+    return TestClient(app)
+
+@pytest.fixture
+def assert_max_statements():
+    """
+    Asserts that a response's Server-Timing header reports at most `budget` SQL statements.
+    Usage: assert_max_statements(client.get("/problems/"), 4)
+    """
+    from app.observability.sql import parse_statement_count
+
+    def check(response, budget):
+        count = parse_statement_count(response.headers["server-timing"])
+        assert count <= budget, f"{response.request.method} {response.request.url.path} issued {count} SQL statements, budget is {budget}"
+        return count
+    return check
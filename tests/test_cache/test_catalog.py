@@ -0,0 +1,50 @@
+# tests/test_cache/test_catalog.py
+from app.cache.catalog import cached, get_catalog_cache
+from app.db import events
+
+
+class FakeSession:
+    def __init__(self, **info):
+        self.info = info
+
+
+def test_cached_reads_are_stored_from_the_primary():
+    calls = []
+
+    @cached("thing")
+    def get_thing(db, slug_id: str):
+        calls.append(slug_id)
+        return {"slug_id": slug_id}
+
+    get_thing(FakeSession(), "two-sum")
+    get_thing(FakeSession(), "two-sum")
+    assert calls == ["two-sum"]
+
+
+def test_lagging_replica_reads_are_not_stored(monkeypatch):
+    monkeypatch.setattr(events, "_seen_seq", 10)
+    calls = []
+
+    @cached("thing")
+    def get_thing(db, slug_id: str):
+        calls.append(db.info.get("replica_seq"))
+        return {"slug_id": slug_id}
+
+    get_thing(FakeSession(replica_seq=9), "two-sum")
+    assert get_catalog_cache().get("thing:two-sum") is None
+    get_thing(FakeSession(replica_seq=10), "two-sum")
+    get_thing(FakeSession(replica_seq=9), "two-sum")
+    assert calls == [9, 10]
+
+
+def test_recent_writers_bypass_the_cache():
+    calls = []
+
+    @cached("thing")
+    def get_thing(db, slug_id: str):
+        calls.append(slug_id)
+        return {"slug_id": slug_id}
+
+    get_thing(FakeSession(), "two-sum")
+    get_thing(FakeSession(reads_own_writes=True), "two-sum")
+    assert calls == ["two-sum", "two-sum"]
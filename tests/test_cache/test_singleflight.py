@@ -0,0 +1,139 @@
+# tests/test_cache/test_singleflight.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.cache.singleflight import SingleFlight, coalesce
+from app.db.deadlines import RequestCancelled
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight("test")
+    executions = []
+    release = threading.Event()
+
+    def fetch():
+        executions.append(1)
+        release.wait(timeout=5)
+        return ["result"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(group.do, "key", fetch) for _ in range(8)]
+        # Wait until every follower has joined the leader's call
+        while group.stats()["calls"] < 8:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(executions) == 1
+    assert all(result is results[0] for result in results)
+    stats = group.stats()
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 7
+    assert stats["in_flight"] == 0
+
+
+def test_sequential_calls_are_not_cached():
+    group = SingleFlight("test")
+    assert group.do("key", lambda: 1) == 1
+    assert group.do("key", lambda: 2) == 2
+    assert group.stats()["executions"] == 2
+
+
+def test_errors_are_shared_with_followers():
+    group = SingleFlight("test")
+    release = threading.Event()
+
+    def fail():
+        release.wait(timeout=5)
+        raise ValueError("Problem not found")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(group.do, "key", fail) for _ in range(3)]
+        while group.stats()["calls"] < 3:
+            time.sleep(0.001)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="Problem not found"):
+                future.result()
+    assert group.stats()["in_flight"] == 0
+
+
+def test_followers_retry_when_the_leader_is_cancelled():
+    group = SingleFlight("test")
+    cancel = threading.Event()
+    release = threading.Event()
+    executions = []
+
+    def fetch():
+        executions.append(1)
+        if len(executions) == 1:
+            # The leader's client disconnects while the followers are waiting
+            cancel.wait(timeout=5)
+            raise RequestCancelled("Client disconnected")
+        release.wait(timeout=5)
+        return ["result"]
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(group.do, "key", fetch) for _ in range(3)]
+        while group.stats()["calls"] < 3:
+            time.sleep(0.001)
+        cancel.set()
+        # Both followers rejoin a single retry before it finishes
+        while group.stats()["calls"] < 5:
+            time.sleep(0.001)
+        release.set()
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except RequestCancelled:
+                outcomes.append("cancelled")
+
+    assert outcomes.count("cancelled") == 1
+    assert outcomes.count(["result"]) == 2
+    assert len(executions) == 2
+    stats = group.stats()
+    assert stats["retried"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_coalesce_ignores_session_in_key():
+    calls = []
+
+    @coalesce
+    def get_thing(db, slug_id: str, limit: int = 10):
+        calls.append((db, slug_id, limit))
+        return slug_id
+
+    assert get_thing("session-a", "two-sum") == "two-sum"
+    assert get_thing(db="session-b", slug_id="two-sum", limit=10) == "two-sum"
+    assert get_thing.singleflight.stats()["calls"] == 2
+    assert len(calls) == 2
+
+
+class FakeSession:
+    def __init__(self, **info):
+        self.info = info
+
+
+def test_replica_and_primary_reads_do_not_share_a_call():
+    group_key = []
+
+    @coalesce
+    def get_thing(db, slug_id: str):
+        return slug_id
+
+    get_thing.singleflight.do = lambda key, fn, *args, **kwargs: group_key.append(key) or fn(*args, **kwargs)
+    get_thing(FakeSession(), "two-sum")
+    get_thing(FakeSession(replica_seq=3), "two-sum")
+    assert group_key[0] != group_key[1]
+
+
+def test_recent_writers_do_not_coalesce():
+    @coalesce
+    def get_thing(db, slug_id: str):
+        return slug_id
+
+    assert get_thing(FakeSession(reads_own_writes=True), "two-sum") == "two-sum"
+    assert get_thing.singleflight.stats()["calls"] == 0
@@ -0,0 +1,93 @@
+# tests/test_cache/test_swr.py
+import threading
+import time
+from unittest.mock import MagicMock
+from app.cache.swr import StaleWhileRevalidateCache, normalize_key
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def make_cache(ttl_seconds=60, stale_seconds=60):
+    session_factory = MagicMock()
+    cache = StaleWhileRevalidateCache(session_factory, ttl_seconds=ttl_seconds, stale_seconds=stale_seconds, max_entries=8)
+    return cache, session_factory
+
+
+def test_normalize_key_ignores_order_and_none():
+    assert normalize_key("problems", skip=0, limit=10, category=None) == normalize_key("problems", limit=10, skip=0)
+
+
+def test_fresh_entries_are_served_from_cache():
+    cache, _ = make_cache()
+    loader = MagicMock(return_value=["page"])
+    assert cache.get_or_load("key", loader, "request-db") == (["page"], "miss")
+    assert cache.get_or_load("key", loader, "request-db") == (["page"], "hit")
+    loader.assert_called_once_with("request-db")
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    cache, session_factory = make_cache(ttl_seconds=60)
+    cache.get_or_load("key", lambda db: "v1", "request-db")
+    cache.expire_all()
+
+    release = threading.Event()
+    refreshes = []
+
+    def slow_loader(db):
+        refreshes.append(db)
+        release.wait(timeout=5)
+        return "v2"
+
+    # Both reads get the stale value immediately; only one refresh is scheduled
+    assert cache.get_or_load("key", slow_loader, "request-db") == ("v1", "stale")
+    assert cache.get_or_load("key", slow_loader, "request-db") == ("v1", "stale")
+    release.set()
+    wait_for(lambda: cache.stats()["refreshes"] == 1)
+
+    assert refreshes == [session_factory.return_value]
+    session_factory.return_value.close.assert_called_once()
+    assert cache.get_or_load("key", slow_loader, "request-db") == ("v2", "hit")
+
+
+def test_failed_refresh_keeps_serving_stale():
+    cache, _ = make_cache()
+    cache.get_or_load("key", lambda db: "v1", None)
+    cache.expire_all()
+
+    def broken_loader(db):
+        raise RuntimeError("database unavailable")
+
+    assert cache.get_or_load("key", broken_loader, None) == ("v1", "stale")
+    wait_for(lambda: cache.stats()["refresh_errors"] == 1)
+    assert cache.get_or_load("key", lambda db: "v2", None) == ("v1", "stale")
+
+
+def test_entries_past_the_stale_window_are_recomputed_inline():
+    cache, _ = make_cache(ttl_seconds=0, stale_seconds=0)
+    cache.get_or_load("key", lambda db: "v1", None)
+    assert cache.get_or_load("key", lambda db: "v2", None) == ("v2", "miss")
+
+
+def test_values_read_from_a_lagging_replica_are_not_stored():
+    current = {"lagging": True}
+    cache = StaleWhileRevalidateCache(MagicMock(), ttl_seconds=60, stale_seconds=60, max_entries=8,
+                                      is_current=lambda db: not current["lagging"])
+    assert cache.get_or_load("key", lambda db: "v1", None) == ("v1", "miss")
+    assert cache.get_or_load("key", lambda db: "v2", None) == ("v2", "miss")
+
+    current["lagging"] = False
+    cache.get_or_load("key", lambda db: "v3", None)
+    cache.expire_all()
+    current["lagging"] = True
+    # The refresh read an older page: the stale entry stays and the next read refreshes again
+    assert cache.get_or_load("key", lambda db: "v4", None) == ("v3", "stale")
+    wait_for(lambda: cache.stats()["not_current"] == 3)
+    current["lagging"] = False
+    assert cache.get_or_load("key", lambda db: "v5", None) == ("v3", "stale")
+    wait_for(lambda: cache.stats()["refreshes"] == 1)
+    assert cache.get_or_load("key", lambda db: "v6", None) == ("v5", "hit")
@@ -0,0 +1,77 @@
+# tests/test_cache/test_tiered.py
+from app.cache.tiered import LocalLRU, LocalSharedTier, TieredCache
+from app.cache import catalog
+from app.schemas.problems import ProblemOut
+
+
+def make_cache(max_entries=2):
+    return TieredCache(local=LocalLRU(max_entries=max_entries, ttl_seconds=60), shared=LocalSharedTier(ttl_seconds=60))
+
+
+def test_local_lru_evicts_least_recently_used():
+    lru = LocalLRU(max_entries=2, ttl_seconds=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert lru.get("a") == 1
+    assert lru.get("b", None) is None
+    assert lru.get("c") == 3
+
+
+def test_local_lru_expires_entries():
+    lru = LocalLRU(max_entries=2, ttl_seconds=-1)
+    lru.set("a", 1)
+    assert lru.get("a", None) is None
+
+
+def test_shared_tier_backfills_local():
+    cache = make_cache(max_entries=1)
+    cache.set("problem:a", ["a"])
+    cache.set("problem:b", ["b"])  # evicts "problem:a" from the local LRU only
+    assert cache.get("problem:a") == ["a"]
+    stats = cache.stats()
+    assert stats["shared_hits"] == 1
+
+
+def test_stale_generation_is_not_stored():
+    cache = make_cache()
+    generation = cache.generation
+    cache.invalidate("problem:a")
+    cache.set("problem:a", "old row", generation=generation)
+    assert cache.get("problem:a") is None
+
+
+def test_invalidate_prefix_clears_both_tiers():
+    cache = make_cache(max_entries=10)
+    cache.set("problem:a", 1)
+    cache.set("problem:b", 2)
+    cache.set("categories", ["Array"])
+    cache.invalidate_prefix("problem:")
+    assert cache.get("problem:a") is None
+    assert cache.get("problem:b") is None
+    assert cache.get("categories") == ["Array"]
+
+
+def test_cached_read_is_invalidated_by_change():
+    calls = []
+
+    @catalog.cached("problem")
+    def get_problem(db, slug_id: str):
+        calls.append(slug_id)
+        return ProblemOut(
+            slug_id=slug_id, title="Two Sum", difficulty="Easy", categories=[], description="",
+            best_time_complexity="NA", best_space_complexity="NA", solutions=[], real_world_applications=[],
+        )
+
+    first = get_problem(None, "two-sum")
+    assert get_problem(None, slug_id="two-sum") is first
+    assert calls == ["two-sum"]
+
+    catalog.invalidate_catalog({"entity": "solution", "op": "create", "key": "two-sum"})
+    get_problem(None, "two-sum")
+    assert calls == ["two-sum", "two-sum"]
+
+    catalog.invalidate_catalog({"entity": "category", "op": "update", "key": "Hashing", "previous_key": "Hash"})
+    get_problem(None, "two-sum")
+    assert len(calls) == 3
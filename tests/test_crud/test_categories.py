@@ -1,5 +1,6 @@
 # tests/test_crud/test_categories.py
 from app.crud import categories
+import app.db.models.category as models
 from app.schemas.categories import Category
 import uuid
 from unittest.mock import MagicMock
@@ -116,6 +117,9 @@ def test_delete_category_existing(mock_db):
     assert result is True
     mock_db.delete.assert_called_once_with(mock_existing_category)
     mock_db.commit.assert_called_once()
+    # Children re-parented by the raw statement are reloaded before the ORM delete
+    calls = [call[0] for call in mock_db.mock_calls]
+    assert calls.index("execute") < calls.index("expire_all") < calls.index("delete")
 
 def test_delete_category_not_found(mock_db):
     # Setup mock behavior for non-existent category
@@ -127,3 +131,61 @@ def test_delete_category_not_found(mock_db):
     
     with pytest.raises(Exception, match=f"Category with name {category_name} not found."):
         categories.delete_category(db=mock_db, category=category_schema)
+
+
+def test_get_category_cooccurrence_scores_pairs(mock_db):
+    links = [(1, "Graphs"), (1, "BFS"), (2, "Graphs"), (2, "BFS"), (3, "Graphs"), (3, "DFS"), (4, "Arrays")]
+    mock_db.query.return_value.scalar.return_value = 4
+    mock_db.query.return_value.join.return_value.all.return_value = links
+    result = categories.get_category_cooccurrence(mock_db)
+    assert result.problems == 4
+    assert [(pair.first, pair.second, pair.count) for pair in result.pairs] == [("BFS", "Graphs", 2), ("DFS", "Graphs", 1)]
+    # BFS: 2 problems, Graphs: 3, together: 2 of 4
+    assert result.pairs[0].lift == round(2 * 4 / (2 * 3), 4)
+    assert result.pairs[0].jaccard == round(2 / 3, 4)
+    assert categories.get_category_cooccurrence(mock_db, category="DFS").pairs[0].second == "Graphs"
+    assert categories.get_category_cooccurrence(mock_db, min_count=2, limit=1).pairs[0].first == "BFS"
+    with pytest.raises(ValueError):
+        categories.get_category_cooccurrence(mock_db, min_count=0)
+
+
+def test_create_category_links_closure_under_parent(mock_db):
+    parent = models.Category(name="Graphs", id=7)
+    mock_db.query.return_value.filter.return_value.first.side_effect = [None, parent]
+
+    created = categories.create_category(db=mock_db, category=Category(name="Shortest Path", parent="Graphs"))
+
+    assert created.parent_id == 7
+    closure_call = mock_db.execute.call_args_list[0]
+    assert "category_closure" in str(closure_call.args[0])
+    assert closure_call.args[1]["parent_id"] == 7
+
+
+def test_update_category_refuses_to_move_under_own_descendant(mock_db):
+    graphs = models.Category(name="Graphs", id=1)
+    dijkstra = models.Category(name="Dijkstra", id=3, parent_id=2)
+    mock_db.query.return_value.filter.return_value.first.side_effect = [graphs, dijkstra, models.CategoryClosure(ancestor_id=1, descendant_id=3, depth=2)]
+
+    with pytest.raises(ValueError, match="inside the subtree"):
+        categories.update_category(db=mock_db, old_category=Category(name="Graphs"), new_category=Category(name="Graphs", parent="Dijkstra"))
+    mock_db.commit.assert_not_called()
+
+
+def test_create_category_with_missing_parent_raises_parent_not_found(mock_db):
+    mock_db.query.return_value.filter.return_value.first.side_effect = [None, None]
+    with pytest.raises(categories.ParentNotFoundError, match="Parent category Graphs not found."):
+        categories.create_category(db=mock_db, category=Category(name="Shortest Path", parent="Graphs"))
+    mock_db.add.assert_not_called()
+
+
+def test_missing_parent_returns_404(client, mock_db):
+    mock_db.query.return_value.filter.return_value.first.side_effect = [None, None]
+    response = client.post("/categories/", json={"name": "Shortest Path", "parent": "Graphs"})
+    assert response.status_code == 404
+    assert response.json()["detail"]["message"] == "Parent category not found"
+
+
+def test_other_lookup_errors_are_not_reported_as_missing_parents(client, mock_db):
+    mock_db.query.return_value.filter.return_value.first.side_effect = KeyError("name")
+    response = client.post("/categories/", json={"name": "Shortest Path", "parent": "Graphs"})
+    assert response.status_code == 500
@@ -0,0 +1,52 @@
+# tests/test_crud/test_changes.py
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+from app.config import get_settings
+from app.crud import changes
+
+
+def change_row(seq, op="update", key="two-sum", data=None):
+    return SimpleNamespace(id=seq, entity="problem", op=op, key=key, data=data, changed_at=datetime.now(timezone.utc))
+
+
+def setup_changes(mock_db, rows):
+    mock_db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = rows
+
+
+def test_get_changes_pages_with_cursor(mock_db):
+    setup_changes(mock_db, [change_row(11), change_row(12, op="delete"), change_row(13)])
+    page = changes.get_changes(mock_db, since=10, limit=2)
+    # One extra row is fetched to tell whether more are waiting
+    mock_db.query.return_value.filter.return_value.order_by.return_value.limit.assert_called_once_with(3)
+    assert [change.seq for change in page.changes] == [11, 12]
+    assert page.changes[1].op == "delete"
+    assert page.cursor == 12
+    assert page.has_more is True
+
+
+def test_get_changes_keeps_cursor_when_nothing_changed(mock_db):
+    setup_changes(mock_db, [])
+    page = changes.get_changes(mock_db, since=42)
+    assert page.changes == [] and page.cursor == 42 and page.has_more is False
+
+
+def test_get_changes_rejects_negative_cursor(mock_db):
+    with pytest.raises(ValueError):
+        changes.get_changes(mock_db, since=-1)
+
+
+def test_changes_endpoint(client, mock_db):
+    setup_changes(mock_db, [change_row(5, op="update", key="two-sum", data={"previous_key": "2-sum"})])
+    response = client.get("/changes?since=4")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["cursor"] == 5 and body["has_more"] is False
+    assert body["changes"][0]["data"] == {"previous_key": "2-sum"}
+    assert client.get("/changes?since=-1").status_code == 400
+
+
+def test_changes_endpoint_caps_limit(client, mock_db):
+    max_limit = get_settings().changes.max_limit
+    assert client.get(f"/changes?limit={max_limit + 1}").status_code == 422
+    mock_db.query.assert_not_called()
@@ -1,6 +1,7 @@
 # tests/test_crud/test_problems.py
 import uuid
 from app.schemas.problems import ProblemIn
+from app.schemas.solutions import Solution
 from app.db.models.problem import Problem
 from app.db.models.category import Category
 from app.crud import problems
@@ -279,3 +280,37 @@ def test_delete_problem_not_found(mock_db):
     with pytest.raises(ValueError, match="Problem with slug_id 'non-existent' not found."):
         problems.delete_problem(db=mock_db, problem_id="non-existent")
 
+
+
+def test_search_problems_fuzzy_sets_threshold_and_ranks(mock_db):
+    found = Problem(id=1, slug_id="two-sum", title="Two Sum", difficulty="Easy", description="d", constraints="",
+                    examples=[], best_time_complexity="NA", best_space_complexity="NA")
+    mock_db.query.return_value.options.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [found]
+
+    result = problems.search_problems(mock_db, " two sume ", limit=5, threshold=0.3)
+
+    assert [problem.slug_id for problem in result] == ["two-sum"]
+    assert mock_db.execute.call_args.args[1] == {"threshold": "0.3"}
+    mock_db.query.return_value.options.return_value.filter.return_value.order_by.return_value.limit.assert_called_once_with(5)
+
+
+def test_search_problems_rejects_invalid_parameters(mock_db):
+    with pytest.raises(ValueError):
+        problems.search_problems(mock_db, "   ")
+    with pytest.raises(ValueError):
+        problems.search_problems(mock_db, "sum", mode="regex")
+
+
+def test_add_solution_commits_once(mock_db):
+    problem = Problem(id=1, slug_id="two-sum", title="Two Sum", difficulty="Easy", description="", examples=[],
+                      best_time_complexity="NA", best_space_complexity="NA")
+    mock_db.query.return_value.filter.return_value.first.side_effect = [problem, None]
+    solution = Solution(name="Hash Map", description="One pass", code="pass", time_complexity="O(n)", space_complexity="O(n)")
+
+    result = problems.add_solution_to_problem(mock_db, "two-sum", solution)
+
+    assert result.name == "Hash Map"
+    assert problem.best_time_complexity == "O(n)"
+    mock_db.flush.assert_called_once()
+    mock_db.commit.assert_called_once()
+    mock_db.refresh.assert_not_called()
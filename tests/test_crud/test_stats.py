@@ -0,0 +1,41 @@
+# tests/test_crud/test_stats.py
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from app.crud import stats
+
+
+def test_bucket_deltas_only_keeps_changes():
+    before = stats.problem_buckets("Easy", ["Arrays", "Hashing"], "O(n^2)", None)
+    after = stats.problem_buckets("Medium", ["Arrays"], "O(n)", "NA")
+    assert stats.bucket_deltas(removed=before, added=after) == {
+        ("difficulty", "Easy"): -1,
+        ("difficulty", "Medium"): 1,
+        ("category", "Hashing"): -1,
+        ("best_time_complexity", "O(n^2)"): -1,
+        ("best_time_complexity", "O(n)"): 1,
+    }
+
+
+def test_adjust_stats_upserts_in_one_statement(mock_db):
+    stats.adjust_stats(mock_db, stats.bucket_deltas(added=stats.problem_buckets("Easy", ["Arrays"], "NA", "NA")))
+    mock_db.execute.assert_called_once()
+    statement = str(mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (dimension, bucket) DO UPDATE" in statement
+
+
+def test_adjust_stats_skips_empty_deltas(mock_db):
+    stats.adjust_stats(mock_db, {})
+    mock_db.execute.assert_not_called()
+
+
+def test_stats_endpoint(client, mock_db):
+    rows = [("total", "all", 3), ("difficulty", "Easy", 2), ("difficulty", "Hard", 1),
+            ("category", "Arrays", 3), ("category", "Graphs", 0), ("best_time_complexity", "O(n)", 3)]
+    mock_db.query.return_value.all.return_value = [SimpleNamespace(dimension=d, bucket=b, count=c) for d, b, c in rows]
+    response = client.get("/stats")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert body["by_difficulty"] == {"Easy": 2, "Hard": 1}
+    assert body["by_category"] == {"Arrays": 3, "Graphs": 0}
+    assert body["by_best_space_complexity"] == {}
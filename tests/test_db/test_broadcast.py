@@ -0,0 +1,45 @@
+# tests/test_db/test_broadcast.py
+import asyncio
+import json
+import threading
+from app.db.broadcast import RESYNC, Broadcaster, format_event
+
+
+def test_changes_published_from_other_threads_reach_every_subscriber():
+    async def scenario():
+        broadcaster = Broadcaster(buffer_size=8)
+        broadcaster.start(asyncio.get_running_loop())
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        change = {"entity": "problem", "op": "update", "key": "two-sum", "seq": 7}
+        threading.Thread(target=broadcaster.publish, args=(change,)).start()
+        assert await first.next(1.0) == change
+        assert await second.next(1.0) == change
+        broadcaster.unsubscribe(second)
+        assert broadcaster.subscriptions == {first}
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_told_to_resync_without_affecting_others():
+    async def scenario():
+        broadcaster = Broadcaster(buffer_size=2)
+        broadcaster.start(asyncio.get_running_loop())
+        slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+        for seq in range(3):
+            broadcaster.publish({"entity": "category", "op": "create", "key": f"c{seq}", "seq": seq})
+            await asyncio.sleep(0)
+            assert (await fast.next(1.0))["seq"] == seq
+        assert slow.overflowed
+        assert await slow.next(1.0) is RESYNC
+        assert await slow.next(0.01) is None
+
+    asyncio.run(scenario())
+
+
+def test_format_event():
+    message = format_event({"entity": "solution", "op": "create", "key": "two-sum", "seq": 3, "origin": "host:1", "solution": "Hash Map"})
+    lines = message.splitlines()
+    assert message.endswith("\n\n")
+    assert lines[0] == "id: 3" and lines[1] == "event: solution"
+    assert json.loads(lines[2][len("data: "):]) == {"entity": "solution", "op": "create", "key": "two-sum", "seq": 3, "solution": "Hash Map"}
+    assert format_event(RESYNC).startswith("event: resync\n")
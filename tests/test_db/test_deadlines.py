@@ -0,0 +1,107 @@
+# tests/test_db/test_deadlines.py
+import asyncio
+import types
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from app.db import deadlines
+from app.db.deadlines import RequestCancelled, RequestDeadline, configure_statement_timeouts, current_deadline, is_cancellation
+from app.middleware.deadline import DeadlineMiddleware
+
+
+class DriverConnection:
+    """ Stands in for a psycopg connection, recording cancel requests. """
+
+    def __init__(self):
+        self.cancelled = 0
+
+    def cancel(self):
+        self.cancelled += 1
+
+
+@pytest.fixture(autouse=True)
+def restore_timeouts():
+    saved = deadlines._default_ms, deadlines._route_ms
+    yield
+    configure_statement_timeouts(*saved)
+
+
+@pytest.fixture
+def sqlite_engine():
+    engine = create_engine("sqlite://")
+    settings = []
+
+    @event.listens_for(engine, "connect")
+    def add_set_config(dbapi_connection, record):
+        dbapi_connection.create_function("set_config", 3, lambda name, value, local: settings.append((name, value, local)) or value)
+
+    engine.settings = settings
+    return engine
+
+
+def request_scope(method, route):
+    return {"type": "http", "method": method, "path": route, "route": types.SimpleNamespace(path=route)}
+
+
+def test_transactions_get_the_route_statement_timeout(sqlite_engine):
+    configure_statement_timeouts(5000, {"GET /problems/{problem_id}": 1000})
+    token = current_deadline.set(RequestDeadline(request_scope("GET", "/problems/{problem_id}")))
+    try:
+        with Session(bind=sqlite_engine) as db:
+            db.execute(text("SELECT 1"))
+    finally:
+        current_deadline.reset(token)
+    with Session(bind=sqlite_engine) as db:
+        db.execute(text("SELECT 1"))
+    assert sqlite_engine.settings == [("statement_timeout", "1000ms", 1), ("statement_timeout", "5000ms", 1)]
+
+
+def test_cancel_interrupts_running_statements_and_refuses_new_ones(sqlite_engine):
+    configure_statement_timeouts(None)
+    deadline = RequestDeadline(request_scope("GET", "/problems/"))
+    running = DriverConnection()
+    deadline.statement_started(running)
+    deadline.cancel()
+    assert running.cancelled == 1
+
+    token = current_deadline.set(deadline)
+    try:
+        with Session(bind=sqlite_engine) as db, pytest.raises(RequestCancelled):
+            db.execute(text("SELECT 1"))
+    finally:
+        current_deadline.reset(token)
+
+
+def test_is_cancellation_recognises_cancelled_and_timed_out_statements():
+    assert is_cancellation(RequestCancelled("Client disconnected"))
+    assert is_cancellation(types.SimpleNamespace(orig=RequestCancelled("Client disconnected")))
+    assert is_cancellation(types.SimpleNamespace(orig=types.SimpleNamespace(pgcode="57014")))
+    assert not is_cancellation(types.SimpleNamespace(orig=types.SimpleNamespace(pgcode="23505")))
+    assert not is_cancellation(ValueError("Problem not found"))
+
+
+def test_middleware_cancels_when_the_client_disconnects():
+    observed = {}
+
+    async def app(scope, receive, send):
+        await receive()
+        deadline = current_deadline.get()
+        for _ in range(100):
+            if deadline.cancelled:
+                break
+            await asyncio.sleep(0.01)
+        observed["cancelled"] = deadline.cancelled
+
+    async def scenario():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}, {"type": "http.disconnect"}]
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            pass
+
+        await DeadlineMiddleware(app)(request_scope("GET", "/problems/"), receive, send)
+
+    asyncio.run(scenario())
+    assert observed["cancelled"] is True
@@ -0,0 +1,52 @@
+# tests/test_db/test_events.py
+import json
+from app.db import events
+
+
+def test_emit_change_queues_notify_and_dispatches_on_commit(mock_db):
+    received = []
+    callback = events.subscribe(received.append)
+    try:
+        mock_db.execute.return_value.scalar_one.return_value = 7
+        events.emit_change(mock_db, "problem", "update", "two-sum", previous_key="2-sum")
+
+        # The NOTIFY is part of the session's transaction
+        statement, params = mock_db.execute.call_args.args
+        assert "pg_notify" in str(statement) and "INSERT INTO change_log" in str(statement)
+        payload = json.loads(params["payload"])
+        assert payload["key"] == "two-sum"
+        assert payload["origin"] == events.origin()
+
+        # Local subscribers only see the change once the session commits
+        assert received == []
+        events._dispatch_committed(mock_db)
+        # seq is the change_log id returned by the database
+        assert received[0].pop("seq") == 7
+        assert received == [{"entity": "problem", "op": "update", "key": "two-sum", "previous_key": "2-sum"}]
+    finally:
+        events.unsubscribe(callback)
+
+
+def test_rollback_discards_pending_changes(mock_db):
+    received = []
+    callback = events.subscribe(received.append)
+    try:
+        events.emit_change(mock_db, "category", "delete", "Graphs")
+        events._discard_rolled_back(mock_db)
+        events._dispatch_committed(mock_db)
+        assert received == []
+    finally:
+        events.unsubscribe(callback)
+
+
+def test_listener_skips_own_notifications():
+    received = []
+    callback = events.subscribe(received.append)
+    try:
+        listener = events.ChangeListener(engine=None, channel="zenith_changes")
+        listener._handle(json.dumps({"entity": "problem", "op": "create", "key": "a", "origin": events.origin()}))
+        listener._handle(json.dumps({"entity": "problem", "op": "create", "key": "b", "origin": "other-host:1"}))
+        listener._handle("not json")
+        assert received == [{"entity": "problem", "op": "create", "key": "b"}]
+    finally:
+        events.unsubscribe(callback)
@@ -0,0 +1,33 @@
+# tests/test_db/test_schema.py
+# A plain Base.metadata.create_all() (as the benchmarks use) must work on a database
+# without extensions; extension-backed objects are created by init_db only.
+import os
+import pytest
+from sqlalchemy import create_engine, create_mock_engine
+from app.db.database import Base
+import app.db.utils  # noqa: F401 - registers every model on Base.metadata
+
+
+def test_metadata_ddl_needs_no_extension():
+    statements = []
+    engine = create_mock_engine("postgresql://", lambda sql, *args, **kwargs: statements.append(str(sql.compile(dialect=engine.dialect))))
+    Base.metadata.create_all(engine, checkfirst=False)
+    assert any("CREATE TABLE problems" in statement for statement in statements)
+    assert not any("gin_trgm_ops" in statement for statement in statements)
+
+
+def test_create_all_on_a_bare_database():
+    from benchmarks.postgres import ThrowawayPostgres
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        pytest.skip("initdb refuses to run as root")
+    try:
+        postgres = ThrowawayPostgres(database="zenith_schema_test")
+    except RuntimeError as err:
+        pytest.skip(str(err))
+    with postgres:
+        engine = create_engine(postgres.url)
+        try:
+            Base.metadata.create_all(engine)
+            Base.metadata.drop_all(engine)
+        finally:
+            engine.dispose()
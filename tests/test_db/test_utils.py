@@ -1,5 +1,7 @@
 # tests/test_db/test_utils.py
-from app.db.utils import get_db, init_db
+from app.db.utils import RECENT_WRITE_COOKIE, get_db, get_read_db, init_db
+from app.db.database import get_engine, get_read_engine, reads_own_writes
+from fastapi import Request, Response
 import uuid
 from app.db.models.category import Category
 from app.db.models.problem import Problem
@@ -10,6 +12,30 @@ def test_get_db():
     assert db is not None
     db.close()
 
+def test_get_db_marks_the_client_as_a_recent_writer():
+    response = Response()
+    db = next(get_db(response))
+    db.close()
+    assert f"{RECENT_WRITE_COOKIE}=1" in response.headers["set-cookie"]
+    assert "Max-Age=5" in response.headers["set-cookie"]
+
+def test_get_read_db_uses_read_engine_unless_client_wrote_recently():
+    plain = Request({"type": "http", "headers": []})
+    recent = Request({"type": "http", "headers": [(b"cookie", f"{RECENT_WRITE_COOKIE}=1".encode())]})
+    read_db = next(get_read_db(plain))
+    primary_db = next(get_read_db(recent))
+    try:
+        assert read_db.get_bind() is get_read_engine()
+        assert primary_db.get_bind() is get_engine()
+        # Recent writers bypass the shared caches and coalescing
+        assert reads_own_writes(primary_db) and not reads_own_writes(read_db)
+        # Without a replica, reads share the primary's pool in read-only mode
+        assert get_read_engine().get_execution_options()["postgresql_readonly"] is True
+        assert get_read_engine().pool is get_engine().pool
+    finally:
+        read_db.close()
+        primary_db.close()
+
 def test_init_db():
     init_db()
     # Assuming init_db prints "Creating tables..." and "Tables created successfully."
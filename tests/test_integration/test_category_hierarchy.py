@@ -0,0 +1,41 @@
+# tests/test_integration/test_category_hierarchy.py
+# Category subtrees through the closure table, against a real database.
+import uuid
+
+
+def problem_slugs(client, category, **params):
+    response = client.get(f"/categories/{category}/problems", params=params)
+    assert response.status_code == 200
+    return {problem["slug_id"] for problem in response.json()}
+
+
+def test_subtree_queries_follow_moves_and_deletes(live_client):
+    token = uuid.uuid4().hex[:8]
+    graphs, shortest, dijkstra, trees = (f"{name} {token}" for name in ("Graphs", "Shortest Path", "Dijkstra", "Trees"))
+    assert live_client.post("/categories/", json={"name": graphs}).status_code == 201
+    assert live_client.post("/categories/", json={"name": trees}).status_code == 201
+    assert live_client.post("/categories/", json={"name": shortest, "parent": graphs}).status_code == 201
+    assert live_client.post("/categories/", json={"name": dijkstra, "parent": shortest}).json()["parent"] == shortest
+    slug = f"network-delay-{token}"
+    assert live_client.post("/problems/", json={
+        "slug_id": slug, "title": f"Network Delay {token}", "difficulty": "Medium",
+        "categories": [dijkstra], "description": "Hierarchy fixture",
+    }).status_code == 201
+
+    assert problem_slugs(live_client, graphs) == {slug}
+    assert problem_slugs(live_client, graphs, include_descendants=False) == set()
+
+    # Moving Shortest Path takes Dijkstra along
+    moved = live_client.put("/categories/", json={"old_category": {"name": shortest}, "new_category": {"name": shortest, "parent": trees}})
+    assert moved.status_code == 200
+    assert problem_slugs(live_client, graphs) == set()
+    assert problem_slugs(live_client, trees) == {slug}
+    cycle = live_client.put("/categories/", json={"old_category": {"name": trees}, "new_category": {"name": trees, "parent": dijkstra}})
+    assert cycle.status_code == 422
+    orphan = live_client.put("/categories/", json={"old_category": {"name": trees}, "new_category": {"name": trees, "parent": "missing-category"}})
+    assert orphan.status_code == 404
+
+    # Deleting Shortest Path keeps Dijkstra under Trees
+    assert live_client.request("DELETE", "/categories/", json={"name": shortest}).status_code == 200
+    assert problem_slugs(live_client, trees) == {slug}
+    assert live_client.get("/categories/missing-category/problems").status_code == 404
@@ -0,0 +1,22 @@
+# tests/test_integration/test_search.py
+# Typo-tolerant search against a real database with the pg_trgm extension.
+import uuid
+
+
+def test_fuzzy_search_tolerates_typos(live_client):
+    category = f"Search Category {uuid.uuid4()}"
+    assert live_client.post("/categories/", json={"name": category}).status_code == 201
+    token = uuid.uuid4().hex[:8]
+    slug = f"longest-palindromic-substring-{token}"
+    assert live_client.post("/problems/", json={
+        "slug_id": slug, "title": f"Longest Palindromic Substring {token}", "difficulty": "Medium",
+        "categories": [category], "description": "Search fixture",
+    }).status_code == 201
+
+    fuzzy = live_client.get("/problems/search", params={"q": f"longest palindrom {token}"})
+    assert fuzzy.status_code == 200
+    assert slug in [problem["slug_id"] for problem in fuzzy.json()]
+
+    contains = live_client.get("/problems/search", params={"q": f"substring {token}", "mode": "contains"})
+    assert [problem["slug_id"] for problem in contains.json()] == [slug]
+    assert live_client.get("/problems/search", params={"q": "x", "mode": "regex"}).status_code == 400
@@ -0,0 +1,55 @@
+# tests/test_integration/test_statement_budget.py
+# Statement budgets per endpoint, measured against a real database. A budget failure
+# usually means a lazy relationship is loaded per row (an N+1 query). Each transaction
+# also issues one set_config() for its statement_timeout, and each write takes the
+# change-log lock before appending to change_log.
+import uuid
+from app.cache.catalog import get_catalog_cache, get_list_cache
+
+
+def seed(client, problems=6):
+    category = f"Budget Category {uuid.uuid4()}"
+    assert client.post("/categories/", json={"name": category}).status_code == 201
+    slugs = []
+    for index in range(problems):
+        slug = f"budget-problem-{uuid.uuid4()}"
+        response = client.post("/problems/", json={
+            "slug_id": slug, "title": f"Budget Problem {index}", "difficulty": "Easy",
+            "categories": [category], "description": "Statement budget fixture",
+        })
+        assert response.status_code == 201
+        response = client.post(f"/problems/{slug}/solutions", json={
+            "name": "Brute Force", "description": "Try everything", "code": "pass",
+            "time_complexity": "O(n^2)", "space_complexity": "O(1)",
+        })
+        assert response.status_code == 201
+        slugs.append(slug)
+    return category, slugs
+
+
+def test_list_statements_do_not_grow_with_page_size(live_client, assert_max_statements):
+    seed(live_client)
+    # Drop the read-your-writes cookie the seed writes set, which would bypass the list cache,
+    # and start from empty caches so both pages are computed from the database
+    live_client.cookies.clear()
+    get_catalog_cache().clear()
+    get_list_cache().clear()
+    # identity also bypasses the compressed-response cache
+    small = live_client.get("/problems/?skip=0&limit=1", headers={"Accept-Encoding": "identity"})
+    large = live_client.get("/problems/?skip=0&limit=6", headers={"Accept-Encoding": "identity"})
+    assert small.headers["x-cache"] == large.headers["x-cache"] == "miss"
+    assert assert_max_statements(small, 5) == assert_max_statements(large, 5)
+
+
+def test_endpoint_statement_budgets(live_client, assert_max_statements):
+    category, slugs = seed(live_client, problems=1)
+    slug = slugs[0]
+    assert_max_statements(live_client.get(f"/problems/{slug}"), 5)
+    assert_max_statements(live_client.get("/categories/"), 2)
+    assert_max_statements(live_client.post(f"/problems/{slug}/solutions", json={
+        "name": "Two Pointers", "description": "Walk inwards", "code": "pass",
+        "time_complexity": "O(n)", "space_complexity": "O(1)",
+    }), 14)
+    assert_max_statements(live_client.put("/categories/", json={
+        "old_category": {"name": category}, "new_category": {"name": f"{category} renamed"},
+    }), 10)
@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -8,4 +9,31 @@ client = TestClient(app)
 def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"Hello": "World"}
\ No newline at end of file
+    assert response.json() == {"Hello": "World"}
+
+# Importing the app must stay cheap: workers import it on every boot and tests import it everywhere
+IMPORT_BUDGET_SECONDS = 3.0
+
+
+def test_import_does_not_touch_database():
+    import os
+    import subprocess
+    import sys
+
+    script = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import app.main\n"
+        "elapsed = time.perf_counter() - start\n"
+        "from app.db.database import get_engine\n"
+        "print(elapsed, get_engine.cache_info().currsize)\n"
+    )
+    # Point at a port nobody listens on: any connection attempt during import would fail
+    env = {**os.environ, "DB_HOST": "127.0.0.1", "DB_PORT": "1", "DB_USERNAME": "u", "DB_PASSWORD": "p", "DB_NAME": "none"}
+    try:
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, timeout=60, check=True)
+    except subprocess.CalledProcessError as err:
+        pytest.fail(f"importing app.main failed:\n{err.stderr}")
+    elapsed, engines_created = result.stdout.split()
+    assert float(elapsed) < IMPORT_BUDGET_SECONDS
+    assert engines_created == "0"
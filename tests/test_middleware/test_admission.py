@@ -0,0 +1,79 @@
+# tests/test_middleware/test_admission.py
+import asyncio
+import httpx
+from fastapi import FastAPI
+from app.middleware.admission import AdmissionLimiter, AdmissionMiddleware
+
+
+def test_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = AdmissionLimiter("reads", limit=1, queue_size=1, queue_timeout=1.0)
+        assert await limiter.acquire() is None
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 1
+        assert await limiter.acquire() == "queue_full"
+        limiter.release()
+        assert await waiting is None
+        assert limiter.in_use == 1 and limiter.queue_depth == 0
+        limiter.release()
+        assert limiter.in_use == 0
+
+    asyncio.run(scenario())
+
+
+def test_limiter_times_out_waiters():
+    async def scenario():
+        limiter = AdmissionLimiter("writes", limit=1, queue_size=4, queue_timeout=0.01)
+        await limiter.acquire()
+        assert await limiter.acquire() == "timeout"
+        assert limiter.queue_depth == 0
+        limiter.release()
+        assert limiter.in_use == 0
+
+    asyncio.run(scenario())
+
+
+def test_only_reads_of_bulk_paths_are_bulk():
+    limit = {"limit": 1, "queue": 0, "queue_timeout_ms": 10}
+    middleware = AdmissionMiddleware(None, classes={"bulk": limit, "reads": limit, "writes": limit}, bulk_paths=["/problems/"])
+    assert middleware.classify({"path": "/problems/", "method": "GET"}) == "bulk"
+    assert middleware.classify({"path": "/problems/", "method": "POST"}) == "writes"
+    assert middleware.classify({"path": "/problems/two-sum", "method": "GET"}) == "reads"
+
+
+def test_middleware_returns_503_with_retry_after_when_saturated():
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/metrics")
+    async def scrape():
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionMiddleware,
+        classes={"reads": {"limit": 1, "queue": 0, "queue_timeout_ms": 10}, "writes": {"limit": 1, "queue": 0, "queue_timeout_ms": 10}},
+        exempt_paths=["/metrics"],
+        retry_after_seconds=2,
+    )
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/slow"))
+            await asyncio.sleep(0.05)
+            shed = await client.get("/slow")
+            exempt = await client.get("/metrics")
+            release.set()
+            return await first, shed, exempt
+
+    first, shed, exempt = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "2"
+    assert shed.json()["detail"]["message"] == "The server is overloaded, retry later"
+    assert exempt.status_code == 200
@@ -0,0 +1,126 @@
+# tests/test_middleware/test_compression.py
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.db import events
+from app.db.utils import RECENT_WRITE_COOKIE
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+
+
+def make_client():
+    calls = []
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, cache_paths=["/problems"])
+
+    @app.get("/problems/")
+    def read_problems(limit: int = 10):
+        calls.append(limit)
+        return [{"slug_id": f"problem-{i}", "description": "x" * 50} for i in range(limit)]
+
+    @app.get("/problems/timed")
+    def read_timed():
+        calls.append("timed")
+        rows = [{"slug_id": f"problem-{i}", "description": "x" * 50} for i in range(10)]
+        return JSONResponse(rows, headers={"x-cache": "miss", "server-timing": "db;dur=12.0", "traceparent": "00-abc-def-01"})
+
+    @app.get("/problems/replica")
+    def read_from_replica(request: Request, applied: int):
+        # What get_read_db records for a replica session
+        request.state.replica_seq = applied
+        calls.append(applied)
+        return [{"slug_id": f"problem-{i}", "description": "x" * 50} for i in range(10)]
+
+    @app.get("/small")
+    def read_small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    def read_stream():
+        return StreamingResponse(iter([b"data: 1\n\n"]), media_type="text/event-stream")
+
+    return TestClient(app), calls
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("br;q=1.0, gzip;q=0.5") == "br"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("") is None
+
+
+def test_large_json_is_compressed_once_per_data_version():
+    client, calls = make_client()
+    headers = {"Accept-Encoding": "gzip"}
+
+    first = client.get("/problems/?limit=20", headers=headers)
+    second = client.get("/problems/?limit=20", headers=headers)
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["vary"] == "Accept-Encoding"
+    assert first.json() == second.json()
+    assert calls == [20]
+
+    # A committed change bumps the data version, so the next request recomputes
+    events.dispatch({"entity": "problem", "op": "update", "key": "problem-1"})
+    client.get("/problems/?limit=20", headers=headers)
+    assert calls == [20, 20]
+
+    # A different query is a different entry
+    client.get("/problems/?limit=5", headers=headers)
+    assert calls == [20, 20, 5]
+
+
+def test_cached_hits_do_not_replay_per_response_headers():
+    client, calls = make_client()
+    headers = {"Accept-Encoding": "gzip"}
+    first = client.get("/problems/timed", headers=headers)
+    hit = client.get("/problems/timed", headers=headers)
+    assert calls == ["timed"]
+    assert first.headers["x-cache"] == "miss"
+    for name in ("x-cache", "server-timing", "traceparent"):
+        assert name not in hit.headers
+    assert hit.headers["content-encoding"] == "gzip"
+    assert hit.json() == first.json()
+
+
+def test_lagging_replica_responses_are_not_cached(monkeypatch):
+    monkeypatch.setattr(events, "_seen_seq", 10)
+    client, calls = make_client()
+    headers = {"Accept-Encoding": "gzip"}
+    for _ in range(2):
+        client.get("/problems/replica?applied=9", headers=headers)
+    for _ in range(2):
+        client.get("/problems/replica?applied=10", headers=headers)
+    assert calls == [9, 9, 10]
+
+
+def test_recent_writers_bypass_the_compressed_cache():
+    client, calls = make_client()
+    client.get("/problems/?limit=20", headers={"Accept-Encoding": "gzip"})
+    client.cookies.set(RECENT_WRITE_COOKIE, "1")
+    client.get("/problems/?limit=20", headers={"Accept-Encoding": "gzip"})
+    assert calls == [20, 20]
+
+
+def test_compressed_body_is_smaller_than_the_json():
+    client, _ = make_client()
+    response = client.get("/problems/?limit=20", headers={"Accept-Encoding": "gzip"})
+    # The client transparently decodes the body; content-length is the size on the wire
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert len(response.json()) == 20
+
+
+def test_small_and_streaming_responses_are_not_compressed():
+    client, _ = make_client()
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    stream = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in stream.headers
+    assert stream.text == "data: 1\n\n"
+
+
+def test_identity_requests_bypass_the_middleware():
+    client, calls = make_client()
+    response = client.get("/problems/?limit=20", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    client.get("/problems/?limit=20", headers={"Accept-Encoding": "identity"})
+    assert calls == [20, 20]
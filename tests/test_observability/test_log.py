@@ -0,0 +1,26 @@
+# tests/test_observability/test_log.py
+import io
+import json
+import logging
+from app.observability.log import configure_logging, stop_logging
+
+
+def test_records_are_written_as_json_by_the_listener_thread():
+    stream = io.StringIO()
+    configure_logging("INFO", stream=stream)
+    try:
+        logger = logging.getLogger("app.test")
+        logger.info("created %s", "two-sum", extra={"route": "/problems/"})
+        logger.debug("not written")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+    finally:
+        stop_logging()
+
+    created, failed = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert created["message"] == "created two-sum"
+    assert created["level"] == "INFO" and created["logger"] == "app.test"
+    assert created["route"] == "/problems/"
+    assert failed["exception"].splitlines()[-1] == "ValueError: boom"
@@ -0,0 +1,56 @@
+# tests/test_observability/test_metrics.py
+import urllib.request
+from app.observability.metrics import Registry, start_metrics_server
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    latency.observe("/problems/", value=0.05)
+    latency.observe("/problems/", value=0.5)
+    latency.observe("/problems/", value=5)
+    text = registry.render()
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{route="/problems/",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/problems/",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/problems/",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/problems/"} 3' in text
+
+
+def test_counter_and_gauge_labels_are_escaped():
+    registry = Registry()
+    errors = registry.counter("errors_total", "Errors.", ("exception",))
+    in_flight = registry.gauge("in_flight", "In flight.", ("method",))
+    errors.inc('Bad"Name')
+    in_flight.inc("GET")
+    in_flight.inc("GET")
+    in_flight.dec("GET")
+    text = registry.render()
+    assert 'errors_total{exception="Bad\\"Name"} 1' in text
+    assert 'in_flight{method="GET"} 1' in text
+
+
+def test_metrics_endpoint_counts_routes_and_error_causes(client, mock_db):
+    # get_problem raises ValueError, which the router turns into a 422 HTTPException
+    mock_db.query.return_value.filter.return_value.first.return_value = None
+    response = client.get("/problems/missing-problem")
+    assert response.status_code == 422
+
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{route="/problems/{problem_id}",method="GET",status="422"}' in metrics.text
+    assert 'http_errors_total{route="/problems/{problem_id}",method="GET",exception="ValueError"}' in metrics.text
+    assert 'http_request_duration_seconds_count{route="/problems/{problem_id}",method="GET"}' in metrics.text
+
+
+def test_metrics_server_exposes_the_registry():
+    registry = Registry()
+    registry.counter("jobs_total", "Jobs.").inc()
+    server = start_metrics_server(registry, "127.0.0.1", 0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics", timeout=5) as response:
+            assert "jobs_total 1" in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
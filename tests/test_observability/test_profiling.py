@@ -0,0 +1,54 @@
+# tests/test_observability/test_profiling.py
+import pstats
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.observability.profiling import ProfilingMiddleware, install_profiling, profile_filename
+
+
+def busy_endpoint():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    return {"done": True}
+
+
+def make_client(directory, **options):
+    app = FastAPI()
+    app.get("/items/{item_id}")(lambda item_id: busy_endpoint())
+    install_profiling(app)
+    app.add_middleware(ProfilingMiddleware, directory=str(directory), token="secret", **options)
+    return TestClient(app)
+
+
+def test_requests_without_a_valid_token_are_not_profiled(tmp_path):
+    client = make_client(tmp_path)
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/1", headers={"X-Profile": "wrong"}).status_code == 200
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cprofile_mode_writes_pstats_including_the_threadpool(tmp_path):
+    client = make_client(tmp_path)
+    response = client.get("/items/1", headers={"X-Profile": "secret", "X-Profile-Mode": "cprofile"})
+    assert response.json() == {"done": True}
+    [profile] = tmp_path.iterdir()
+    assert "_GET_items_item_id_" in profile.name and profile.suffix == ".prof"
+    functions = {name for _, _, name in pstats.Stats(str(profile)).stats}
+    assert "busy_endpoint" in functions
+
+
+def test_sample_mode_writes_collapsed_stacks(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0, mode="sample", interval_ms=1)
+    client.get("/items/1")
+    [profile] = tmp_path.iterdir()
+    assert profile.suffix == ".collapsed"
+    lines = profile.read_text().splitlines()
+    assert any("test_profiling.py:busy_endpoint" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_profile_filename_carries_route_and_timing():
+    name = profile_filename("GET", "/problems/{problem_id}", 0.1534, "sample")
+    assert "_GET_problems_problem_id_153ms_" in name
+    assert name.endswith(".collapsed")
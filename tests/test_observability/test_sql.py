@@ -0,0 +1,57 @@
+# tests/test_observability/test_sql.py
+import logging
+import pytest
+from sqlalchemy import create_engine, text
+from app.observability.sql import RequestStats, current_request, parse_statement_count, server_timing, set_slow_query_threshold
+
+
+def test_statements_are_attributed_to_the_current_request():
+    engine = create_engine("sqlite://")
+    stats = RequestStats(method="GET")
+    token = current_request.set(stats)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+    finally:
+        current_request.reset(token)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 3"))
+    assert stats.statements == 2
+    assert stats.db_seconds > 0
+
+
+def test_server_timing_round_trip():
+    stats = RequestStats(method="GET")
+    stats.statements = 5
+    stats.db_seconds = 0.0124
+    header = server_timing(stats, 0.0201)
+    assert header == 'db;dur=12.4;desc="5 statements", app;dur=20.1'
+    assert parse_statement_count(header) == 5
+    with pytest.raises(ValueError):
+        parse_statement_count("app;dur=1.0")
+
+
+def test_responses_carry_server_timing(client, mock_db):
+    mock_db.query.return_value.offset.return_value.limit.return_value.all.return_value = []
+    response = client.get("/categories/")
+    assert response.status_code == 200
+    assert parse_statement_count(response.headers["server-timing"]) == 0
+
+
+def test_slow_statements_are_logged_with_route_and_parameter_shape(caplog):
+    engine = create_engine("sqlite://")
+    stats = RequestStats(method="GET", scope={"path": "/problems/two-sum"})
+    token = current_request.set(stats)
+    set_slow_query_threshold(0)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.slow_query"), engine.connect() as connection:
+            connection.execute(text("SELECT :slug"), {"slug": "two-sum"})
+    finally:
+        set_slow_query_threshold(None)
+        current_request.reset(token)
+    [record] = [record for record in caplog.records if record.name == "app.slow_query"]
+    assert record.statement == "SELECT ?"
+    assert record.parameters == ["str"]
+    assert record.route == "/problems/two-sum" and record.method == "GET"
+    assert "two-sum" not in str(record.parameters)
@@ -0,0 +1,71 @@
+# tests/test_observability/test_tracing.py
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.observability.tracing import (
+    InMemoryCollector, TracingMiddleware, enable_sql_tracing, install_tracing, parse_traceparent, traced,
+)
+
+engine = create_engine("sqlite://")
+
+
+@traced("slug_id")
+def load_rows(slug_id: str):
+    with engine.connect() as connection:
+        return list(connection.execute(text("SELECT :slug UNION ALL SELECT 'b'"), {"slug": slug_id}))
+
+
+def make_client(collector, sample_rate=1.0):
+    app = FastAPI()
+
+    @app.get("/rows/{slug_id}")
+    def read_rows(slug_id: str):
+        return {"rows": len(load_rows(slug_id))}
+
+    install_tracing(app)
+    enable_sql_tracing()
+    app.add_middleware(TracingMiddleware, exporter=collector, sample_rate=sample_rate)
+    return TestClient(app)
+
+
+def test_sampled_request_records_route_crud_and_sql_spans():
+    collector = InMemoryCollector()
+    response = make_client(collector).get("/rows/two-sum")
+    assert response.json() == {"rows": 2}
+
+    [spans] = collector.traces().values()
+    by_name = {span["name"]: span for span in spans}
+    root = by_name["GET /rows/{slug_id}"]
+    handler = by_name["route.read_rows"]
+    crud = next(span for span in spans if span["name"].endswith("test_tracing.load_rows"))
+    sql = by_name["sql"]
+    assert handler["parent_id"] == root["span_id"]
+    assert crud["parent_id"] == handler["span_id"]
+    assert crud["attributes"] == {"slug_id": "two-sum", "rows": 2}
+    assert sql["parent_id"] == crud["span_id"]
+    assert sql["attributes"]["db.operation"] == "SELECT" and len(sql["attributes"]["db.statement_hash"]) == 12
+    assert "serialize_response" in by_name
+    assert response.headers["traceparent"] == f"00-{root['trace_id']}-{root['span_id']}-01"
+
+
+def test_traceparent_propagates_trace_id_and_sampling_decision():
+    collector = InMemoryCollector()
+    client = make_client(collector, sample_rate=0.0)
+    client.get("/rows/a")
+    assert collector.spans == []
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    client.get("/rows/a", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+    root = next(span for span in collector.spans if span["name"] == "GET /rows/{slug_id}")
+    assert root["trace_id"] == trace_id and root["parent_id"] == "00f067aa0ba902b7"
+
+    # The caller decided not to sample: nothing is recorded even though the header is valid
+    exported = len(collector.spans)
+    client.get("/rows/a", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-00"})
+    assert len(collector.spans) == exported
+
+
+def test_parse_traceparent_rejects_malformed_headers():
+    assert parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00")[2] is False
@@ -0,0 +1,83 @@
+# tests/test_search/test_autocomplete.py
+import time
+from unittest.mock import MagicMock
+import pytest
+from app.routers import problems as problems_router
+from app.search.autocomplete import AutocompleteIndex
+
+
+def fake_session_factory(problems, categories=()):
+    def factory():
+        session = MagicMock()
+        session.execute.side_effect = [list(problems), [(name,) for name in categories]]
+        return session
+    return factory
+
+
+def build_index():
+    index = AutocompleteIndex(session_factory=fake_session_factory(
+        [("two-sum", "Two Sum"), ("sum-of-subsets", "Sum of Subsets"), ("word-ladder", "Word Ladder")],
+        ["Sorting", "Sliding Window"],
+    ))
+    index.ensure_current()
+    return index
+
+
+def test_suggest_matches_word_starts_slugs_and_categories():
+    index = build_index()
+    # A title starting with the prefix ranks before a match further into a title
+    assert index.suggest("SUM") == [("problem", "sum-of-subsets", "Sum of Subsets"), ("problem", "two-sum", "Two Sum")]
+    assert index.suggest("s", limit=3) == [
+        ("category", "Sliding Window", "Sliding Window"),
+        ("category", "Sorting", "Sorting"),
+        ("problem", "sum-of-subsets", "Sum of Subsets"),
+    ]
+    assert index.suggest("word-l") == [("problem", "word-ladder", "Word Ladder")]
+    assert index.suggest("zzz") == []
+    with pytest.raises(ValueError):
+        index.suggest("  ")
+
+
+def test_title_start_matches_are_not_crowded_out_by_later_word_matches():
+    # Far more "... Sum NNN" word matches than a bounded scan would read, all sorting before "summit"
+    problems = [(f"problem-{i:03}", f"Two Sum {i:03}") for i in range(300)] + [("summit", "Summit")]
+    index = AutocompleteIndex(session_factory=fake_session_factory(problems))
+    index.ensure_current()
+    suggestions = index.suggest("sum", limit=3)
+    assert suggestions == [
+        ("problem", "summit", "Summit"),
+        ("problem", "problem-000", "Two Sum 000"),
+        ("problem", "problem-001", "Two Sum 001"),
+    ]
+
+
+def test_changes_update_entries():
+    index = build_index()
+    index.session_factory = fake_session_factory([("two-sum", "Pair Sum")])
+    index.mark({"entity": "problem", "op": "update", "key": "two-sum"})
+    index.mark({"entity": "problem", "op": "delete", "key": "word-ladder"})
+    index.ensure_current()
+    assert index.suggest("two") == [("problem", "two-sum", "Pair Sum")]
+    assert index.suggest("pair") == [("problem", "two-sum", "Pair Sum")]
+    assert index.suggest("word") == []
+    index.mark({"entity": "category", "op": "create", "key": "Graphs"})
+    assert index._stale
+
+
+def test_suggest_is_sub_millisecond():
+    index = AutocompleteIndex(session_factory=fake_session_factory(
+        [(f"problem-{i}", f"Problem number {i} about arrays") for i in range(20000)]))
+    index.ensure_current()
+    start = time.perf_counter()
+    for _ in range(100):
+        index.suggest("problem number 1", limit=10)
+    assert (time.perf_counter() - start) / 100 < 0.001
+
+
+def test_autocomplete_endpoint(client, monkeypatch):
+    index = build_index()
+    monkeypatch.setattr(problems_router, "get_autocomplete_index", lambda: index)
+    response = client.get("/problems/autocomplete?prefix=wo")
+    assert response.status_code == 200
+    assert response.json() == [{"kind": "problem", "value": "word-ladder", "label": "Word Ladder"}]
+    assert client.get("/problems/autocomplete?prefix=%20").status_code == 400
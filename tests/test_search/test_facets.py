@@ -0,0 +1,87 @@
+# tests/test_search/test_facets.py
+from unittest.mock import MagicMock
+import pytest
+from app.routers import problems as problems_router
+from app.search.facets import FacetIndex
+from app.search.index import ProblemIndex
+
+# (id, slug, difficulty, best time, best space), categories
+PROBLEMS = [
+    ((1, "two-sum", "Easy", "O(n)", "O(n)"), ["Arrays", "Hashing"]),
+    ((2, "three-sum", "Medium", "O(n^2)", "O(1)"), ["Arrays", "Two Pointers"]),
+    ((3, "word-ladder", "Hard", "NA", "NA"), ["Graphs"]),
+]
+
+
+def fake_session_factory(problems):
+    def factory():
+        session = MagicMock()
+        links = [(row[0], name) for row, names in problems for name in names]
+        session.execute.side_effect = [links, [row for row, _ in problems]]
+        return session
+    return factory
+
+
+def build_index(problems=PROBLEMS, capacity=1024):
+    index = FacetIndex(session_factory=fake_session_factory(problems), initial_capacity=capacity)
+    index.ensure_current()
+    return index
+
+
+def test_search_combines_and_or_not():
+    index = build_index()
+    total, slugs, facets = index.search(include=[[("category", "Arrays")]])
+    assert (total, slugs) == (2, ["two-sum", "three-sum"])
+    assert facets["difficulty"] == {"Easy": 1, "Medium": 1, "Hard": 0}
+    assert facets["category"]["Graphs"] == 0
+
+    total, slugs, _ = index.search(include=[[("difficulty", "Easy"), ("difficulty", "Hard")]],
+                                   exclude=[("category", "Hashing")])
+    assert slugs == ["word-ladder"]
+    assert index.search(include=[[("category", "Arrays")], [("category", "Graphs")]])[0] == 0
+    assert index.search(include=[[("category", "Unknown")]])[0] == 0
+    with pytest.raises(ValueError):
+        index.search(include=[[("colour", "red")]])
+
+
+def test_changes_reload_only_dirty_problems():
+    index = build_index()
+    updated = [((2, "three-sum", "Medium", "O(n^2)", "O(1)"), ["Two Pointers"])]
+    index.session_factory = fake_session_factory(updated)
+    index.mark({"entity": "problem", "op": "update", "key": "three-sum"})
+    index.mark({"entity": "problem", "op": "delete", "key": "word-ladder"})
+    index.ensure_current()
+    total, slugs, facets = index.search()
+    assert total == 2 and slugs == ["two-sum", "three-sum"]
+    assert facets["category"]["Arrays"] == 1 and facets["category"]["Graphs"] == 0
+    # Nothing changed since, so no query is made
+    index.session_factory = None
+    index.ensure_current()
+
+
+def test_index_grows_past_initial_capacity():
+    many = [((i, f"p-{i}", "Easy", "NA", "NA"), ["Arrays"] if i % 2 else []) for i in range(1, 40)]
+    index = build_index(many, capacity=8)
+    total, slugs, facets = index.search(include=[[("category", "Arrays")]], skip=10, limit=2)
+    assert total == 20 and slugs == ["p-21", "p-23"]
+    assert facets["difficulty"]["Easy"] == 20
+
+
+def test_filter_endpoint(client, mock_db, monkeypatch):
+    index = build_index()
+    monkeypatch.setattr(problems_router, "get_facet_index", lambda: index)
+    mock_db.query.return_value.options.return_value.filter.return_value.all.return_value = []
+    response = client.get("/problems/filter?category=Arrays&category=Hashing&category_match=all")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1 and body["facets"]["difficulty"]["Easy"] == 1
+    assert client.get("/problems/filter?category_match=some").status_code == 400
+
+
+def test_indexes_must_implement_every_hook():
+    class PartialIndex(ProblemIndex):
+        def _load(self, session, slugs=None):
+            return {}
+
+    with pytest.raises(TypeError):
+        PartialIndex(session_factory=MagicMock())
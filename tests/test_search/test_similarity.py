@@ -0,0 +1,95 @@
+# tests/test_search/test_similarity.py
+import time
+from unittest.mock import MagicMock
+import numpy as np
+from app.routers import problems as problems_router
+from app.search.similarity import SimilarityIndex, text_features
+
+# (id, slug, title, description), categories, solution names
+PROBLEMS = [
+    ((1, "two-sum", "Two Sum", "Find two numbers in an array that add up to a target"), ["Arrays", "Hashing"], ["Hash Map"]),
+    ((2, "three-sum", "Three Sum", "Find three numbers in an array that add up to zero"), ["Arrays", "Two Pointers"], ["Sorting"]),
+    ((3, "word-ladder", "Word Ladder", "Shortest transformation sequence between two words"), ["Graphs"], ["BFS"]),
+    ((4, "clone-graph", "Clone Graph", "Deep copy an undirected graph"), ["Graphs"], ["DFS"]),
+]
+
+
+def fake_session_factory(problems):
+    def factory():
+        session = MagicMock()
+        session.execute.side_effect = [
+            [(row[0], name) for row, names, _ in problems for name in names],
+            [(row[0], name) for row, _, solutions in problems for name in solutions],
+            [row for row, _, _ in problems],
+        ]
+        return session
+    return factory
+
+
+def build_index(problems=PROBLEMS):
+    index = SimilarityIndex(session_factory=fake_session_factory(problems), dimensions=2 ** 12)
+    index.ensure_current()
+    return index
+
+
+def test_text_features_hash_words_and_pairs():
+    features = text_features("Two Sum", "", [], 2 ** 12)
+    # "two" and "sum" twice each (title weight) and the pair "two sum" twice
+    assert sorted(features.values()) == [2, 2, 2]
+
+
+def test_similar_ranks_text_and_categories():
+    index = build_index()
+    similar = index.similar("two-sum", limit=2)
+    assert [slug for slug, _, _ in similar] == ["three-sum", "word-ladder"]
+    assert 0 < similar[0][2] <= 1
+    assert [slug for slug, _, _ in index.similar("word-ladder", limit=1)] == ["clone-graph"]
+
+
+def test_repeated_updates_keep_the_row_count_bounded():
+    index = build_index()
+    before = index.similar("two-sum")
+    for _ in range(50):
+        index.session_factory = fake_session_factory([PROBLEMS[3]])
+        index.mark({"entity": "problem", "op": "update", "key": "clone-graph"})
+        index.ensure_current()
+        # Excluded rows are compacted away once they outnumber the live ones
+        assert index.text.rows == index.categories.rows == len(index.slugs) <= 2 * len(PROBLEMS)
+    assert len(index.positions) == len(PROBLEMS)
+    assert index.similar("two-sum") == before
+
+
+def test_updates_replace_rows_and_deletes_drop_them():
+    index = build_index()
+    index.session_factory = fake_session_factory([
+        ((4, "clone-graph", "Clone Graph", "Find two numbers in an array"), ["Arrays"], []),
+    ])
+    index.mark({"entity": "problem", "op": "update", "key": "clone-graph"})
+    index.mark({"entity": "problem", "op": "delete", "key": "three-sum"})
+    index.ensure_current()
+    slugs = [slug for slug, _, _ in index.similar("two-sum")]
+    assert slugs[0] == "clone-graph" and "three-sum" not in slugs
+
+
+def test_similar_is_fast_for_a_large_catalog():
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f"w{i}" for i in range(5000)])
+    problems = [((i, f"p-{i}", " ".join(vocabulary[rng.integers(0, 5000, 4)]), " ".join(vocabulary[rng.integers(0, 5000, 40)])),
+                 [f"c{i % 50}"], []) for i in range(5000)]
+    index = SimilarityIndex(session_factory=fake_session_factory(problems))
+    index.ensure_current()
+    index.similar("p-7")
+    start = time.perf_counter()
+    for _ in range(10):
+        index.similar("p-7", limit=10)
+    assert (time.perf_counter() - start) / 10 < 0.01
+
+
+def test_similar_endpoint(client, monkeypatch):
+    index = build_index()
+    monkeypatch.setattr(problems_router, "get_similarity_index", lambda: index)
+    response = client.get("/problems/two-sum/similar?limit=1")
+    assert response.status_code == 200
+    assert response.json()[0]["slug_id"] == "three-sum"
+    assert client.get("/problems/missing/similar").status_code == 404
+    assert client.get("/problems/two-sum/similar?limit=0").status_code == 400
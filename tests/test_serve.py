@@ -0,0 +1,52 @@
+# tests/test_serve.py
+import multiprocessing
+from unittest.mock import MagicMock, patch
+from app.config import get_settings
+from app import serve
+
+
+def test_worker_count_defaults_to_cpu_count():
+    assert serve.worker_count(0) == multiprocessing.cpu_count()
+    assert serve.worker_count(3) == 3
+
+
+def test_gunicorn_options_come_from_config():
+    settings = get_settings().server
+    options = serve.gunicorn_options(settings)
+    assert options["bind"] == f"{settings.host}:{settings.port}"
+    assert options["worker_class"] == settings.worker_class
+    assert options["preload_app"] == settings.preload
+    assert options["pre_fork"] is serve.pre_fork
+    assert options["post_fork"] is serve.post_fork
+
+
+def test_post_fork_drops_inherited_pool_without_closing_it():
+    engine = MagicMock()
+    with patch("app.db.database.create_engine", return_value=engine):
+        from app.db.database import get_engine
+        get_engine.cache_clear()
+        assert get_engine() is engine
+        serve.post_fork(server=None, worker=None)
+    engine.dispose.assert_called_once_with(close=False)
+    assert get_engine.cache_info().currsize == 0
+
+
+def test_pre_fork_reuses_the_lowest_free_metrics_slot():
+    server = MagicMock()
+    server.WORKERS = {101: MagicMock(metrics_slot=0), 103: MagicMock(metrics_slot=2)}
+    worker = MagicMock()
+    serve.pre_fork(server, worker)
+    assert worker.metrics_slot == 1
+
+    server.WORKERS[102] = worker
+    replacement = MagicMock()
+    serve.pre_fork(server, replacement)
+    assert replacement.metrics_slot == 3
+
+
+def test_post_fork_serves_metrics_on_the_worker_port():
+    settings = get_settings().server
+    with patch("app.db.database.dispose_engine"), patch("app.observability.metrics.start_metrics_server") as start:
+        serve.post_fork(server=None, worker=MagicMock(metrics_slot=2))
+    start.assert_called_once()
+    assert start.call_args.args[1:] == (settings.host, settings.metrics_port + 2)